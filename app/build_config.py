@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+不可变构建配置模块 - 为线程安全的脚本生成API提供只读配置和结果对象
+"""
+
+import dataclasses
+import hashlib
+import json
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class BuildConfig:
+    """不可变构建配置，字段与 ConfigCollector 属性一一对应"""
+
+    project_dir: str = "."
+    entry_file: Optional[str] = None
+    icon_file: Optional[str] = None
+    build_tool: str = "nuitka"
+    compiler: str = "mingw64"
+    show_console: bool = False
+    output_dir: str = "build"
+    app_name: Optional[str] = None
+    enable_plugins: Tuple[str, ...] = ()
+    include_modules: Tuple[str, ...] = ()
+    exclude_packages: Tuple[str, ...] = ()
+    copy_dirs: Tuple[str, ...] = ()
+    company_name: str = ""
+    file_version: str = "1.0.0"
+    jobs: int = 4
+    standalone: bool = True
+    onefile: bool = False
+    uac_admin: bool = False
+    script_filename: str = "build.py"
+    quiet_mode: bool = False
+    show_progressbar: bool = True
+    remove_output: bool = False
+    # PyInstaller特有选项
+    add_data: Tuple[str, ...] = ()
+    add_binary: Tuple[str, ...] = ()
+    copy_metadata: Tuple[str, ...] = ()
+    hidden_imports: Tuple[str, ...] = ()
+    collect_all: Tuple[str, ...] = ()
+    upx_dir: Optional[str] = None
+    debug: bool = False
+    clean: bool = True
+    # Linux包生成选项
+    generate_linux_packages: bool = False
+    linux_packaging_tool: str = "nfpm"
+    linux_package_types: Tuple[str, ...] = ("deb",)
+    package_architecture: str = "amd64"
+    package_install_path: str = "/usr/local/bin"
+    package_depends: Tuple[str, ...] = ()
+    package_desktop_name: str = ""
+    package_create_service: bool = False
+    package_service_name: str = ""
+    package_output_dir: str = "output_pkg"
+    # 构建图选项
+    generate_ninja: bool = False
+    # 隔离构建环境
+    isolated_build: bool = False
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> "BuildConfig":
+        """从字典创建配置，列表字段转换为元组，未知字段忽略"""
+        values = {}
+        for f in dataclasses.fields(cls):
+            if f.name in data:
+                value = data[f.name]
+                values[f.name] = tuple(value) if isinstance(value, (list, tuple)) else value
+        return cls(**values)
+
+    @classmethod
+    def from_collector(cls, collector) -> "BuildConfig":
+        """从 ConfigCollector（或任意同名属性对象）创建配置快照"""
+        return cls.from_mapping(
+            {f.name: getattr(collector, f.name) for f in dataclasses.fields(cls)
+             if hasattr(collector, f.name)}
+        )
+
+    def replace(self, **changes) -> "BuildConfig":
+        """返回修改了指定字段的新配置"""
+        return dataclasses.replace(self, **changes)
+
+    def to_dict(self) -> dict:
+        """转换为普通字典（元组转为列表）"""
+        return {
+            key: list(value) if isinstance(value, tuple) else value
+            for key, value in dataclasses.asdict(self).items()
+        }
+
+    def config_hash(self) -> str:
+        """计算配置哈希，用于缓存和构建记录"""
+        payload = json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class GenerationResult:
+    """脚本生成结果"""
+
+    args: Tuple[str, ...]
+    script: str
+    script_filename: str
+    metadata: Mapping = field(default_factory=lambda: MappingProxyType({}))
+    # 附加文件 {相对项目目录的文件名: 内容}，如 build.ninja
+    extra_files: Mapping = field(default_factory=lambda: MappingProxyType({}))
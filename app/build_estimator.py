@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+构建预估模块 - 在编译前根据导入图、各模块源码大小和历史构建估算编译耗时、峰值内存和产物大小
+
+模型按编译参数（standalone/onefile、--jobs、插件、排除的包）计算待编译的源码量和需要携带的
+原生文件，系数为经验值；项目有构建历史（.build_history.db）时，按历史构建的实测值与同一模型
+对其参数的估算值之比校准，反映本机的编译速度。
+"""
+
+import os
+import statistics
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .build_history import BuildHistory
+from .dist_footprint import format_size, load_footprint_index
+from .import_analyzer import get_distribution_modules
+
+MB = 1024 * 1024
+
+# Nuitka：每MB源码的单任务编译秒数（Python→C 翻译 + C 编译），其中C编译部分可按 --jobs 并行
+NUITKA_SECONDS_PER_MB = 80.0
+NUITKA_PARALLEL_FRACTION = 0.7
+NUITKA_BASE_SECONDS = 15.0
+# standalone 模式下一并编译的标准库源码量（导入图不展开标准库）
+NUITKA_STDLIB_SOURCE_MB = 4.0
+# Nuitka进程每MB源码的内存占用，以及每个并行C编译任务的内存占用
+NUITKA_BASE_MEMORY_MB = 200
+NUITKA_MEMORY_PER_SOURCE_MB = 25
+NUITKA_MEMORY_PER_JOB_MB = 150
+# 编译后的扩展模块相对源码的大小
+NUITKA_CODE_EXPANSION = 1.5
+# 启用插件的额外耗时（秒），未列出的插件按 PLUGIN_DEFAULT_SECONDS 计
+PLUGIN_SECONDS = {"pyside6": 90, "pyside2": 90, "pyqt6": 90, "pyqt5": 90, "tk-inter": 10, "matplotlib": 20}
+PLUGIN_DEFAULT_SECONDS = 5
+
+# PyInstaller：依赖分析按模块数计时，字节码编译按源码量计时
+PYINSTALLER_BASE_SECONDS = 8.0
+PYINSTALLER_SECONDS_PER_MODULE = 0.01
+PYINSTALLER_SECONDS_PER_MB = 2.0
+PYINSTALLER_BASE_MEMORY_MB = 100
+PYINSTALLER_MEMORY_PER_MODULE_MB = 0.2
+# .pyc（压缩归档）相对源码的大小
+PYC_RATIO = 0.5
+
+# 独立打包时携带的Python运行时（解释器、标准库）
+RUNTIME_BYTES = 12 * MB
+# 单文件模式：压缩率和每MB产物的压缩耗时
+ONEFILE_RATIO = 0.5
+ONEFILE_SECONDS_PER_MB = 0.5
+
+# 参与校准的历史构建数，以及校准系数的上下限
+HISTORY_LIMIT = 20
+CALIBRATION_RANGE = (0.1, 10.0)
+
+
+def _under_any(name: str, packages: Iterable[str]) -> bool:
+    return any(name == p or name.startswith(p + ".") for p in packages)
+
+
+def parse_build_profile(tool: str, args: Iterable[str]) -> Dict:
+    """从编译参数中提取影响耗时和大小的选项（历史构建只记录了命令行）
+
+    Returns:
+        Dict: {"tool", "standalone", "onefile", "jobs", "plugins", "excludes", "includes", "collect_all"}
+    """
+    profile = {"tool": tool, "standalone": tool == "pyinstaller", "onefile": False, "jobs": 1,
+               "plugins": [], "excludes": [], "includes": [], "collect_all": []}
+    for arg in args:
+        option, _, value = arg.partition("=")
+        if option == "--standalone":
+            profile["standalone"] = True
+        elif option == "--onefile":
+            profile["onefile"] = True
+            profile["standalone"] = True
+        elif option == "--jobs":
+            try:
+                profile["jobs"] = max(1, int(value))
+            except ValueError:
+                pass
+        elif option == "--enable-plugin":
+            profile["plugins"].append(value)
+        elif option in ("--nofollow-import-to", "--exclude-module"):
+            profile["excludes"].append(value)
+        elif option in ("--include-module", "--hidden-import"):
+            profile["includes"].append(value)
+        elif option == "--collect-all":
+            profile["collect_all"].append(value)
+    return profile
+
+
+class BuildEstimator:
+    """按导入图和构建历史估算一次构建的耗时、峰值内存和产物大小"""
+
+    def __init__(self, analyzer, tool: str, history: Optional[List[Dict]] = None,
+                 footprint: Optional[Dict[str, Dict]] = None,
+                 distributions: Optional[Dict[str, Dict]] = None):
+        """
+        Args:
+            analyzer: 已构建导入图的 ImportGraphAnalyzer
+            tool: 构建工具 (nuitka / pyinstaller)
+            history: BuildHistory.load() 返回的构建记录，用于校准
+            footprint: 已安装包体积索引（load_footprint_index）
+            distributions: 发行包与顶层模块的对应关系（get_distribution_modules）
+        """
+        self.analyzer = analyzer
+        self.tool = tool
+        self.history = history or []
+        self.footprint = footprint if footprint is not None else load_footprint_index()
+        distributions = distributions if distributions is not None else get_distribution_modules()
+        self._dist_of = {module: key for key, dist in distributions.items() for module in dist["modules"]}
+        self.project_dir = os.path.normcase(analyzer.project_dir) + os.sep
+        self.entry_name = Path(analyzer.entry_file).stem
+        self.modules = self._collect_modules()
+
+    def _module_info(self, name: str, origin: Optional[str]) -> Dict:
+        top = self.entry_name if name == "__main__" else name.partition(".")[0]
+        try:
+            size = os.path.getsize(origin)
+        except (OSError, TypeError):
+            size = 0
+        return {"top": top, "bytes": size, "project": os.path.normcase(origin).startswith(self.project_dir)}
+
+    def _collect_modules(self) -> Dict[str, Dict]:
+        """导入图中各模块的源码大小：{模块名: {"top", "bytes", "project"}}（扩展模块和命名空间包不计）"""
+        names = set(self.analyzer.graph)
+        for edges in self.analyzer.graph.values():
+            names.update(edges)
+        modules = {}
+        for name in sorted(names):
+            origin = self.analyzer.entry_file if name == "__main__" else None
+            if origin is None:
+                spec = self.analyzer.find_spec(name)
+                origin = spec.origin if spec else None
+            if origin and origin.endswith((".py", ".pyw")):
+                modules[name] = self._module_info(name, origin)
+        return modules
+
+    def _compiled_modules(self, profile: Dict) -> Dict[str, Dict]:
+        """按参数实际会编译/收集的模块"""
+        modules = dict(self.modules)
+        for name in profile["includes"]:
+            if name not in modules:
+                spec = self.analyzer.find_spec(name)
+                if spec and spec.origin and spec.origin.endswith(".py"):
+                    modules[name] = self._module_info(name, spec.origin)
+        return {
+            name: info for name, info in modules.items()
+            if not _under_any(name, profile["excludes"])
+            # 非独立模式下 Nuitka 只编译项目自身的模块，第三方包在运行时从环境导入
+            and (profile["standalone"] or info["project"])
+        }
+
+    def model(self, profile: Dict) -> Dict:
+        """未校准的估算
+
+        Returns:
+            Dict: {"seconds", "peak_bytes", "output_bytes", "modules", "source_bytes",
+            "contributors": {顶层模块: {"seconds", "output_bytes", "source_bytes", "modules", "largest"}}}
+        """
+        nuitka = profile["tool"] == "nuitka"
+        jobs = min(profile["jobs"], os.cpu_count() or 1)
+        job_factor = (1 - NUITKA_PARALLEL_FRACTION) + NUITKA_PARALLEL_FRACTION / jobs
+        contributors: Dict[str, Dict] = {}
+
+        def contributor(top):
+            return contributors.setdefault(
+                top, {"seconds": 0.0, "output_bytes": 0, "source_bytes": 0, "modules": 0, "largest": None}
+            )
+
+        for name, info in self._compiled_modules(profile).items():
+            entry = contributor(info["top"])
+            entry["source_bytes"] += info["bytes"]
+            entry["modules"] += 1
+            if entry["largest"] is None or info["bytes"] > entry["largest"][1]:
+                entry["largest"] = (name, info["bytes"])
+
+        # PyInstaller --collect-all 会收集包内全部模块，而不只是导入图中出现的
+        for package in profile["collect_all"]:
+            dist = self.footprint.get(self._dist_of.get(package, ""))
+            if dist and not _under_any(package, profile["excludes"]):
+                entry = contributor(package)
+                entry["source_bytes"] = max(entry["source_bytes"], dist.get("py_bytes", 0))
+                entry["modules"] = max(entry["modules"], dist["py_modules"])
+
+        # 每个用到的发行包携带其原生扩展和数据文件
+        if profile["standalone"]:
+            seen = set()
+            for top, entry in contributors.items():
+                key = self._dist_of.get(top)
+                dist = self.footprint.get(key or "")
+                if dist and key not in seen:
+                    seen.add(key)
+                    entry["output_bytes"] += max(dist["size_bytes"] - dist.get("py_bytes", 0), 0)
+
+        for entry in contributors.values():
+            source_mb = entry["source_bytes"] / MB
+            if nuitka:
+                entry["seconds"] = NUITKA_SECONDS_PER_MB * source_mb * job_factor
+                entry["output_bytes"] += int(entry["source_bytes"] * NUITKA_CODE_EXPANSION)
+            else:
+                entry["seconds"] = entry["modules"] * PYINSTALLER_SECONDS_PER_MODULE + source_mb * PYINSTALLER_SECONDS_PER_MB
+                entry["output_bytes"] += int(entry["source_bytes"] * PYC_RATIO)
+
+        source_bytes = sum(entry["source_bytes"] for entry in contributors.values())
+        module_count = sum(entry["modules"] for entry in contributors.values())
+        output_bytes = sum(entry["output_bytes"] for entry in contributors.values())
+        seconds = sum(entry["seconds"] for entry in contributors.values())
+        if nuitka:
+            stdlib_mb = NUITKA_STDLIB_SOURCE_MB if profile["standalone"] else 0
+            seconds += NUITKA_BASE_SECONDS + NUITKA_SECONDS_PER_MB * stdlib_mb * job_factor
+            seconds += sum(PLUGIN_SECONDS.get(plugin, PLUGIN_DEFAULT_SECONDS) for plugin in profile["plugins"])
+            peak_mb = (NUITKA_BASE_MEMORY_MB + NUITKA_MEMORY_PER_SOURCE_MB * (source_bytes / MB + stdlib_mb)
+                       + NUITKA_MEMORY_PER_JOB_MB * jobs)
+        else:
+            seconds += PYINSTALLER_BASE_SECONDS
+            peak_mb = PYINSTALLER_BASE_MEMORY_MB + PYINSTALLER_MEMORY_PER_MODULE_MB * module_count
+        if profile["standalone"]:
+            output_bytes += RUNTIME_BYTES
+        if profile["onefile"]:
+            seconds += output_bytes / MB * ONEFILE_SECONDS_PER_MB
+            output_bytes = int(output_bytes * ONEFILE_RATIO)
+
+        return {
+            "seconds": seconds,
+            "peak_bytes": int(peak_mb * MB),
+            "output_bytes": output_bytes,
+            "modules": module_count,
+            "source_bytes": source_bytes,
+            "contributors": contributors,
+        }
+
+    def calibrate(self) -> Dict:
+        """用历史构建校准：同一模型对历史参数的估算值与实测值之比的中位数
+
+        Returns:
+            Dict: {"builds": 参与校准的构建数, "seconds", "peak_bytes", "output_bytes": 校准系数}
+        """
+        ratios = {"seconds": [], "peak_bytes": [], "output_bytes": []}
+        builds = 0
+        for build in self.history:
+            compile_phase = build["phases"].get("compile")
+            if (build["status"] != "success" or (build["tool"] or "").lower() != self.tool
+                    or not compile_phase or compile_phase["status"] != "done"):
+                continue
+            builds += 1
+            predicted = self.model(parse_build_profile(self.tool, (build["command"] or "").split()))
+            actual = {
+                "seconds": compile_phase["seconds"],
+                "peak_bytes": build["peak_rss_kb"] * 1024 if build["peak_rss_kb"] else None,
+                "output_bytes": build["artifact_bytes"],
+            }
+            for key, value in actual.items():
+                if value and predicted[key] > 0:
+                    ratios[key].append(value / predicted[key])
+
+        low, high = CALIBRATION_RANGE
+        factors = {key: min(max(statistics.median(values), low), high) if values else 1.0
+                   for key, values in ratios.items()}
+        return {"builds": builds, **factors}
+
+    def estimate(self, args: Iterable[str], top: int = 5) -> Dict:
+        """估算给定编译参数的构建
+
+        Returns:
+            Dict: {"seconds", "peak_bytes", "output_bytes", "modules", "source_bytes",
+            "calibrated_builds", "overhead_share", "contributors": [{"name", "seconds", "share", "output_bytes",
+            "source_bytes", "modules", "largest"}]}（贡献者按耗时降序，最多 top 个）
+        """
+        profile = parse_build_profile(self.tool, args)
+        predicted = self.model(profile)
+        factors = self.calibrate()
+        total = predicted["seconds"] or 1.0
+        contributors = sorted(
+            ({"name": name, **entry, "share": entry["seconds"] / total,
+              "seconds": entry["seconds"] * factors["seconds"],
+              "output_bytes": int(entry["output_bytes"] * factors["output_bytes"])}
+             for name, entry in predicted["contributors"].items()),
+            key=lambda entry: (entry["seconds"], entry["output_bytes"]), reverse=True,
+        )
+        return {
+            "seconds": predicted["seconds"] * factors["seconds"],
+            "peak_bytes": int(predicted["peak_bytes"] * factors["peak_bytes"]),
+            "output_bytes": int(predicted["output_bytes"] * factors["output_bytes"]),
+            "modules": predicted["modules"],
+            "source_bytes": predicted["source_bytes"],
+            "calibrated_builds": factors["builds"],
+            # 运行时、标准库、插件和固定开销的耗时占比
+            "overhead_share": max(1 - sum(entry["share"] for entry in contributors), 0.0),
+            "contributors": contributors[:top],
+        }
+
+
+def estimate_config(config, top: int = 5) -> Optional[Dict]:
+    """估算 ConfigCollector 当前配置的构建，无法分析入口文件的导入图时返回None"""
+    from .import_analyzer import ImportGraphAnalyzer
+    from .script_generator import ScriptGenerator
+
+    if not config.entry_file:
+        return None
+    get_analyzer = getattr(config, "_get_import_analyzer", None)
+    if get_analyzer is not None:
+        analyzer = get_analyzer()
+    else:
+        analyzer = ImportGraphAnalyzer(config.project_dir, config.entry_file)
+        analyzer.build_graph()
+    if analyzer is None:
+        return None
+
+    try:
+        history = BuildHistory(config.project_dir).load(config.app_name, limit=HISTORY_LIMIT)
+    except ValueError:
+        history = []
+    args = ScriptGenerator().generate_build_args(config)
+    return BuildEstimator(analyzer, config.build_tool, history).estimate(args, top)
+
+
+def format_duration(seconds: float) -> str:
+    """格式化秒数，如 12分30秒"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}秒"
+    return f"{seconds // 60}分{seconds % 60:02d}秒"
+
+
+def describe_estimate(estimate: Dict) -> List[str]:
+    """预估结果的显示行"""
+    builds = estimate["calibrated_builds"]
+    basis = f"按 {builds} 次历史构建校准" if builds else "未校准，无历史构建"
+    lines = [
+        f"预计编译耗时: 约 {format_duration(estimate['seconds'])} ({basis})",
+        f"预计峰值内存: 约 {format_size(estimate['peak_bytes'])}",
+        f"预计产物大小: 约 {format_size(estimate['output_bytes'])}",
+        f"编译源码: {estimate['modules']} 个模块，{format_size(estimate['source_bytes'])}",
+    ]
+    if estimate["contributors"]:
+        lines.append("主要贡献模块:")
+        for entry in estimate["contributors"]:
+            largest = ""
+            if entry["largest"] and entry["modules"] > 1:
+                largest = f" · 最大 {entry['largest'][0]} ({format_size(entry['largest'][1])})"
+            lines.append(
+                f"  {entry['name']}: {entry['share']:.0%} 耗时 (约 {format_duration(entry['seconds'])}) · "
+                f"{format_size(entry['output_bytes'])} 产物 · {entry['modules']} 个模块{largest}"
+            )
+        lines.append(f"  运行时/标准库/插件等固定开销: {estimate['overhead_share']:.0%} 耗时")
+    return lines
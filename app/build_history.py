@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+构建历史模块 - 读取生成的构建脚本写入的SQLite构建记录，显示趋势并检测性能回归
+
+数据库结构同时嵌入生成的构建脚本（见 HISTORY_SCHEMA），两端必须保持一致。
+"""
+
+import sqlite3
+import statistics
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .logger_utils import log_error, log_info, log_success, log_warning
+
+DEFAULT_HISTORY_DB = ".build_history.db"
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    tool TEXT,
+    app_name TEXT,
+    config_hash TEXT,
+    command TEXT,
+    status TEXT,
+    exit_code INTEGER,
+    reason TEXT,
+    duration_seconds REAL,
+    peak_rss_kb INTEGER,
+    artifact_bytes INTEGER,
+    cache_hits INTEGER,
+    cache_misses INTEGER
+);
+CREATE TABLE IF NOT EXISTS build_phases (
+    build_id INTEGER NOT NULL REFERENCES builds(id),
+    name TEXT NOT NULL,
+    status TEXT,
+    seconds REAL
+);
+CREATE TABLE IF NOT EXISTS build_packages (
+    build_id INTEGER NOT NULL REFERENCES builds(id),
+    package_type TEXT NOT NULL,
+    path TEXT,
+    bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_build_phases_build ON build_phases(build_id);
+CREATE INDEX IF NOT EXISTS idx_build_packages_build ON build_packages(build_id);
+"""
+
+# 低于该绝对变化量的波动不视为回归
+MIN_SECONDS_DELTA = 5.0
+MIN_BYTES_DELTA = 1024 * 1024
+MIN_RSS_KB_DELTA = 50 * 1024
+
+
+class BuildHistory:
+    """构建历史数据库读取器"""
+
+    def __init__(self, db_path: str = DEFAULT_HISTORY_DB):
+        self.db_path = self.resolve_path(db_path)
+
+    @staticmethod
+    def resolve_path(path: str) -> str:
+        """路径为目录时使用其中的默认数据库文件"""
+        if Path(path).is_dir():
+            return str(Path(path) / DEFAULT_HISTORY_DB)
+        return path
+
+    def load(self, app_name: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """读取最近的构建记录（按时间从旧到新），包含各阶段耗时和包大小
+
+        Raises:
+            ValueError: 数据库不存在或无法读取
+        """
+        if not Path(self.db_path).is_file():
+            raise ValueError(f"构建历史数据库不存在: {self.db_path}")
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                query = "SELECT * FROM builds"
+                params = []
+                if app_name:
+                    query += " WHERE app_name = ?"
+                    params.append(app_name)
+                query += " ORDER BY id DESC LIMIT ?"
+                params.append(limit)
+                builds = [dict(row) for row in conn.execute(query, params)][::-1]
+
+                for build in builds:
+                    build["phases"] = {
+                        row["name"]: {"status": row["status"], "seconds": row["seconds"]}
+                        for row in conn.execute(
+                            "SELECT name, status, seconds FROM build_phases WHERE build_id = ?",
+                            (build["id"],),
+                        )
+                    }
+                    build["packages"] = {
+                        row["package_type"]: {"path": row["path"], "bytes": row["bytes"]}
+                        for row in conn.execute(
+                            "SELECT package_type, path, bytes FROM build_packages WHERE build_id = ?",
+                            (build["id"],),
+                        )
+                    }
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            raise ValueError(f"读取构建历史失败: {e}")
+
+        return builds
+
+    @staticmethod
+    def get_metrics(build: Dict) -> Dict[str, float]:
+        """提取可比较的指标：{指标名: 数值}
+
+        总耗时、各阶段耗时和峰值内存只在实际执行了编译时计入，避免把跳过编译的增量构建当作基线。
+        """
+        metrics = {}
+        compile_phase = build["phases"].get("compile")
+        if compile_phase is None or compile_phase["status"] == "done":
+            if build.get("duration_seconds") is not None:
+                metrics["duration_seconds"] = build["duration_seconds"]
+            for name, phase in build["phases"].items():
+                if phase["status"] == "done" and phase["seconds"] is not None:
+                    metrics[f"phase:{name}"] = phase["seconds"]
+            if build.get("peak_rss_kb") is not None:
+                metrics["peak_rss_kb"] = build["peak_rss_kb"]
+        if build.get("artifact_bytes") is not None:
+            metrics["artifact_bytes"] = build["artifact_bytes"]
+        for pkg_type, package in build["packages"].items():
+            if package["bytes"] is not None:
+                metrics[f"package:{pkg_type}"] = package["bytes"]
+        return metrics
+
+    @classmethod
+    def detect_regressions(cls, builds: List[Dict], threshold: float = 0.2) -> List[Dict]:
+        """将最近一次成功构建与之前成功构建的中位数对比
+
+        Returns:
+            List[Dict]: 回归列表，每项包含 metric/baseline/current/ratio
+        """
+        successful = [b for b in builds if b["status"] == "success"]
+        if len(successful) < 2:
+            return []
+
+        latest = successful[-1]
+        history = [cls.get_metrics(b) for b in successful[:-1]]
+        regressions = []
+        for metric, current in cls.get_metrics(latest).items():
+            values = [m[metric] for m in history if metric in m]
+            if not values:
+                continue
+            baseline = statistics.median(values)
+            if baseline <= 0:
+                continue
+            ratio = current / baseline
+            if ratio > 1 + threshold and current - baseline >= cls._min_delta(metric):
+                regressions.append({
+                    "build_id": latest["id"],
+                    "metric": metric,
+                    "baseline": baseline,
+                    "current": current,
+                    "ratio": round(ratio, 3),
+                })
+        return regressions
+
+    @staticmethod
+    def _min_delta(metric: str) -> float:
+        if metric == "peak_rss_kb":
+            return MIN_RSS_KB_DELTA
+        if metric == "artifact_bytes" or metric.startswith("package:"):
+            return MIN_BYTES_DELTA
+        return MIN_SECONDS_DELTA
+
+    @staticmethod
+    def format_value(metric: str, value) -> str:
+        """按指标类型格式化数值"""
+        if value is None:
+            return "-"
+        if metric == "peak_rss_kb":
+            return f"{value / 1024:.1f}MB"
+        if metric == "artifact_bytes" or metric.startswith("package:"):
+            return f"{value / 1024 / 1024:.1f}MB"
+        return f"{value:.1f}s"
+
+    @classmethod
+    def display_trends(cls, builds: List[Dict], regressions: List[Dict]):
+        """显示构建趋势表和回归检测结果"""
+        log_info("=" * 60)
+        log_info("📈 构建历史趋势")
+        log_info("=" * 60)
+        log_info(f"{'ID':>5} {'开始时间':<19} {'状态':<4} {'耗时':>8} {'产物':>9} {'峰值内存':>9} {'缓存':>7}  配置")
+
+        previous_hash = None
+        for build in builds:
+            cache = f"{build['cache_hits'] or 0}/{(build['cache_hits'] or 0) + (build['cache_misses'] or 0)}"
+            config_hash = (build["config_hash"] or "")[:8]
+            changed = " *" if previous_hash and config_hash != previous_hash else ""
+            previous_hash = config_hash
+            line = (
+                f"{build['id']:>5} {(build['started_at'] or '')[:19]:<19} "
+                f"{'✅' if build['status'] == 'success' else '❌':<4} "
+                f"{cls.format_value('duration_seconds', build['duration_seconds']):>8} "
+                f"{cls.format_value('artifact_bytes', build['artifact_bytes']):>9} "
+                f"{cls.format_value('peak_rss_kb', build['peak_rss_kb']):>9} "
+                f"{cache:>7}  {config_hash}{changed}"
+            )
+            if build["status"] == "success":
+                log_info(line)
+            else:
+                log_error(f"{line}  {build['reason'] or ''}")
+
+        # 各阶段耗时：最近一次 vs 历史中位数
+        phase_names = []
+        for build in builds:
+            phase_names.extend(name for name in build["phases"] if name not in phase_names)
+        if phase_names:
+            log_info("-" * 60)
+            log_info(f"{'阶段':<16} {'最近':>8} {'中位数':>8}")
+            for name in phase_names:
+                values = [b["phases"][name]["seconds"] for b in builds
+                          if b["phases"].get(name, {}).get("status") == "done"]
+                if values:
+                    log_info(f"{name:<16} {values[-1]:>7.1f}s {statistics.median(values):>7.1f}s")
+
+        log_info("=" * 60)
+        if regressions:
+            log_warning(f"⚠️  检测到 {len(regressions)} 项回归 (构建 #{regressions[0]['build_id']}):")
+            for r in regressions:
+                log_warning(
+                    f"  {r['metric']}: {cls.format_value(r['metric'], r['baseline'])} -> "
+                    f"{cls.format_value(r['metric'], r['current'])} ({r['ratio']:.2f}x)"
+                )
+        else:
+            log_success("✅ 未检测到回归")
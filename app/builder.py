@@ -4,9 +4,12 @@ Nuitka脚本构建器核心类
 """
 
 import sys
+from pathlib import Path
 from loguru import logger
+from .build_config import BuildConfig
 from .config_collector import ConfigCollector
 from .script_generator import ScriptGenerator
+from .trace_utils import TRACER
 from .ui_utils import UIUtils
 
 # 配置loguru只显示时间，并启用彩色显示
@@ -63,54 +66,58 @@ class NuitkaScriptBuilder:
 
     def _generate_full_script(self):
         """生成完整脚本（编译 + Linux包生成）"""
-        # 生成参数
-        args = self.script_generator.generate_build_args(self.config_collector)
+        with TRACER.span("generate", mode="full"):
+            result = self.script_generator.generate(
+                BuildConfig.from_collector(self.config_collector), mode="full"
+            )
         tool_name = (
             "Nuitka" if self.config_collector.build_tool == "nuitka" else "PyInstaller"
         )
         logger.info(f"🔧 生成的{tool_name}参数:")
-        logger.info(" ".join(args))
-
-        # 生成Python脚本
-        python_script = self.script_generator.generate_python_script(
-            args, self.config_collector
-        )
+        logger.info(" ".join(result.args))
 
         # 保存脚本
         logger.info("💾 保存脚本...")
-        if self.script_generator.save_script(python_script, self.config_collector):
+        with TRACER.span("save_files"):
+            saved = self.script_generator.save_script(
+                result.script, self.config_collector
+            ) and self.script_generator.save_extra_files(
+                result.extra_files, self.config_collector
+            )
+        if saved:
             logger.success("🎉 完整脚本生成完成！")
             logger.info(
                 f"运行 python {self.config_collector.script_filename} 开始编译和打包"
             )
+            return True
+        return False
 
     def _generate_compile_script(self):
         """生成编译脚本（仅编译，不包含Linux包生成）"""
-        # 临时禁用Linux包生成
-        original_generate_linux_packages = self.config_collector.generate_linux_packages
-        self.config_collector.generate_linux_packages = False
-
-        # 生成参数
-        args = self.script_generator.generate_build_args(self.config_collector)
+        # 使用不可变配置快照生成，无需临时修改 config_collector
+        with TRACER.span("generate", mode="compile"):
+            result = self.script_generator.generate(
+                BuildConfig.from_collector(self.config_collector), mode="compile"
+            )
         tool_name = (
             "Nuitka" if self.config_collector.build_tool == "nuitka" else "PyInstaller"
         )
         logger.info(f" 生成的{tool_name}参数:")
-        logger.info(" ".join(args))
-
-        # 生成Python脚本
-        python_script = self.script_generator.generate_python_script(
-            args, self.config_collector
-        )
-
-        # 恢复原设置
-        self.config_collector.generate_linux_packages = original_generate_linux_packages
+        logger.info(" ".join(result.args))
 
         # 保存脚本
         logger.info(" 保存脚本...")
-        if self.script_generator.save_script(python_script, self.config_collector):
+        with TRACER.span("save_files"):
+            saved = self.script_generator.save_script(
+                result.script, self.config_collector
+            ) and self.script_generator.save_extra_files(
+                result.extra_files, self.config_collector
+            )
+        if saved:
             logger.success(" 编译脚本生成完成！")
             logger.info(f"运行 python {self.config_collector.script_filename} 开始编译")
+            return True
+        return False
 
     def _generate_package_script(self):
         """生成Linux包生成脚本"""
@@ -118,117 +125,60 @@ class NuitkaScriptBuilder:
         
         # 获取配置参数
         config = self.config_collector
-        
-        # 创建使用预配置参数的Linux包生成脚本
-        package_script_content = f'''
-# -*- coding: utf-8 -*-
-"""
-Linux包生成脚本
-自动生成的独立打包脚本
-使用预配置参数，无需重新输入
-"""
 
-import sys
-import os
-from pathlib import Path
+        package_script_content = self.script_generator.generate_package_script(config)
 
-# 添加app目录到Python路径
-sys.path.insert(0, str(Path(__file__).parent / "app"))
+        # 保存脚本
+        script_path = Path(config.project_dir) / config.script_filename
+        try:
+            with open(script_path, "w", encoding="utf-8") as f:
+                f.write(package_script_content)
+            logger.success(" Linux包生成脚本已保存！")
+            logger.info(f"运行 python {config.script_filename} 开始生成Linux包")
+            return True
+        except Exception as e:
+            logger.error(f" 保存脚本失败: {e}")
+            return False
 
-from app.package_generators import LinuxPackageGenerator
-from app.logger_utils import log_info, log_success, log_error
+    def _generate_for_mode(self, mode):
+        """根据运行模式生成对应脚本，返回是否成功"""
+        if mode == "package":
+            # 打包模式：生成独立的Linux包生成脚本
+            return self._generate_package_script()
+        elif mode == "compile":
+            # 编译模式：生成编译脚本（不包含Linux包生成）
+            return self._generate_compile_script()
+        else:
+            # 完整模式：生成包含Linux包生成的编译脚本
+            return self._generate_full_script()
 
-def main():
-    """主函数"""
-    try:
-        log_info("📦 Linux包生成脚本")
-        log_info("=" * 60)
-        
-        # 查找可执行文件
-        build_dirs = ["build", "dist"]
-        exe_file = None
-        
-        for build_dir in build_dirs:
-            build_path = Path(build_dir)
-            if build_path.exists():
-                for file_path in build_path.rglob("*"):
-                    if file_path.is_file() and file_path.suffix not in ['.spec', '.txt', '.log', '.exe']:
-                        if os.access(file_path, os.X_OK) or file_path.suffix == '':
-                            exe_file = str(file_path)
-                            break
-                if exe_file:
-                    break
-        
-        if not exe_file:
-            log_error("❌ 未找到可执行文件")
-            log_info("📝 请确保在 build/ 或 dist/ 目录中有可执行文件")
+    def run_from_config(self, config_path, mode=None):
+        """从配置文件非交互式生成脚本
+
+        Args:
+            config_path: 配置文件路径 (.json/.toml/pyproject.toml)
+            mode: 运行模式，未指定时使用配置文件中的 mode
+
+        Returns:
+            bool: 是否成功
+        """
+        from .config_loader import ConfigLoader
+
+        try:
+            with TRACER.span("load_config", path=config_path):
+                self.config_collector, mode = ConfigLoader.load(config_path, mode)
+        except ValueError as e:
+            logger.error(f"❌ {e}")
             return False
-        
-        log_info(f"📁 找到可执行文件: {{exe_file}}")
-        
-        # 使用预配置参数创建生成器
-        generator = LinuxPackageGenerator()
-        
-        # 设置预配置参数
-        generator.app_name = "{config.app_name}"
-        generator.version = "{config.file_version}"
-        generator.description = "{getattr(config, 'description', config.app_name + ' application')}"
-        generator.maintainer = "{getattr(config, 'company_name', 'Unknown')} <unknown@example.com>"
-        generator.url = "{getattr(config, 'url', '')}"
-        generator.license = "MIT"
-        generator.executable_path = exe_file
-        generator.install_path = "{getattr(config, 'package_install_path', '/usr/local/bin')}"
-        generator.packaging_tool = "{config.linux_packaging_tool}"
-        generator.package_types = {config.linux_package_types}
-        
-        # 设置扩展参数
-        generator.architecture = "{getattr(config, 'package_architecture', 'amd64')}"
-        generator.depends = {getattr(config, 'package_depends', [])}
-        generator.desktop_file = "{getattr(config, 'package_desktop_name', '')}"
-        generator.create_service = {getattr(config, 'package_create_service', False)}
-        generator.service_name = "{getattr(config, 'package_service_name', '')}"
-        generator.output_dir = "{getattr(config, 'package_output_dir', 'output_pkg')}"
-        
-        log_info("🚀 使用预配置参数开始打包...")
-        log_info(f"📝 应用名称: {{generator.app_name}}")
-        log_info(f"💻 目标架构: {{generator.architecture}}")
-        log_info(f"📁 安装路径: {{generator.install_path}}")
-        log_info(f"📦 包类型: {{', '.join(generator.package_types)}}")
-        log_info(f"📂 输出目录: {{generator.output_dir}}")
-        
-        # 生成包
-        success = generator.generate_packages()
-        
-        if success:
-            log_success("🎉 Linux包生成完成！")
-            log_info(f"📦 包文件已保存在: {{generator.output_dir}}/")
-        else:
-            log_error("❌ Linux包生成失败")
-            
-        return success
-        
-    except KeyboardInterrupt:
-        log_info("👋 用户取消操作")
-        return False
-    except Exception as e:
-        log_error(f"❌ 生成Linux包时发生错误: {{e}}")
-        return False
-    finally:
-        input("按下任意键退出...")
 
-if __name__ == "__main__":
-    main()
-'''
+        logger.success(f"✅ 已加载配置文件: {config_path} (模式: {mode})")
+        self.ui_utils.display_summary(self.config_collector)
 
-        # 保存脚本
-        script_filename = "create_packages.py"
         try:
-            with open(script_filename, "w", encoding="utf-8") as f:
-                f.write(package_script_content)
-            logger.success(" Linux包生成脚本已保存！")
-            logger.info(f"运行 python {script_filename} 开始生成Linux包")
+            return self._generate_for_mode(mode)
         except Exception as e:
-            logger.error(f" 保存脚本失败: {e}")
+            logger.error(f"❌ 发生错误: {e}")
+            return False
 
     def run(self):
         """运行CLI程序"""
@@ -244,15 +194,7 @@ if __name__ == "__main__":
             # 显示配置摘要
             self.ui_utils.display_summary(self.config_collector)
 
-            if mode == "package":
-                # 打包模式：生成独立的Linux包生成脚本
-                self._generate_package_script()
-            elif mode == "compile":
-                # 编译模式：生成编译脚本（不包含Linux包生成）
-                self._generate_compile_script()
-            else:
-                # 完整模式：生成包含Linux包生成的编译脚本
-                self._generate_full_script()
+            self._generate_for_mode(mode)
 
             # 暂停等待用户按键
             input("按下任意键退出...")
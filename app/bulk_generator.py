@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+批量生成模块 - 并行为多个项目配置生成构建脚本
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+from .logger_utils import log_info, log_success, log_error, log_warning
+from .trace_utils import TRACER, now_us
+
+
+CONFIG_SUFFIXES = [".json", ".toml"]
+
+
+def _has_pyproject_table(pyproject: Path) -> bool:
+    """检查pyproject.toml是否包含生成器配置表"""
+    from .config_loader import ConfigLoader
+
+    try:
+        ConfigLoader.read_file(str(pyproject))
+        return True
+    except ValueError:
+        return False
+
+
+def discover_configs(patterns: List[str]) -> List[str]:
+    """根据路径或通配符查找项目配置文件
+
+    - 配置文件 (.json/.toml): 直接使用
+    - 目录: 若 pyproject.toml 含 [tool.build-script] 则视为项目仓库，
+      否则使用目录下所有 .json/.toml 配置文件
+    """
+    configs = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for match in matches:
+            path = Path(match)
+            if path.is_file() and path.suffix.lower() in CONFIG_SUFFIXES:
+                configs.append(str(path))
+            elif path.is_dir():
+                pyproject = path / "pyproject.toml"
+                if pyproject.is_file() and _has_pyproject_table(pyproject):
+                    configs.append(str(pyproject))
+                    continue
+                for child in sorted(path.iterdir()):
+                    if (child.is_file() and child.suffix.lower() in CONFIG_SUFFIXES
+                            and child.name != "pyproject.toml"):
+                        configs.append(str(child))
+            else:
+                log_warning(f"⚠️  跳过无效路径: {match}")
+
+    # 去重并保持顺序
+    seen = set()
+    return [c for c in configs if not (c in seen or seen.add(c))]
+
+
+def generate_project(config_path: str, mode: Optional[str] = None) -> Dict:
+    """为单个项目配置生成脚本（在工作进程中执行）"""
+    from .build_config import BuildConfig
+    from .config_loader import ConfigLoader
+    from .script_generator import ScriptGenerator
+
+    start = time.perf_counter()
+    result = {"config": config_path, "mode": mode, "status": "failed", "scripts": [], "error": "",
+              "pid": os.getpid(), "started_us": now_us()}
+
+    try:
+        collector, mode = ConfigLoader.load(config_path, mode)
+        result["mode"] = mode
+        result["app_name"] = collector.app_name
+
+        config = BuildConfig.from_collector(collector)
+        generation = ScriptGenerator().generate(config, mode)
+
+        script_path = Path(config.project_dir) / generation.script_filename
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(generation.script)
+
+        result["scripts"].append(str(script_path))
+
+        for filename, content in generation.extra_files.items():
+            extra_path = Path(config.project_dir) / filename
+            with open(extra_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            result["scripts"].append(str(extra_path))
+        result["bytes"] = generation.metadata["script_bytes"]
+        result["status"] = "success"
+    except (ValueError, OSError) as e:
+        result["error"] = " ".join(str(e).split())
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+class BulkGenerator:
+    """批量脚本生成器 - 使用进程池并行处理多个项目"""
+
+    def __init__(self, workers: Optional[int] = None):
+        if workers is not None and workers < 1:
+            raise ValueError(f"工作进程数必须是正整数: {workers}")
+        self.workers = workers or os.cpu_count() or 1
+
+    def run(self, patterns: List[str], mode: Optional[str] = None) -> List[Dict]:
+        """批量生成脚本并输出状态表
+
+        Returns:
+            List[Dict]: 每个项目的生成结果
+        """
+        configs = discover_configs(patterns)
+        if not configs:
+            log_error("❌ 未找到任何项目配置")
+            return []
+
+        log_info(f"📦 共找到 {len(configs)} 个项目配置，使用 {self.workers} 个工作进程")
+
+        start = time.perf_counter()
+        results = []
+        if self.workers == 1:
+            results = [generate_project(config, mode) for config in configs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(generate_project, config, mode) for config in configs]
+                for future in as_completed(futures):
+                    results.append(future.result())
+        elapsed = time.perf_counter() - start
+
+        # 保持与输入一致的顺序
+        order = {config: i for i, config in enumerate(configs)}
+        results.sort(key=lambda r: order[r["config"]])
+
+        # 工作进程中的追踪器不会回传，按各项目的起止时间在主进程中补记区间
+        for r in results:
+            TRACER.add_span(
+                f"generate {r['config']}", r["started_us"], int(r["seconds"] * 1000000), "bulk",
+                pid=r["pid"], tid=r["pid"], args={"status": r["status"], "mode": r["mode"]},
+            )
+
+        self.display_results(results, elapsed)
+        return results
+
+    @staticmethod
+    def display_results(results: List[Dict], elapsed: float):
+        """显示每个项目的状态表和总吞吐量"""
+        log_info("=" * 60)
+        log_info("📋 批量生成结果")
+        log_info("=" * 60)
+
+        width = max([len(r["config"]) for r in results] + [4])
+        log_info(f"{'状态':<4} {'配置':<{width}} {'模式':<8} {'耗时(s)':>8}  脚本/错误")
+        for r in results:
+            detail = ", ".join(r["scripts"]) if r["status"] == "success" else r["error"]
+            line = f"{'✅' if r['status'] == 'success' else '❌':<4} {r['config']:<{width}} {str(r['mode'] or '-'):<8} {r['seconds']:>8.3f}  {detail}"
+            if r["status"] == "success":
+                log_success(line)
+            else:
+                log_error(line)
+
+        succeeded = sum(1 for r in results if r["status"] == "success")
+        throughput = len(results) / elapsed if elapsed > 0 else 0.0
+        log_info("=" * 60)
+        log_info(
+            f"✅ 成功 {succeeded} / {len(results)}，总耗时 {elapsed:.2f}s，吞吐量 {throughput:.1f} 项目/秒"
+        )
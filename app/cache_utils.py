@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+磁盘缓存工具模块 - 生成器各类分析结果（导入扫描、插件列表等）的JSON缓存
+
+缓存目录默认为 $XDG_CACHE_HOME/python-build-script-generator（未设置时为 ~/.cache/...），
+可通过环境变量 BUILD_SCRIPT_CACHE_DIR 指定；缓存损坏或无法写入时视为未命中，不影响生成。
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+CACHE_DIR_ENV = "BUILD_SCRIPT_CACHE_DIR"
+CACHE_DIR_NAME = "python-build-script-generator"
+
+
+def get_cache_dir() -> Path:
+    """缓存目录（不保证已存在）"""
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / CACHE_DIR_NAME
+
+
+def load_json_cache(name: str) -> Optional[Any]:
+    """读取缓存文件，不存在或损坏时返回None"""
+    try:
+        with open(get_cache_dir() / name, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_json_cache(name: str, data: Any) -> bool:
+    """原子写入缓存文件（先写临时文件再重命名，并发写入时后写者覆盖），返回是否成功"""
+    path = get_cache_dir() / name
+    temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp, path)
+        return True
+    except OSError:
+        try:
+            temp.unlink()
+        except OSError:
+            pass
+        return False
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+--collect-all 收窄模块 - 根据导入追踪和静态导入图，把 PyInstaller 的 --collect-all
+替换为应用实际需要的子模块（--hidden-import）、数据文件（--add-data）、动态库（--add-binary）
+和发行包元数据（--copy-metadata）
+
+--collect-all 会在子进程中导入包的全部子模块，大型包（如 transformers）会让 Analysis 慢几分钟。
+"""
+
+import importlib.util
+import os
+from importlib import metadata
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Set, Tuple
+
+from .import_tracer import compute_hidden_imports
+
+# 包内文件占位符：@pkg:包名/包内路径。构建脚本在运行编译工具的环境（隔离构建时为构建环境）中
+# 查找包目录并替换为绝对路径，生成的脚本不绑定生成器所在环境的 site-packages
+PACKAGE_PATH_PREFIX = "@pkg:"
+
+
+def _under(name: str, package: str) -> bool:
+    return name == package or name.startswith(package + ".")
+
+
+def _package_file_args(package: str, relative_paths: List[str]) -> List[str]:
+    """包内文件 -> "@pkg:包名/包内路径{分隔符}目标目录"，目标目录保持包内的相对位置"""
+    entries = []
+    for relative in relative_paths:
+        destination = PurePosixPath(package, relative).parent.as_posix()
+        entries.append(f"{PACKAGE_PATH_PREFIX}{package}/{relative}{os.pathsep}{destination}")
+    return entries
+
+
+def split_package_file_arg(arg: str) -> Optional[Tuple[str, str, str, str]]:
+    """--add-data=@pkg:包名/包内路径{分隔符}目标目录 -> (选项, 包名, 包内路径, 目标目录)，不是占位符时返回None"""
+    option, sep, value = arg.partition("=")
+    if not sep or not value.startswith(PACKAGE_PATH_PREFIX):
+        return None
+    index = max(value.rfind(";"), value.rfind(":"))
+    if index < len(PACKAGE_PATH_PREFIX):
+        return None
+    package, _, relative = value[len(PACKAGE_PATH_PREFIX):index].partition("/")
+    return option, package, relative, value[index + 1:]
+
+
+def _find_package_dir(package: str) -> Optional[str]:
+    try:
+        spec = importlib.util.find_spec(package)
+    except (ImportError, ValueError):
+        return None
+    if spec is None:
+        return None
+    if spec.submodule_search_locations:
+        return list(spec.submodule_search_locations)[0]
+    return os.path.dirname(spec.origin) if spec.origin else None
+
+
+def resolve_package_file_args(args: List[str]) -> List[str]:
+    """在当前环境中把包内文件占位符解析为绝对路径（build.ninja 直接调用编译工具，只能在生成时解析）"""
+    resolved = []
+    for arg in args:
+        parts = split_package_file_arg(arg)
+        package_dir = _find_package_dir(parts[1]) if parts else None
+        if package_dir:
+            option, _, relative, destination = parts
+            arg = f"{option}={os.path.join(package_dir, *PurePosixPath(relative).parts)}{os.pathsep}{destination}"
+        resolved.append(arg)
+    return resolved
+
+
+def plan_collect_all(package: str, static_modules: Set[str], trace: Optional[Dict],
+                     package_distributions: Optional[Dict[str, List[str]]] = None) -> Dict:
+    """为一个 --collect-all 包制定收窄方案
+
+    Args:
+        package_distributions: {顶层模块名: [发行包名]}，默认读取当前环境（importlib.metadata.packages_distributions）
+
+    Returns:
+        Dict: {"package", "action": "narrow" | "drop" | "keep", "reason",
+        "hidden_imports", "add_data", "add_binary", "copy_metadata"}
+    """
+    plan = {"package": package, "action": "keep", "reason": "", "hidden_imports": [], "add_data": [], "add_binary": [],
+            "copy_metadata": []}
+    statically_reached = any(_under(name, package) for name in static_modules)
+    traced = {name: file for name, file in (trace or {}).get("modules", {}).items() if _under(name, package)}
+
+    if not traced:
+        if trace is not None and not statically_reached:
+            plan.update(action="drop", reason="运行时未加载且静态导入图中未出现")
+        elif trace is None:
+            plan["reason"] = "没有可用的导入追踪结果，无法确定动态导入"
+        else:
+            plan["reason"] = "静态导入图中出现但追踪运行未加载（冒烟测试未覆盖）"
+        return plan
+
+    importers = trace.get("importers", {})
+    plan["hidden_imports"] = compute_hidden_imports(traced, static_modules, importers)
+    package_file = traced.get(package)
+    if package_file and Path(package_file).name.startswith("__init__."):
+        plan["add_data"] = _package_file_args(package, trace.get("package_data", {}).get(package, []))
+        plan["add_binary"] = _package_file_args(package, trace.get("package_binaries", {}).get(package, []))
+    # --collect-all 会复制包所属发行包的元数据，收窄后同样复制；运行时读取过的元数据一并加入
+    if package_distributions is None:
+        package_distributions = metadata.packages_distributions()
+    distributions = set(package_distributions.get(package, []))
+    distributions.update(trace.get("package_metadata", {}).get(package, []))
+    plan["copy_metadata"] = sorted(distributions)
+    plan.update(action="narrow", reason="按追踪结果收集")
+    return plan
+
+
+def plan_collect_all_packages(packages: List[str], static_modules: Set[str], trace: Optional[Dict]) -> List[Dict]:
+    """为每个 --collect-all 包制定收窄方案（只读取一次当前环境的发行包信息）"""
+    package_distributions = metadata.packages_distributions() if trace else {}
+    return [plan_collect_all(package, static_modules, trace, package_distributions) for package in packages]
+
+
+def apply_collect_plans(collector, plans: List[Dict]):
+    """按方案修改配置：移除被收窄或未使用的 collect_all，追加隐藏导入、数据文件、动态库和元数据"""
+    dropped = {plan["package"] for plan in plans if plan["action"] != "keep"}
+    collector.collect_all = [package for package in collector.collect_all if package not in dropped]
+    for plan in plans:
+        for field in ("hidden_imports", "add_data", "add_binary", "copy_metadata"):
+            target = getattr(collector, field)
+            target.extend(item for item in plan[field] if item not in target)
+
+
+def narrow_collect_all(collector, static_modules: Set[str], trace: Optional[Dict]) -> List[Dict]:
+    """收窄 collector.collect_all 并返回每个包的方案（见 plan_collect_all）"""
+    plans = plan_collect_all_packages(collector.collect_all, static_modules, trace)
+    apply_collect_plans(collector, plans)
+    return plans
+
+
+def describe_plan(plan: Dict) -> str:
+    """方案的一行说明"""
+    package = plan["package"]
+    if plan["action"] == "drop":
+        return f"{package}: 移除 --collect-all（{plan['reason']}）"
+    if plan["action"] == "keep":
+        return f"{package}: 保留 --collect-all（{plan['reason']}）"
+    return (
+        f"{package}: --collect-all → {len(plan['hidden_imports'])} 个隐藏导入、"
+        f"{len(plan['add_data'])} 个数据文件、{len(plan['add_binary'])} 个动态库、"
+        f"{len(plan['copy_metadata'])} 个发行包元数据"
+    )
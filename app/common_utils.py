@@ -5,6 +5,7 @@
 
 import shutil
 import subprocess
+import time
 from typing import Dict, List, Tuple, Optional
 from .logger_utils import log_info, log_success, log_warning, log_error
 
@@ -35,6 +36,44 @@ class ToolChecker:
         except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
             return False
     
+    @staticmethod
+    def probe_command(command: str, version_arg: str = "--version", timeout: int = 10) -> Dict:
+        """探测命令并记录状态、路径、版本和耗时
+
+        Args:
+            command: 命令名称
+            version_arg: 版本参数
+            timeout: 超时时间（秒）
+
+        Returns:
+            Dict: {'name', 'installed', 'path', 'version', 'latency_ms'}
+        """
+        probe = {
+            'name': command,
+            'installed': False,
+            'path': shutil.which(command),
+            'version': None,
+            'latency_ms': 0.0,
+        }
+
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(
+                [command, version_arg],
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+            probe['installed'] = result.returncode == 0
+            if probe['installed']:
+                output = result.stdout.strip() or result.stderr.strip()
+                probe['version'] = output.splitlines()[0].strip() if output else None
+        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+            pass
+        probe['latency_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+        return probe
+
     @staticmethod
     def check_tools_batch(tools: List[Tuple[str, str, str]], category_name: str) -> List[str]:
         """批量检查工具
@@ -8,9 +8,10 @@ from pathlib import Path
 from typing import Optional
 from .logger_utils import log_info, log_success, log_error, log_warning
 from .interactive_menu import InteractiveMenu
-from .plugins import get_plugin_list
+from .plugins import get_plugin_list, detect_plugins, find_unmatched_plugins, get_plugin_triggers
 from .config_validators import ConfigValidators
 from .input_handlers import InputHandlers
+from .dist_footprint import load_footprint_index, describe_footprint, format_size
 
 
 class ConfigCollector:
@@ -26,7 +27,15 @@ class ConfigCollector:
         self.output_dir: str = "build"
         self.app_name: Optional[str] = None
         self.enable_plugins: list = []
+        self.include_modules: list = []  # Nuitka强制包含的模块
         self.exclude_packages: list = []
+        self.auto_exclude_packages: bool = False  # 配置文件模式：自动排除导入图中未使用的包
+        self.auto_enable_plugins: bool = False  # 配置文件模式：根据导入自动启用Nuitka插件
+        # 运行时导入追踪
+        self.trace_imports: bool = False  # 运行入口文件或冒烟测试，记录动态导入
+        self.trace_command: str = ""  # 冒烟测试，如 "tests/smoke.py" 或 "-m pytest -x tests"
+        self.trace_timeout: int = 20  # 追踪超时（秒）
+        self.narrow_collect_all: bool = False  # 配置文件模式：按导入分析收窄 --collect-all
         self.copy_dirs: list = []
         self.company_name: str = ""
         self.file_version: str = "1.0.0"
@@ -40,6 +49,8 @@ class ConfigCollector:
         self.remove_output: bool = False
         # PyInstaller特有选项
         self.add_data: list = []  # 添加数据文件
+        self.add_binary: list = []  # 添加动态库
+        self.copy_metadata: list = []  # 复制发行包元数据
         self.hidden_imports: list = []  # 隐藏导入
         self.collect_all: list = []  # 收集所有子模块
         self.upx_dir: Optional[str] = None  # UPX压缩工具路径
@@ -58,6 +69,15 @@ class ConfigCollector:
         self.package_create_service: bool = False  # 是否创建服务
         self.package_service_name: str = ""  # 服务名称
         self.package_output_dir: str = "output_pkg"  # 输出目录
+        
+        # 构建图选项
+        self.generate_ninja: bool = False  # 是否同时生成 build.ninja
+        # 隔离构建环境：构建脚本默认在只包含项目依赖的虚拟环境中编译
+        self.isolated_build: bool = False
+
+        # 导入图分析结果（插件检测和包排除共用，None 表示尚未分析）
+        self._import_analyzer = None
+        self._footprint_index = None
 
     def get_project_dir(self):
         """获取项目根目录"""
@@ -305,6 +325,12 @@ class ConfigCollector:
         # 包排除选择
         self.get_exclude_packages_settings()
 
+        # 运行时导入追踪
+        self.get_import_trace_settings()
+
+        # 收窄 --collect-all
+        self.get_collect_all_narrowing_settings()
+
         # 需要复制的目录
         log_info("📁 需要复制到输出目录的文件夹 (可选，多个用逗号分隔):")
         self.copy_dirs = InputHandlers.get_list_input(
@@ -322,26 +348,106 @@ class ConfigCollector:
         self.script_filename = ConfigValidators.validate_script_filename(filename)
         log_success(f"✅ 脚本文件名: {self.script_filename}")
 
+    def get_build_graph_settings(self):
+        """获取构建图设置"""
+        self.generate_ninja = InputHandlers.get_yes_no_input(
+            "🕸️  是否同时生成 build.ninja 构建图?",
+            "n",
+            help_text="build.ninja 将编译、资源复制、各类型Linux包和校验和建模为带文件依赖的规则，可用 ninja 增量构建并通过 -j 并行执行",
+        )
+        self._log_boolean_choice(
+            self.generate_ninja, "将同时生成 build.ninja", "不生成 build.ninja"
+        )
+
+    def get_isolated_build_settings(self):
+        """获取隔离构建环境设置"""
+        self.isolated_build = InputHandlers.get_yes_no_input(
+            "🧪 是否默认在隔离环境中构建?",
+            "n",
+            help_text="构建脚本按锁文件（uv.lock/poetry.lock/pdm.lock/requirements.txt）创建只包含项目依赖的虚拟环境，"
+                      "编译工具不会分析开发环境中无关的包；环境按锁文件哈希缓存在 .build_env/ 下",
+        )
+        self._log_boolean_choice(
+            self.isolated_build, "默认在隔离环境中构建 (--no-isolated 可关闭)",
+            "默认使用当前环境构建 (--isolated 可开启)",
+        )
+
     def get_plugin_settings(self):
-        """获取插件设置"""
-        enable_plugins = InputHandlers.get_yes_no_input("🔌 是否启用额外插件?", "n")
+        """获取插件设置（根据入口文件的导入预选插件）"""
+        suggested = self._detect_plugins()
+        enable_plugins = InputHandlers.get_yes_no_input(
+            "🔌 是否启用额外插件?", "y" if suggested else "n"
+        )
 
         if enable_plugins:
-            self._get_plugins_interactive()
+            self._get_plugins_interactive(suggested)
+            self._warn_unmatched_plugins()
         else:
             log_info("⏭️  跳过插件选择")
             self.enable_plugins = []
 
-    def _get_plugins_interactive(self):
-        """交互式界面选择插件"""
+    def _get_import_analyzer(self):
+        """构建入口文件的导入图（插件检测和包排除共用），失败时返回None"""
+        if self._import_analyzer is None:
+            self._import_analyzer = False
+            if self.entry_file:
+                try:
+                    from .import_analyzer import ImportGraphAnalyzer
+
+                    log_info("🔍 正在分析入口文件的导入图...")
+                    analyzer = ImportGraphAnalyzer(self.project_dir, self.entry_file)
+                    analyzer.build_graph()
+                    self._import_analyzer = analyzer
+                except Exception as e:
+                    log_warning(f"⚠️  导入图分析失败: {e}")
+        return self._import_analyzer or None
+
+    def _detect_plugins(self):
+        """根据导入图推断需要启用的Nuitka插件"""
+        analyzer = self._get_import_analyzer()
+        if analyzer is None:
+            return []
+        modules = analyzer.get_reached_modules()
+        detected, dropped = detect_plugins(modules)
+        for plugin in detected:
+            log_info(f"💡 检测到导入 {', '.join(get_plugin_triggers(plugin, modules))}，建议启用插件: {plugin}")
+        if dropped:
+            log_warning(
+                f"⚠️  检测到多个Qt绑定，Nuitka只能启用一个Qt插件，"
+                f"未预选: {', '.join(dropped)}"
+            )
+        return detected
+
+    def _warn_unmatched_plugins(self):
+        """提示已启用但入口文件没有对应导入的插件（多余插件会拖慢编译）"""
+        analyzer = self._get_import_analyzer()
+        if analyzer is None or not self.enable_plugins:
+            return
+        for plugin in find_unmatched_plugins(self.enable_plugins, analyzer.get_reached_modules()):
+            log_warning(f"⚠️  已启用插件 {plugin}，但入口文件的导入图中没有对应导入，可能拖慢编译")
+
+    def _get_plugins_interactive(self, suggested=None):
+        """交互式界面选择插件
+
+        Args:
+            suggested: 根据导入检测到的插件，在菜单中预选
+        """
         menu = InteractiveMenu()
+        suggested = suggested or []
 
-        # 从plugins模块获取插件列表
-        plugin_items = get_plugin_list()
+        # 从plugins模块获取插件列表，标记检测到的插件
+        plugin_items = [
+            (key, f"{desc} 💡检测到导入" if key in suggested else desc)
+            for key, desc in get_plugin_list()
+        ]
 
         # 显示交互式菜单
         try:
-            selected_keys = menu.show_menu("🔌 选择需要启用的插件", plugin_items)
+            selected_keys = menu.show_menu(
+                "🔌 选择需要启用的插件（已预选检测到的插件）" if suggested else "🔌 选择需要启用的插件",
+                plugin_items,
+                suggested,
+            )
 
             if selected_keys:
                 # 处理自定义插件输入
@@ -395,20 +501,137 @@ class ConfigCollector:
 
         return custom_plugins
 
+    def get_import_trace_settings(self):
+        """获取运行时导入追踪设置（运行入口文件或冒烟测试，记录静态分析发现不了的动态导入）"""
+        self.trace_imports = InputHandlers.get_yes_no_input(
+            "🔬 是否运行程序追踪运行时导入?",
+            "n",
+            help_text="在导入钩子下运行入口文件或冒烟测试，记录实际加载但静态分析发现不了的模块（插件、动态导入等），"
+                      "自动加入隐藏导入（PyInstaller）或 --include-module（Nuitka）。注意：会实际执行程序",
+        )
+        if not self.trace_imports:
+            log_info("⏭️  跳过导入追踪")
+            return
+
+        self.trace_command = InputHandlers.get_text_input(
+            "🧪 冒烟测试命令 (可选，留空则运行入口文件)",
+            "",
+            help_text="在项目目录中用当前解释器执行，如 tests/smoke.py --quick 或 -m pytest -x tests/smoke。"
+                      "GUI或服务程序到超时时间后会被结束并保存已加载的模块",
+        )
+        self.trace_timeout = InputHandlers.get_integer_input(
+            "⏱️  追踪超时秒数", self.trace_timeout, 1,
+            help_text="超过该时间仍未退出时，记录已加载的模块并结束进程",
+        )
+
+        analyzer = self._get_import_analyzer()
+        if analyzer is None:
+            log_warning("⚠️  无法分析入口文件的导入图，跳过导入追踪")
+            return
+        try:
+            from .import_tracer import ImportTracer, apply_import_trace
+
+            result = ImportTracer.from_config(self).trace(analyzer.get_reached_modules())
+        except Exception as e:
+            log_warning(f"⚠️  导入追踪失败: {e}")
+            return
+
+        added = apply_import_trace(self, result)
+        if added:
+            field = "隐藏导入" if self.build_tool == "pyinstaller" else "包含模块"
+            log_success(f"✅ {field}新增 {len(added)} 个: {', '.join(added)}")
+        else:
+            log_info("💡 运行时加载的模块均已被静态分析发现，无需额外导入")
+        if result.get("project_files"):
+            log_info(f"📁 运行时读取的项目文件（可能需要复制或添加为数据文件）: {', '.join(result['project_files'][:10])}")
+
+    def get_collect_all_narrowing_settings(self):
+        """根据导入追踪和静态导入图，把 --collect-all 替换为实际需要的子模块和数据文件"""
+        if self.build_tool != "pyinstaller" or not self.collect_all:
+            return
+        analyzer = self._get_import_analyzer()
+        if analyzer is None:
+            return
+        try:
+            from .collect_narrower import plan_collect_all_packages, apply_collect_plans, describe_plan
+            from .import_tracer import ImportTracer
+
+            trace = ImportTracer.from_config(self).load_fresh()
+            static_modules = analyzer.get_reached_modules()
+            plans = plan_collect_all_packages(self.collect_all, static_modules, trace)
+        except Exception as e:
+            log_warning(f"⚠️  分析 --collect-all 失败: {e}")
+            return
+
+        if all(plan["action"] == "keep" for plan in plans):
+            log_info("💡 开启导入追踪后可将 --collect-all 收窄为实际需要的子模块和数据文件")
+            return
+        for plan in plans:
+            log_info(f"📚 {describe_plan(plan)}")
+        if InputHandlers.get_yes_no_input(
+            "✂️  是否按以上方案收窄 --collect-all?",
+            "y",
+            help_text="--collect-all 会导入包的全部子模块，大型包会让 PyInstaller 分析慢几分钟。"
+                      "收窄后只收集追踪运行中实际加载的子模块、读取的数据文件、动态库和所属发行包的元数据",
+        ):
+            apply_collect_plans(self, plans)
+            log_success(f"✅ 剩余 --collect-all: {', '.join(self.collect_all) or '无'}")
+
     def get_exclude_packages_settings(self):
-        """获取包排除设置"""
+        """获取包排除设置（根据入口文件的导入图预选未使用的包）"""
+        unused = self._get_unused_packages()
+        if unused:
+            footprint = self._get_footprint_index()
+            names = [
+                f"{d['name']} ({format_size(footprint[d['key']]['size_bytes'])})" if d["key"] in footprint else d["name"]
+                for d in unused
+            ]
+            log_info(f"💡 以下已安装包未被入口文件导入，建议排除: {', '.join(names)}")
+
         exclude_packages = InputHandlers.get_yes_no_input(
-            "🚫 是否排除某些包的导入?", "n"
+            "🚫 是否排除某些包的导入?", "y" if unused else "n"
         )
 
         if exclude_packages:
-            self._get_exclude_packages_interactive()
+            self._get_exclude_packages_interactive(unused)
         else:
             log_info("⏭️  跳过包排除设置")
             self.exclude_packages = []
 
+    def _get_unused_packages(self):
+        """静态分析入口文件的导入图，返回从未被导入的已安装包"""
+        analyzer = self._get_import_analyzer()
+        if analyzer is None:
+            return []
+        try:
+            unused = analyzer.find_unused_distributions()
+        except Exception as e:
+            log_warning(f"⚠️  导入图分析失败: {e}")
+            return []
+
+        log_info(f"📊 导入图共 {len(analyzer.graph)} 个模块，{len(unused)} 个已安装包未被导入")
+        return unused
+
+    def _get_footprint_index(self):
+        """当前环境已安装包的体积索引（按环境缓存），失败时返回空字典"""
+        if self._footprint_index is None:
+            try:
+                self._footprint_index = load_footprint_index()
+            except Exception as e:
+                log_warning(f"⚠️  统计已安装包体积失败: {e}")
+                self._footprint_index = {}
+        return self._footprint_index
+
     def _get_installed_packages(self):
-        """获取当前环境已安装的包列表"""
+        """获取当前环境已安装的包列表（按磁盘占用从大到小排序，附体积和反向依赖）"""
+        footprint = self._get_footprint_index()
+        if footprint:
+            ranked = sorted(footprint.items(), key=lambda item: (-item[1]["size_bytes"], item[0]))
+            return [
+                (key, f"{key} ({entry['version']}) · {describe_footprint(entry)}")
+                for key, entry in ranked
+            ]
+
         try:
             from importlib import metadata
 
@@ -427,9 +650,17 @@ class ConfigCollector:
             log_warning(f"⚠️  获取已安装包列表失败: {e}")
             return []
 
-    def _get_exclude_packages_interactive(self):
-        """交互式界面选择要排除的包"""
+    def _get_exclude_packages_interactive(self, suggested=None):
+        """交互式界面选择要排除的包
+
+        Args:
+            suggested: 导入图分析得到的未使用包，在菜单中预选
+        """
+        from .import_analyzer import get_distribution_modules
+
         menu = InteractiveMenu()
+        suggested = suggested or []
+        suggested_keys = {dist["key"] for dist in suggested}
 
         # 获取已安装的包列表
         log_info("📦 正在获取当前环境已安装的包...")
@@ -440,12 +671,25 @@ class ConfigCollector:
             self._get_exclude_packages_manual()
             return
 
-        # 添加手动输入选项
-        package_items = installed_packages + [("__manual__", "🔧 手动输入包名")]
+        # 排除参数需要模块名而不是发行包名（如 pyyaml -> yaml）
+        try:
+            dist_modules = {key: dist["modules"] for key, dist in get_distribution_modules().items()}
+        except Exception:
+            dist_modules = {}
+
+        # 标记未使用的包并添加手动输入选项
+        package_items = [
+            (key, f"{desc} 💡未使用" if key in suggested_keys else desc)
+            for key, desc in installed_packages
+        ] + [("__manual__", "🔧 手动输入包名")]
 
         # 显示交互式菜单
         try:
-            selected_keys = menu.show_menu("🚫 选择要排除导入的包", package_items)
+            selected_keys = menu.show_menu(
+                "🚫 选择要排除导入的包（已预选未被导入的包）" if suggested_keys else "🚫 选择要排除导入的包",
+                package_items,
+                sorted(suggested_keys),
+            )
 
             if selected_keys:
                 # 处理选择结果
@@ -456,10 +700,14 @@ class ConfigCollector:
                         manual_excludes = self._get_exclude_packages_manual()
                         final_excludes.extend(manual_excludes)
                     else:
-                        final_excludes.append(package_key)
+                        final_excludes.extend(
+                            m for m in dist_modules.get(package_key) or [package_key]
+                            if m not in final_excludes
+                        )
 
                 self.exclude_packages = final_excludes
                 log_success(f"✅ 已选择排除包: {', '.join(final_excludes)}")
+                self._log_exclude_savings(selected_keys)
             else:
                 log_info("⏭️  跳过包排除设置")
                 self.exclude_packages = []
@@ -468,6 +716,20 @@ class ConfigCollector:
             log_info("⏭️  跳过包排除设置")
             self.exclude_packages = []
 
+    def _log_exclude_savings(self, selected_keys):
+        """汇总所选排除包的体积，并提示仍被其他未排除包依赖的包"""
+        footprint = self._get_footprint_index()
+        selected = [key for key in selected_keys if key in footprint]
+        if not selected:
+            return
+        total_bytes = sum(footprint[key]["size_bytes"] for key in selected)
+        total_modules = sum(footprint[key]["py_modules"] for key in selected)
+        log_info(f"📉 排除的包共 {format_size(total_bytes)}、{total_modules} 个Python模块")
+        for key in selected:
+            dependents = [d for d in footprint[key]["required_by"] if d not in selected]
+            if dependents:
+                log_warning(f"⚠️  {key} 被 {', '.join(dependents)} 依赖，若这些包被导入，排除后可能运行失败")
+
     def _get_exclude_packages_manual(self):
         """手动输入要排除的包名"""
         manual_excludes = []
@@ -624,6 +886,8 @@ class ConfigCollector:
             self.get_console_settings()
             self.get_additional_settings()
             self.get_script_filename()
+            self.get_build_graph_settings()
+            self.get_isolated_build_settings()
 
         if mode in ["full", "package"]:
             # Linux包生成配置
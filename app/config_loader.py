@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+配置文件加载模块 - 从TOML/JSON文件或pyproject.toml加载完整构建配置，无需交互输入
+"""
+
+import json
+import tomllib
+from pathlib import Path
+from typing import List, Optional, Tuple
+from .config_collector import ConfigCollector
+from .config_validators import ConfigValidators
+from .logger_utils import log_info, log_warning
+from .plugins import is_valid_plugin, detect_plugins, find_unmatched_plugins, QT_PLUGINS
+
+
+# pyproject.toml 中的配置表名称: [tool.build-script]
+PYPROJECT_TABLE = "build-script"
+
+VALID_MODES = ["full", "compile", "package"]
+
+# 各配置项的期望类型
+BOOL_FIELDS = [
+    "show_console", "standalone", "onefile", "uac_admin", "quiet_mode",
+    "show_progressbar", "remove_output", "debug", "clean",
+    "generate_linux_packages", "package_create_service", "generate_ninja",
+    "auto_exclude_packages", "auto_enable_plugins", "trace_imports", "narrow_collect_all",
+    "isolated_build",
+]
+LIST_FIELDS = [
+    "enable_plugins", "include_modules", "exclude_packages", "copy_dirs", "add_data", "add_binary", "hidden_imports",
+    "copy_metadata", "collect_all", "linux_package_types", "package_depends",
+]
+STR_FIELDS = [
+    "project_dir", "entry_file", "icon_file", "build_tool", "compiler", "output_dir",
+    "app_name", "company_name", "file_version", "script_filename", "upx_dir",
+    "linux_packaging_tool", "package_architecture", "package_install_path",
+    "package_desktop_name", "package_service_name", "package_output_dir", "trace_command",
+]
+INT_FIELDS = ["jobs", "trace_timeout"]
+
+
+class ConfigLoader:
+    """配置文件加载器 - 读取、校验配置文件并填充ConfigCollector"""
+
+    @staticmethod
+    def read_file(config_path: str) -> dict:
+        """读取配置文件，返回原始配置字典
+
+        支持 .json、.toml 以及 pyproject.toml 中的 [tool.build-script] 表
+        """
+        path = Path(config_path)
+        if not path.is_file():
+            raise ValueError(f"配置文件不存在: {config_path}")
+
+        try:
+            if path.suffix.lower() == ".json":
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            elif path.suffix.lower() == ".toml":
+                with open(path, "rb") as f:
+                    data = tomllib.load(f)
+            else:
+                raise ValueError(f"不支持的配置文件格式: {path.suffix} (仅支持 .json/.toml)")
+        except (json.JSONDecodeError, tomllib.TOMLDecodeError) as e:
+            raise ValueError(f"配置文件解析失败: {e}")
+
+        if path.name == "pyproject.toml":
+            data = data.get("tool", {}).get(PYPROJECT_TABLE)
+            if data is None:
+                raise ValueError(f"pyproject.toml 中缺少 [tool.{PYPROJECT_TABLE}] 配置表")
+
+        if not isinstance(data, dict):
+            raise ValueError("配置文件顶层必须是键值表")
+
+        return data
+
+    @staticmethod
+    def load(config_path: str, mode: str = None) -> Tuple[ConfigCollector, str]:
+        """加载并校验配置文件
+
+        Args:
+            config_path: 配置文件路径
+            mode: 运行模式，未指定时读取配置文件中的 mode 字段（默认 full）
+
+        Returns:
+            Tuple[ConfigCollector, str]: 填充好的配置对象和运行模式
+
+        Raises:
+            ValueError: 配置文件无法读取或校验失败（包含所有错误信息）
+        """
+        data = dict(ConfigLoader.read_file(config_path))
+        file_mode = data.pop("mode", "full")
+        mode = mode or file_mode
+
+        # 相对路径以配置文件所在目录为基准
+        base_dir = Path(config_path).resolve().parent
+        data.setdefault("project_dir", ".")
+        if not Path(data["project_dir"]).is_absolute():
+            data["project_dir"] = str(base_dir / data["project_dir"])
+
+        collector = ConfigCollector()
+        errors = ConfigLoader.apply(data, collector, mode)
+        if errors:
+            raise ValueError("配置校验失败:\n  - " + "\n  - ".join(errors))
+
+        return collector, mode
+
+    @staticmethod
+    def apply(data: dict, collector: ConfigCollector, mode: str = "full") -> List[str]:
+        """校验配置字典并写入ConfigCollector，返回错误列表"""
+        errors = []
+
+        if mode not in VALID_MODES:
+            errors.append(f"mode 必须是 {', '.join(VALID_MODES)} 之一: {mode}")
+            return errors
+
+        errors.extend(ConfigLoader._check_types(data))
+        if errors:
+            return errors
+
+        for key, value in data.items():
+            setattr(collector, key, list(value) if isinstance(value, list) else value)
+
+        if mode == "package":
+            # 打包模式只需要应用信息和Linux包配置
+            collector.generate_linux_packages = True
+            if "script_filename" not in data:
+                collector.script_filename = "create_packages.py"
+            collector.app_name = collector.app_name or "app"
+        else:
+            errors.extend(ConfigLoader._validate_compile_settings(data, collector))
+            check_plugins = collector.build_tool == "nuitka" and (
+                collector.auto_enable_plugins or collector.enable_plugins
+            )
+            narrow = collector.narrow_collect_all and collector.build_tool == "pyinstaller" and collector.collect_all
+            if (collector.auto_exclude_packages or collector.trace_imports or narrow or check_plugins) and not errors:
+                errors.extend(ConfigLoader._apply_import_analysis(collector))
+
+        if mode == "compile":
+            collector.generate_linux_packages = False
+
+        errors.extend(ConfigLoader._validate_package_settings(collector))
+
+        collector.script_filename = ConfigValidators.validate_script_filename(
+            collector.script_filename
+        )
+
+        return errors
+
+    @staticmethod
+    def _apply_import_analysis(collector: ConfigCollector) -> List[str]:
+        """根据入口文件的导入图自动排除未使用的包、自动启用并检查Nuitka插件、追踪运行时导入"""
+        from .import_analyzer import ImportGraphAnalyzer
+
+        try:
+            analyzer = ImportGraphAnalyzer(collector.project_dir, collector.entry_file)
+            analyzer.build_graph()
+            suggested = analyzer.suggest_excludes() if collector.auto_exclude_packages else []
+        except Exception as e:
+            options = [
+                key for key in ("auto_exclude_packages", "auto_enable_plugins", "trace_imports", "narrow_collect_all")
+                if getattr(collector, key)
+            ]
+            if not options:
+                # 仅用于插件检查时分析失败不影响生成
+                log_warning(f"⚠️  导入图分析失败，跳过插件检查: {e}")
+                return []
+            return [f"{', '.join(options)}: 导入图分析失败: {e}"]
+
+        collector.exclude_packages.extend(m for m in suggested if m not in collector.exclude_packages)
+        if collector.build_tool == "nuitka":
+            ConfigLoader._apply_plugin_detection(collector, analyzer.get_reached_modules())
+
+        static_modules = analyzer.get_reached_modules()
+        trace = None
+        if collector.trace_imports:
+            errors, trace = ConfigLoader._apply_import_trace(collector, static_modules)
+            if errors:
+                return errors
+        if collector.narrow_collect_all and collector.build_tool == "pyinstaller" and collector.collect_all:
+            ConfigLoader._apply_collect_narrowing(collector, static_modules, trace)
+        return []
+
+    @staticmethod
+    def _apply_import_trace(collector: ConfigCollector, static_modules) -> Tuple[List[str], Optional[dict]]:
+        """运行（或复用）导入追踪，把静态分析未发现的模块加入隐藏导入/包含模块
+
+        Returns:
+            (错误列表, 追踪结果)
+        """
+        from .import_tracer import ImportTracer, apply_import_trace
+
+        if collector.trace_timeout < 1:
+            return ["trace_timeout 必须大于0"], None
+        try:
+            result = ImportTracer.from_config(collector).trace(static_modules)
+        except (RuntimeError, OSError, ValueError) as e:
+            return [f"trace_imports: 导入追踪失败: {e}"], None
+        added = apply_import_trace(collector, result)
+        if added:
+            log_info(f"🔬 根据导入追踪加入 {len(added)} 个模块: {', '.join(added)}")
+        return [], result
+
+    @staticmethod
+    def _apply_collect_narrowing(collector: ConfigCollector, static_modules, trace: Optional[dict]):
+        """把 collect_all 收窄为具体的子模块、数据文件和动态库（无追踪结果时使用已保存且仍有效的结果）"""
+        from .collect_narrower import narrow_collect_all, describe_plan
+        from .import_tracer import ImportTracer
+
+        if trace is None:
+            trace = ImportTracer.from_config(collector).load_fresh()
+        for plan in narrow_collect_all(collector, static_modules, trace):
+            message = f"📚 {describe_plan(plan)}"
+            if plan["action"] == "keep":
+                log_warning(f"{message}，可开启 trace_imports 以收窄")
+            else:
+                log_info(message)
+
+    @staticmethod
+    def _apply_plugin_detection(collector: ConfigCollector, modules):
+        """auto_enable_plugins 时追加检测到的插件，并提示没有对应导入的已启用插件"""
+        if collector.auto_enable_plugins:
+            detected, dropped = detect_plugins(modules)
+            if any(plugin in QT_PLUGINS for plugin in collector.enable_plugins):
+                # 已手动指定Qt插件时不再自动添加其他Qt绑定
+                detected = [plugin for plugin in detected if plugin not in QT_PLUGINS]
+            elif dropped:
+                log_warning(f"⚠️  检测到多个Qt绑定，Nuitka只能启用一个Qt插件，未启用: {', '.join(dropped)}")
+            added = [plugin for plugin in detected if plugin not in collector.enable_plugins]
+            if added:
+                collector.enable_plugins.extend(added)
+                log_info(f"🔌 根据导入自动启用插件: {', '.join(added)}")
+
+        for plugin in find_unmatched_plugins(collector.enable_plugins, modules):
+            log_warning(f"⚠️  已启用插件 {plugin}，但入口文件的导入图中没有对应导入，可能拖慢编译")
+
+    @staticmethod
+    def _check_types(data: dict) -> List[str]:
+        """检查未知字段和字段类型"""
+        errors = []
+        for key, value in data.items():
+            if key in BOOL_FIELDS:
+                if not isinstance(value, bool):
+                    errors.append(f"{key} 必须是布尔值")
+            elif key in LIST_FIELDS:
+                if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                    errors.append(f"{key} 必须是字符串列表")
+            elif key in STR_FIELDS:
+                if value is not None and not isinstance(value, str):
+                    errors.append(f"{key} 必须是字符串")
+            elif key in INT_FIELDS:
+                if isinstance(value, bool) or not isinstance(value, int):
+                    errors.append(f"{key} 必须是整数")
+            else:
+                errors.append(f"未知配置项: {key}")
+        return errors
+
+    @staticmethod
+    def _validate_compile_settings(data: dict, collector: ConfigCollector) -> List[str]:
+        """校验编译相关配置"""
+        errors = []
+
+        is_valid, result = ConfigValidators.validate_project_dir(collector.project_dir)
+        if not is_valid:
+            errors.append(result)
+            return errors
+        collector.project_dir = result
+
+        is_valid, result = ConfigValidators.validate_entry_file(
+            collector.entry_file, collector.project_dir
+        )
+        if not is_valid:
+            errors.append(f"entry_file: {result}")
+        else:
+            collector.entry_file = result
+            if not collector.app_name:
+                collector.app_name = Path(result).stem
+
+        if collector.app_name and collector.app_name.endswith(".py"):
+            collector.app_name = collector.app_name[:-3]
+
+        is_valid, result = ConfigValidators.validate_icon_file(
+            collector.icon_file, collector.project_dir
+        )
+        if not is_valid:
+            errors.append(f"icon_file: {result}")
+        else:
+            collector.icon_file = result
+
+        if collector.build_tool not in ["nuitka", "pyinstaller"]:
+            errors.append(f"build_tool 必须是 nuitka 或 pyinstaller: {collector.build_tool}")
+
+        if collector.build_tool == "nuitka" and not ConfigValidators.validate_compiler(
+            collector.compiler
+        ):
+            errors.append(f"compiler 必须是 mingw64、msvc 或 clang: {collector.compiler}")
+
+        is_valid, jobs = ConfigValidators.validate_jobs(str(collector.jobs))
+        if not is_valid:
+            errors.append(f"jobs 必须是正整数: {collector.jobs}")
+        else:
+            collector.jobs = jobs
+
+        if not ConfigValidators.validate_version(collector.file_version):
+            errors.append(f"file_version 格式应为 x.y.z: {collector.file_version}")
+
+        # 非法包名会被跳过并给出警告
+        for key in ["exclude_packages", "hidden_imports", "collect_all"]:
+            if key in data:
+                setattr(
+                    collector,
+                    key,
+                    ConfigValidators.validate_package_names(",".join(getattr(collector, key))),
+                )
+
+        for plugin in collector.enable_plugins:
+            if not is_valid_plugin(plugin) and not plugin.replace("-", "").replace("_", "").isalnum():
+                errors.append(f"无效插件名: {plugin}")
+
+        for data_path in collector.add_data:
+            if ";" not in data_path:
+                errors.append(f"add_data 格式应为 源路径;目标路径: {data_path}")
+
+        return errors
+
+    @staticmethod
+    def _validate_package_settings(collector: ConfigCollector) -> List[str]:
+        """校验Linux包配置"""
+        errors = []
+        if not collector.generate_linux_packages:
+            return errors
+
+        if collector.linux_packaging_tool not in ["nfpm", "fpm"]:
+            errors.append(
+                f"linux_packaging_tool 必须是 nfpm 或 fpm: {collector.linux_packaging_tool}"
+            )
+
+        invalid_types = [t for t in collector.linux_package_types if t not in ["deb", "rpm"]]
+        if invalid_types:
+            errors.append(f"linux_package_types 仅支持 deb/rpm: {', '.join(invalid_types)}")
+        if not collector.linux_package_types:
+            collector.linux_package_types = ["deb"]
+
+        if collector.package_architecture not in ["amd64", "arm64", "all"]:
+            errors.append(
+                f"package_architecture 必须是 amd64、arm64 或 all: {collector.package_architecture}"
+            )
+
+        if collector.package_create_service and not collector.package_service_name:
+            collector.package_service_name = collector.app_name
+
+        return errors
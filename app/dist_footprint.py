@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+已安装发行包体积索引 - 统计每个包的磁盘占用、Python模块数、原生扩展数和反向依赖
+
+数据来自各包的 RECORD（缺少大小的条目按实际文件补齐），
+按环境（解释器路径）缓存到磁盘，site-packages 目录有变化（安装/卸载/升级）时重建。
+"""
+
+import hashlib
+import importlib.machinery
+import os
+import re
+import sys
+from importlib import metadata
+from typing import Dict, List, Optional
+
+from .cache_utils import load_json_cache, save_json_cache
+
+FOOTPRINT_CACHE_VERSION = 2
+
+# 原生扩展文件后缀（当前平台的扩展模块后缀 + 常见的通用后缀）
+NATIVE_SUFFIXES = tuple(sorted(set(importlib.machinery.EXTENSION_SUFFIXES) | {".so", ".pyd"}))
+
+_REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+_EXTRA_MARKER = re.compile(r"\bextra\s*==")
+
+
+def normalize_name(name: str) -> str:
+    """按 PEP 503 规范化包名，用于匹配依赖声明"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def format_size(size_bytes: int) -> str:
+    """格式化字节数，如 12.3MB"""
+    if size_bytes >= 1024 * 1024:
+        return f"{size_bytes / 1024 / 1024:.1f}MB"
+    return f"{size_bytes / 1024:.0f}KB"
+
+
+def _requirement_names(dist) -> List[str]:
+    """发行包的必需依赖（忽略仅在 extra 中声明的依赖）"""
+    names = []
+    for requirement in dist.requires or []:
+        if _EXTRA_MARKER.search(requirement):
+            continue
+        match = _REQUIREMENT_NAME.match(requirement)
+        if match:
+            names.append(normalize_name(match.group(1)))
+    return names
+
+
+def _measure(dist) -> Dict:
+    """统计一个发行包的文件大小、Python代码大小（.py/.pyc）、Python模块数和原生扩展数"""
+    size_bytes = py_bytes = py_modules = native_extensions = 0
+    for file in dist.files or []:
+        parts = file.parts
+        if parts and parts[0] == "..":
+            # 安装到 site-packages 之外的文件（如脚本）不计入
+            continue
+        size = file.size
+        if size is None:
+            try:
+                size = os.path.getsize(file.locate())
+            except OSError:
+                size = 0
+        size_bytes += size
+        name = file.name
+        if name.endswith((".py", ".pyc")):
+            py_bytes += size
+        if name.endswith(".py"):
+            py_modules += 1
+        elif name.endswith(NATIVE_SUFFIXES):
+            native_extensions += 1
+    return {"size_bytes": size_bytes, "py_bytes": py_bytes, "py_modules": py_modules,
+            "native_extensions": native_extensions}
+
+
+def environment_fingerprint() -> Dict[str, int]:
+    """当前环境包目录的修改时间：安装、卸载或升级包都会改变目录项"""
+    fingerprint = {}
+    for path in sys.path[1:]:
+        try:
+            fingerprint[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+    return fingerprint
+
+
+def _cache_name() -> str:
+    """按解释器区分的缓存文件名（每个虚拟环境一个）"""
+    digest = hashlib.sha1(f"{sys.prefix}|{sys.executable}".encode("utf-8")).hexdigest()[:12]
+    return f"footprint-{digest}.json"
+
+
+def build_footprint_index() -> Dict[str, Dict]:
+    """扫描已安装发行包
+
+    Returns:
+        Dict[str, Dict]: {小写包名: {"name", "version", "size_bytes", "py_bytes", "py_modules",
+        "native_extensions", "requires", "required_by"}}，依赖关系使用小写包名
+    """
+    index = {}
+    normalized = {}
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        key = name.lower() if name else None
+        if not key or key in index:
+            # 同名包以 sys.path 中靠前的为准（与导入时一致）
+            continue
+        index[key] = {"name": name, "version": dist.version, **_measure(dist),
+                      "requires": _requirement_names(dist), "required_by": []}
+        normalized[normalize_name(name)] = key
+
+    for key, entry in index.items():
+        requires = [normalized[name] for name in entry["requires"] if name in normalized]
+        entry["requires"] = sorted(set(requires) - {key})
+        for dependency in entry["requires"]:
+            index[dependency]["required_by"].append(key)
+    for entry in index.values():
+        entry["required_by"].sort()
+    return index
+
+
+def load_footprint_index(use_cache: bool = True) -> Dict[str, Dict]:
+    """读取当前环境的体积索引，环境未变化时直接使用磁盘缓存"""
+    fingerprint = environment_fingerprint()
+    if use_cache:
+        cache = load_json_cache(_cache_name())
+        if (isinstance(cache, dict) and cache.get("version") == FOOTPRINT_CACHE_VERSION
+                and cache.get("fingerprint") == fingerprint):
+            return cache["distributions"]
+
+    index = build_footprint_index()
+    if use_cache:
+        save_json_cache(_cache_name(), {
+            "version": FOOTPRINT_CACHE_VERSION,
+            "prefix": sys.prefix,
+            "fingerprint": fingerprint,
+            "distributions": index,
+        })
+    return index
+
+
+def describe_footprint(entry: Optional[Dict], max_dependents: int = 3) -> str:
+    """菜单中显示的体积说明，如 "38.2MB · 602模块 · 71扩展 · 被 pandas, scipy 依赖" """
+    if not entry:
+        return ""
+    parts = [format_size(entry["size_bytes"]), f"{entry['py_modules']}模块"]
+    if entry["native_extensions"]:
+        parts.append(f"{entry['native_extensions']}扩展")
+    dependents = entry["required_by"]
+    if dependents:
+        shown = ", ".join(dependents[:max_dependents])
+        more = f" 等{len(dependents)}个包" if len(dependents) > max_dependents else ""
+        parts.append(f"被 {shown}{more} 依赖")
+    return " · ".join(parts)
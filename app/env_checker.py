@@ -6,6 +6,8 @@
 import sys
 import platform
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from .logger_utils import log_info, log_success, log_error, log_warning
 from .common_utils import ToolChecker, InstallationHelper
@@ -282,15 +284,84 @@ class EnvironmentChecker:
 
 
 
-    def get_recommendations(self):
-        """获取环境改进建议"""
+    def _get_report_tools(self):
+        """获取环境报告需要探测的工具列表 [(category, command, description, version_arg), ...]"""
+        tools = [
+            ('package_manager', 'uv', 'UV (现代包管理器)', '--version'),
+            ('package_manager', 'poetry', 'Poetry', '--version'),
+            ('package_manager', 'pdm', 'PDM', '--version'),
+            ('package_manager', 'pipenv', 'Pipenv', '--version'),
+            ('package_manager', 'pip', 'pip', '--version'),
+            ('build_tool', 'nuitka', 'Nuitka编译器', '--version'),
+            ('build_tool', 'pyinstaller', 'PyInstaller打包工具', '--version'),
+            ('system_tool', 'clang', 'Clang编译器', '--version'),
+            ('system_tool', 'gcc', 'GCC编译器', '--version'),
+            ('package_tool', 'fpm', 'FPM (支持rpm、deb、pkg等格式)', '--version'),
+            ('package_tool', 'nfpm', 'NFPM (现代包管理器)', 'version'),
+        ]
+
+        if self.system_info['platform'] == 'Linux':
+            tools.extend([
+                ('platform_tool', 'dpkg-deb', 'DEB包构建工具', '--version'),
+                ('platform_tool', 'rpmbuild', 'RPM包构建工具', '--version'),
+            ])
+        elif self.system_info['platform'] == 'Darwin':
+            tools.extend([
+                ('platform_tool', 'pkgbuild', 'pkgbuild (系统自带)', '--version'),
+                ('platform_tool', 'productbuild', 'productbuild (系统自带)', '--version'),
+            ])
+
+        return tools
+
+    def collect_report(self, max_workers=8):
+        """收集机器可读的环境报告（并发探测所有工具）
+
+        Returns:
+            dict: {'system': {...}, 'tools': [...], 'recommendations': [...], 'total_probe_ms': float}
+        """
+        tools = self._get_report_tools()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            probes = list(executor.map(
+                lambda tool: ToolChecker.probe_command(tool[1], tool[3]), tools
+            ))
+        total_probe_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        tool_reports = []
+        for (category, _, description, _), probe in zip(tools, probes):
+            tool_reports.append({'category': category, 'description': description, **probe})
+
+        system = dict(self.system_info)
+        system['distro'] = self._detect_linux_distro() if system['platform'] == 'Linux' else None
+
+        installed = {probe['name']: probe['installed'] for probe in probes}
+
+        return {
+            'system': system,
+            'tools': tool_reports,
+            'recommendations': self.get_recommendations(installed),
+            'total_probe_ms': total_probe_ms,
+        }
+
+    def get_recommendations(self, installed=None):
+        """获取环境改进建议
+
+        Args:
+            installed (dict): 可选，已探测的工具安装状态 {command: bool}，避免重复探测
+        """
         recommendations = []
+
+        def is_installed(tool, version_arg="--version"):
+            if installed is not None and tool in installed:
+                return installed[tool]
+            return ToolChecker.check_command(tool, version_arg)
         
         # 使用通用的安装建议生成器
         all_tools = ['nuitka', 'pyinstaller', 'fpm', 'nfpm']
         
         for tool in all_tools:
-            if not ToolChecker.check_command(tool, "version" if tool == "nfpm" else "--version"):
+            if not is_installed(tool, "version" if tool == "nfpm" else "--version"):
                 suggestion = InstallationHelper.get_install_suggestion(tool, self.system_info['platform'])
                 recommendations.append(suggestion)
         
@@ -300,7 +371,7 @@ class EnvironmentChecker:
             linux_tools = ['dpkg-deb', 'rpmbuild']
             
             for tool in linux_tools:
-                if not ToolChecker.check_command(tool):
+                if not is_installed(tool):
                     suggestion = InstallationHelper.get_install_suggestion(tool, distro=distro_info)
                     recommendations.append(suggestion)
         
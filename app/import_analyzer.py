@@ -0,0 +1,503 @@
+# -*- coding: utf-8 -*-
+"""
+静态导入图分析模块 - 从入口文件出发用 ast 遍历项目和 site-packages 的导入关系，
+找出已安装但从未被入口文件（直接或间接）导入的发行包，作为排除建议：
+Nuitka 的 --nofollow-import-to 和 PyInstaller 的 --exclude-module。
+
+分析只解析源码、不执行任何导入；条件导入和 try/except 中的导入同样计入，
+因此建议是保守的（只会少排除，不会误排除静态可见的依赖）。
+
+源文件解析由 ImportScanner 完成：未命中缓存的文件较多时分发到进程池并行解析，
+每个文件的导入列表按 (路径, 大小, 修改时间) 缓存到磁盘，代码小改动后重新分析只需解析改动的文件。
+"""
+
+import ast
+import importlib.machinery
+import inspect
+import multiprocessing
+import os
+import re
+import sys
+import sysconfig
+import tomllib
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from .cache_utils import load_json_cache, save_json_cache
+from .dist_footprint import _requirement_names, normalize_name
+
+# 导入扫描缓存文件名（按解释器版本区分，不同版本的 ast 语法支持不同）
+IMPORT_CACHE_NAME = f"imports-py{sys.version_info[0]}{sys.version_info[1]}.json"
+IMPORT_CACHE_VERSION = 1
+# 未命中缓存的文件数达到该值时才使用进程池，少量文件时进程启动开销大于解析本身
+PARALLEL_SCAN_THRESHOLD = 64
+
+# 打包/构建工具链发行包：属于构建环境而非项目运行时依赖，不作为排除建议
+TOOLCHAIN_DISTRIBUTIONS = frozenset({
+    "pip", "setuptools", "wheel", "uv", "build", "packaging", "virtualenv", "pipx", "distlib",
+    "poetry", "poetry-core", "pdm", "pdm-backend", "hatch", "hatchling", "flit", "flit-core",
+    "setuptools-scm", "nuitka", "pyinstaller", "pyinstaller-hooks-contrib", "altgraph",
+    "macholib", "pefile", "pywin32-ctypes", "ordered-set", "zstandard",
+})
+
+# 标准库包在模块级 __getattr__ 中按需导入子模块提供的名称：
+# `from concurrent.futures import ProcessPoolExecutor` 实际会导入 concurrent.futures.process
+STDLIB_LAZY_EXPORTS = {
+    "concurrent.futures.ProcessPoolExecutor": "concurrent.futures.process",
+    "concurrent.futures.ThreadPoolExecutor": "concurrent.futures.thread",
+}
+
+# 生成器自身的依赖声明
+GENERATOR_PYPROJECT = Path(__file__).resolve().parent.parent / "pyproject.toml"
+
+# 行首的 import/from 语句
+_IMPORT_LINE = re.compile(rb"^[ \t]*(?:import|from)[ \t]", re.M)
+
+
+def _iter_statements(body):
+    """遍历语句及其嵌套语句块（if/try/with/函数/类等），不进入表达式"""
+    stack = list(body)
+    while stack:
+        node = stack.pop()
+        yield node
+        for field in ("body", "orelse", "finalbody", "handlers", "cases"):
+            stack.extend(getattr(node, field, None) or ())
+
+
+def _extract_import_statements(source: bytes) -> Optional[bytes]:
+    """从源码中截取全部 import 语句（含括号和反斜杠续行）
+
+    只有源码中每一处 "import" 都属于截取到的语句时才返回结果，
+    否则（单行 if/try 中的导入、注释或字符串中的 import 等）返回None，由调用方完整解析。
+    """
+    statements = []
+    for match in _IMPORT_LINE.finditer(source):
+        start = match.start()
+        end = source.find(b"\n", start)
+        end = len(source) if end < 0 else end
+        line = source[start:end]
+        if b"(" in line and b")" not in line:
+            close = source.find(b")", end)
+            if close < 0:
+                return None
+            end = source.find(b"\n", close)
+            end = len(source) if end < 0 else end
+        while source[start:end].rstrip(b"\r").endswith(b"\\"):
+            next_end = source.find(b"\n", end + 1)
+            end = len(source) if next_end < 0 else next_end
+        statements.append(source[start:end].strip())
+    if source.count(b"import") != sum(statement.count(b"import") for statement in statements):
+        return None
+    return b"\n".join(statements)
+
+
+def scan_imports(path: str) -> List[str]:
+    """解析Python源文件，返回其中导入的模块名
+
+    相对导入保留前导点（如 "..pkg.mod"）；`from X import a` 同时返回 X 和 X.a，
+    由调用方判断 X.a 是否为子模块。`importlib.import_module("x")` 和
+    `__import__("x")` 的字符串常量参数也会计入。语法错误或无法读取的文件返回空列表。
+    """
+    try:
+        with open(path, "rb") as f:
+            source = f.read()
+    except OSError:
+        return []
+    if b"import" not in source:
+        return []
+
+    # 快速路径：只解析截取出的 import 语句，避免为整个文件构建语法树
+    tree = None
+    statements = _extract_import_statements(source)
+    if statements is not None:
+        try:
+            tree = ast.parse(statements, filename=path)
+        except (SyntaxError, ValueError):
+            tree = None
+    if tree is None:
+        try:
+            # 第三方代码中的无效转义等警告与导入分析无关
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                tree = ast.parse(source, filename=path)
+        except (SyntaxError, ValueError):
+            return []
+
+    # import 只能是语句，只遍历语句树即可，比 ast.walk 遍历全部表达式节点快一个数量级
+    imports = []
+    for node in _iter_statements(tree.body):
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = "." * node.level + (node.module or "")
+            imports.append(base)
+            separator = "" if base.endswith(".") else "."
+            imports.extend(f"{base}{separator}{alias.name}" for alias in node.names if alias.name != "*")
+
+    # 动态导入是表达式，仅在源码中出现相关名称时才完整遍历
+    if b"import_module" in source or b"__import__" in source:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call) and node.args:
+                func = node.func
+                name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+                arg = node.args[0]
+                if name in ("import_module", "__import__") and isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                    imports.append(arg.value)
+    return imports
+
+
+def _scan_chunk(paths: List[str]) -> List[List[str]]:
+    """进程池任务：批量解析文件，减少进程间通信次数"""
+    return [scan_imports(path) for path in paths]
+
+
+class ImportScanner:
+    """带磁盘缓存的并行导入扫描器
+
+    在 with 语句中使用时进程池在多次 scan 之间复用，退出时关闭进程池并保存缓存。
+    """
+
+    def __init__(self, workers: Optional[int] = None, use_cache: bool = True):
+        self.workers = workers or os.cpu_count() or 1
+        self.use_cache = use_cache
+        self.stats = {"files": 0, "hits": 0, "parsed": 0}
+        self._entries: Dict[str, list] = {}
+        self._dirty = False
+        self._loaded = False
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.use_cache:
+            return
+        data = load_json_cache(IMPORT_CACHE_NAME)
+        if isinstance(data, dict) and data.get("version") == IMPORT_CACHE_VERSION:
+            self._entries = data.get("files", {})
+
+    def scan(self, paths: List[str]) -> Dict[str, List[str]]:
+        """返回 {路径: 导入列表}，缓存未命中的文件按需并行解析"""
+        self._load()
+        results = {}
+        misses = []
+        for path in dict.fromkeys(paths):
+            self.stats["files"] += 1
+            try:
+                stat = os.stat(path)
+            except OSError:
+                results[path] = []
+                continue
+            key = [stat.st_size, stat.st_mtime_ns]
+            entry = self._entries.get(path)
+            if entry and entry[:2] == key:
+                results[path] = entry[2]
+                self.stats["hits"] += 1
+            else:
+                misses.append((path, key))
+
+        self.stats["parsed"] += len(misses)
+
+        for (path, key), imports in zip(misses, self._parse([path for path, _ in misses])):
+            results[path] = imports
+            self._entries[path] = key + [imports]
+            self._dirty = True
+        return results
+
+    def _parse(self, paths: List[str]) -> List[List[str]]:
+        """解析文件；数量较多时使用进程池，失败时回退为顺序解析
+
+        已在工作进程中运行时（如批量生成）顺序解析，避免嵌套进程池造成CPU超额订阅。
+        """
+        if (len(paths) < PARALLEL_SCAN_THRESHOLD or self.workers < 2
+                or multiprocessing.parent_process() is not None):
+            return [scan_imports(path) for path in paths]
+        try:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            chunk_size = max(8, len(paths) // (self.workers * 4))
+            chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+            return [imports for chunk in self._executor.map(_scan_chunk, chunks) for imports in chunk]
+        except Exception:
+            # 受限环境（如无法创建子进程）下回退为顺序解析
+            self.workers = 0
+            return [scan_imports(path) for path in paths]
+
+    def close(self):
+        """关闭进程池并保存缓存"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._dirty and self.use_cache:
+            save_json_cache(IMPORT_CACHE_NAME, {"version": IMPORT_CACHE_VERSION, "files": self._entries})
+            self._dirty = False
+
+
+def get_top_level_modules(dist) -> Set[str]:
+    """发行包提供的顶层模块名：优先读取 top_level.txt，没有时按 RECORD 中的文件推断"""
+    modules = set((dist.read_text("top_level.txt") or "").split())
+    if not modules:
+        for file in dist.files or []:
+            parts = file.parts
+            if not parts or parts[0] in ("..", "__pycache__") or parts[0].endswith((".dist-info", ".egg-info", ".data")):
+                continue
+            module = parts[0] if len(parts) > 1 else inspect.getmodulename(parts[0])
+            if module:
+                modules.add(module)
+    return {m for m in modules if m.isidentifier()}
+
+
+def get_distribution_modules() -> Dict[str, Dict]:
+    """已安装发行包及其提供的顶层模块
+
+    Returns:
+        Dict[str, Dict]: {小写包名: {"name", "version", "modules": [顶层模块名]}}
+    """
+    from importlib import metadata
+
+    distributions = {}
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        if not name:
+            continue
+        entry = distributions.setdefault(name.lower(), {"name": name, "version": dist.version, "modules": set()})
+        entry["modules"].update(get_top_level_modules(dist))
+
+    for entry in distributions.values():
+        entry["modules"] = sorted(entry["modules"])
+    return distributions
+
+
+def get_toolchain_distributions() -> Set[str]:
+    """不应建议排除的发行包（规范化包名）：打包/构建工具链、生成器自身的依赖及其传递依赖"""
+    from importlib import metadata
+
+    names = set(TOOLCHAIN_DISTRIBUTIONS)
+    try:
+        with open(GENERATOR_PYPROJECT, "rb") as f:
+            dependencies = tomllib.load(f).get("project", {}).get("dependencies", [])
+    except (OSError, tomllib.TOMLDecodeError):
+        dependencies = []
+    pending = [normalize_name(re.split(r"[\s\[<>=!~;]", dep, maxsplit=1)[0]) for dep in dependencies]
+    pending += list(names)
+    while pending:
+        name = pending.pop()
+        names.add(name)
+        try:
+            requires = _requirement_names(metadata.distribution(name))
+        except metadata.PackageNotFoundError:
+            continue
+        pending.extend(r for r in requires if r not in names)
+    return names
+
+
+class ImportGraphAnalyzer:
+    """从入口文件构建导入图并找出未使用的已安装发行包"""
+
+    def __init__(self, project_dir: str, entry_file: str, search_paths: Optional[List[str]] = None,
+                 scanner: Optional[ImportScanner] = None):
+        self.scanner = scanner or ImportScanner()
+        self.project_dir = str(Path(project_dir).resolve())
+        self.entry_file = str(Path(entry_file).resolve())
+        if search_paths is None:
+            # 与运行入口脚本时一致：脚本所在目录优先，其后是当前解释器的 site-packages 等路径。
+            # 跳过 sys.path[0]（生成器自身目录），避免项目导入被解析到生成器的模块。
+            search_paths = [str(Path(self.entry_file).parent), self.project_dir]
+            search_paths += [p for p in sys.path[1:] if p and os.path.isdir(p)]
+        self.search_paths = list(dict.fromkeys(search_paths))
+        self.graph: Dict[str, Set[str]] = {}
+        self.unresolved: Set[str] = set()
+        self.stdlib_imports: Set[str] = set()
+        self._specs: Dict[str, Optional[object]] = {}
+        stdlib_dirs = {sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["platstdlib"]}
+        self._stdlib_dirs = tuple(os.path.normcase(os.path.realpath(p)) + os.sep for p in stdlib_dirs)
+
+    def find_spec(self, name: str):
+        """不执行导入地定位模块，找不到时返回None"""
+        if name in self._specs:
+            return self._specs[name]
+        spec = None
+        parent, _, _ = name.rpartition(".")
+        try:
+            if parent:
+                parent_spec = self.find_spec(parent)
+                locations = parent_spec.submodule_search_locations if parent_spec else None
+                if locations:
+                    spec = importlib.machinery.PathFinder.find_spec(name, list(locations))
+            else:
+                spec = importlib.machinery.PathFinder.find_spec(name, self.search_paths)
+        except (ImportError, ValueError, OSError):
+            spec = None
+        self._specs[name] = spec
+        return spec
+
+    def is_stdlib(self, name: str) -> bool:
+        """判断模块是否属于标准库（标准库不属于任何发行包，无需遍历）"""
+        top_level = name.partition(".")[0]
+        if top_level in sys.builtin_module_names:
+            return True
+        stdlib_names = getattr(sys, "stdlib_module_names", None)
+        if stdlib_names is not None:
+            return top_level in stdlib_names
+        spec = self.find_spec(top_level)
+        origin = spec.origin if spec else None
+        if not origin or origin in ("built-in", "frozen"):
+            return spec is not None
+        path = os.path.normcase(os.path.realpath(origin))
+        return path.startswith(self._stdlib_dirs) and "site-packages" not in path
+
+    @staticmethod
+    def _resolve_relative(name: str, module: str, is_package: bool) -> Optional[str]:
+        """将相对导入转换为绝对模块名"""
+        level = len(name) - len(name.lstrip("."))
+        if not level:
+            return name
+        parts = module.split(".")
+        base = parts if is_package else parts[:-1]
+        if level - 1 > len(base) or module == "__main__":
+            return None
+        base = base[:len(base) - (level - 1)]
+        rest = name[level:]
+        return ".".join(base + ([rest] if rest else [])) or None
+
+    def _read_imports(self, paths: List[str]) -> Dict[str, List[str]]:
+        """读取一批源文件的导入列表（缓存 + 进程池）"""
+        return self.scanner.scan(paths)
+
+    def build_graph(self) -> Dict[str, Set[str]]:
+        """从入口文件按广度优先遍历导入图（跳过标准库）
+
+        Returns:
+            Dict[str, Set[str]]: {模块名: 直接导入的模块名}，入口模块名为 "__main__"
+        """
+        self.graph = {}
+        self.unresolved = set()
+        self.stdlib_imports = set()
+        # 待解析模块: (模块名, 源文件路径, 是否为包)
+        queue = deque([("__main__", self.entry_file, False)])
+        seen = {"__main__"}
+
+        with self.scanner:
+            self._walk(queue, seen)
+        return self.graph
+
+    def _walk(self, queue: deque, seen: Set[str]):
+        """按层遍历待解析模块，解析结果写入 self.graph"""
+        while queue:
+            # 按层批量读取，便于批量解析和缓存
+            batch = [queue.popleft() for _ in range(len(queue))]
+            imports_by_path = self._read_imports([path for _, path, _ in batch if path])
+
+            for module, path, is_package in batch:
+                edges = set()
+                for raw in imports_by_path.get(path, []):
+                    name = self._resolve_relative(raw, module, is_package)
+                    if not name:
+                        continue
+                    if self.is_stdlib(name):
+                        self.stdlib_imports.add(name)
+                        if name in STDLIB_LAZY_EXPORTS:
+                            self.stdlib_imports.add(STDLIB_LAZY_EXPORTS[name])
+                        continue
+                    spec = self.find_spec(name)
+                    if spec is None:
+                        # `from X import a` 中的 X.a 多数是属性而不是子模块，只记录顶层无法解析的导入
+                        if "." not in name:
+                            self.unresolved.add(name)
+                        continue
+                    edges.add(name)
+                    if name in seen:
+                        continue
+                    seen.add(name)
+                    origin = spec.origin if spec.origin and spec.origin.endswith((".py", ".pyw")) else None
+                    queue.append((name, origin, spec.submodule_search_locations is not None))
+                    # 导入子模块会先导入其父包
+                    parent = name.rpartition(".")[0]
+                    while parent and parent not in seen:
+                        seen.add(parent)
+                        parent_spec = self.find_spec(parent)
+                        parent_origin = parent_spec.origin if parent_spec else None
+                        if parent_origin and parent_origin.endswith(".py"):
+                            queue.append((parent, parent_origin, True))
+                        parent = parent.rpartition(".")[0]
+                self.graph[module] = edges
+
+    def get_reached_top_levels(self) -> Set[str]:
+        """导入图中出现的所有第三方/项目顶层模块名"""
+        reached = set()
+        for module, edges in self.graph.items():
+            if module != "__main__":
+                reached.add(module.partition(".")[0])
+            reached.update(edge.partition(".")[0] for edge in edges)
+        return reached
+
+    def get_project_files(self) -> List[str]:
+        """导入图中位于项目目录内的源文件（含入口文件），按路径排序"""
+        if not self.graph:
+            self.build_graph()
+        project_dir = os.path.normcase(self.project_dir) + os.sep
+        files = {self.entry_file}
+        for module in self.graph:
+            spec = self.find_spec(module) if module != "__main__" else None
+            origin = spec.origin if spec else None
+            if origin and origin.endswith((".py", ".pyw")) and os.path.normcase(origin).startswith(project_dir):
+                files.add(origin)
+        return sorted(files)
+
+    def get_reached_modules(self) -> Set[str]:
+        """导入图中出现的所有模块名（含标准库导入），用于插件检测"""
+        if not self.graph:
+            self.build_graph()
+        reached = set(self.stdlib_imports)
+        for module, edges in self.graph.items():
+            if module != "__main__":
+                reached.add(module)
+            reached.update(edges)
+        return reached
+
+    def find_unused_distributions(self, distributions: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        """找出入口文件从未导入的已安装发行包（不含打包/构建工具链和生成器自身的依赖）
+
+        Returns:
+            List[Dict]: [{"key", "name", "version", "modules"}]，按包名排序
+        """
+        if not self.graph:
+            self.build_graph()
+        if distributions is None:
+            distributions = get_distribution_modules()
+
+        reached = self.get_reached_top_levels()
+        toolchain = get_toolchain_distributions()
+        project_dir = os.path.normcase(self.project_dir) + os.sep
+        unused = []
+        for key, dist in sorted(distributions.items()):
+            # 打包工具和生成器自身的依赖属于构建环境，排除它们没有意义
+            if normalize_name(key) in toolchain:
+                continue
+            # 私有顶层模块（如 _distutils_hack）不作为排除建议
+            modules = [m for m in dist["modules"] if not m.startswith("_")]
+            if not modules or any(m in reached for m in dist["modules"]):
+                continue
+            # 项目自身（可编辑安装）的模块不建议排除
+            spec = self.find_spec(modules[0])
+            origin = os.path.normcase(spec.origin or "") if spec else ""
+            if origin.startswith(project_dir):
+                continue
+            unused.append({"key": key, "name": dist["name"], "version": dist["version"], "modules": modules})
+        return unused
+
+    def suggest_excludes(self, distributions: Optional[Dict[str, Dict]] = None) -> List[str]:
+        """未使用发行包的顶层模块名，可直接用作 exclude_packages"""
+        excludes = []
+        for dist in self.find_unused_distributions(distributions):
+            excludes.extend(m for m in dist["modules"] if m not in excludes)
+        return excludes
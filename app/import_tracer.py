@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+运行时导入追踪模块 - 在导入钩子下运行入口文件或冒烟测试，记录实际加载的模块
+
+与静态导入图比较后得到最小的隐藏导入列表（PyInstaller --hidden-import，
+Nuitka --include-module），并记录运行时读取的包数据文件。结果保存在项目目录的
+.build_import_trace.json 中，源码和环境未变化时后续生成直接复用。
+"""
+
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .dist_footprint import environment_fingerprint
+from .import_analyzer import get_top_level_modules
+from .logger_utils import log_info, log_warning
+
+TRACE_FILE_NAME = ".build_import_trace.json"
+TRACE_FILE_VERSION = 2
+DEFAULT_TRACE_TIMEOUT = 20
+
+BOOTSTRAP_SCRIPT = str(Path(__file__).with_name("trace_bootstrap.py"))
+
+# 计算源码指纹时跳过的目录
+SKIP_DIRS = {"__pycache__", "node_modules", "site-packages"}
+
+
+def _iter_project_sources(project_dir: str):
+    """项目中的Python源文件（跳过隐藏目录、虚拟环境和缓存目录）"""
+    for root, dirs, files in os.walk(project_dir):
+        dirs[:] = sorted(
+            d for d in dirs
+            if not d.startswith(".") and d not in SKIP_DIRS
+            and not os.path.exists(os.path.join(root, d, "pyvenv.cfg"))
+        )
+        for name in sorted(files):
+            if name.endswith((".py", ".pyw")):
+                yield os.path.join(root, name)
+
+
+def _is_stdlib(name: Optional[str]) -> bool:
+    return bool(name) and name.partition(".")[0] in sys.stdlib_module_names
+
+
+def compute_hidden_imports(modules: Dict[str, Optional[str]], static_modules: Set[str],
+                           importers: Optional[Dict[str, Optional[str]]] = None) -> List[str]:
+    """运行时加载但静态导入图未发现的模块，只保留叶子模块（导入子模块会同时收集其父包）
+
+    标准库模块导入的标准库模块由编译工具自行分析，不计入。
+    """
+    importers = importers or {}
+    candidates = [
+        name for name, file in modules.items()
+        if file and name not in static_modules and name.partition(".")[0] not in sys.builtin_module_names
+        and not (_is_stdlib(name) and _is_stdlib(importers.get(name)))
+    ]
+    parents = set()
+    for name in candidates:
+        parts = name.split(".")
+        parents.update(".".join(parts[:i]) for i in range(1, len(parts)))
+    return sorted(name for name in candidates if name not in parents)
+
+
+def _metadata_dir(path: str) -> Optional[Path]:
+    """文件所在的发行包元数据目录（*.dist-info / *.egg-info），不在其中时返回None"""
+    for parent in Path(path).parents:
+        if parent.name.endswith((".dist-info", ".egg-info")):
+            return parent
+    return None
+
+
+def classify_data_files(modules: Dict[str, Optional[str]], data_files: List[str], project_dir: str,
+                        binaries: Iterable[str] = ()) -> Dict:
+    """将读取的数据文件分为第三方包数据、发行包元数据和项目文件，并找出属于第三方包的动态库
+
+    读取发行包元数据（如 importlib.metadata.version）的包在打包后同样需要这些元数据，
+    按元数据目录找到发行包名，记录到它提供的每个顶层模块下。
+
+    Returns:
+        Dict: {"package_data": {顶层包名: [包内相对路径]}, "project_files": [项目内相对路径],
+        "package_binaries": {顶层包名: [包内相对路径]}, "package_metadata": {顶层包名: [发行包名]}}
+    """
+    from importlib import metadata
+
+    project_prefix = os.path.normcase(str(Path(project_dir).resolve())) + os.sep
+    package_dirs = {}
+    for name, file in modules.items():
+        if "." not in name and file and Path(file).name.startswith("__init__."):
+            package_dir = os.path.normcase(os.path.dirname(file)) + os.sep
+            if not package_dir.startswith(project_prefix):
+                package_dirs[name] = package_dir
+
+    package_data: Dict[str, List[str]] = {}
+    package_metadata: Dict[str, Set[str]] = {}
+    metadata_dirs: Dict[Path, Optional[Tuple[str, Set[str]]]] = {}
+    project_files = []
+    for path in data_files:
+        metadata_dir = _metadata_dir(path)
+        if metadata_dir is not None:
+            if metadata_dir not in metadata_dirs:
+                dist = metadata.PathDistribution(metadata_dir)
+                try:
+                    name = dist.metadata.get("Name")
+                except (OSError, TypeError, ValueError):
+                    name = None
+                metadata_dirs[metadata_dir] = (name, get_top_level_modules(dist)) if name else None
+            if metadata_dirs[metadata_dir]:
+                name, top_levels = metadata_dirs[metadata_dir]
+                for module in top_levels:
+                    package_metadata.setdefault(module, set()).add(name)
+            continue
+        normalized = os.path.normcase(path)
+        for package, package_dir in package_dirs.items():
+            if normalized.startswith(package_dir):
+                package_data.setdefault(package, []).append(Path(path[len(package_dir):]).as_posix())
+                break
+        else:
+            if normalized.startswith(project_prefix):
+                project_files.append(Path(path[len(project_prefix):]).as_posix())
+    package_binaries: Dict[str, List[str]] = {}
+    for path in binaries:
+        normalized = os.path.normcase(path)
+        for package, package_dir in package_dirs.items():
+            if normalized.startswith(package_dir):
+                package_binaries.setdefault(package, []).append(Path(path[len(package_dir):]).as_posix())
+                break
+    return {
+        "package_data": {package: sorted(files) for package, files in sorted(package_data.items())},
+        "project_files": sorted(project_files),
+        "package_binaries": {package: sorted(files) for package, files in sorted(package_binaries.items())},
+        "package_metadata": {package: sorted(names) for package, names in sorted(package_metadata.items())},
+    }
+
+
+class ImportTracer:
+    """运行入口文件（或冒烟测试命令）并记录实际加载的模块"""
+
+    def __init__(self, project_dir: str, entry_file: str, command: str = "",
+                 timeout: int = DEFAULT_TRACE_TIMEOUT, ignore_files: Iterable[str] = ()):
+        """
+        Args:
+            project_dir: 项目目录（子进程的工作目录）
+            entry_file: 入口文件
+            command: 冒烟测试，如 "tests/smoke.py --quick" 或 "-m pytest -x tests/smoke"；为空时运行入口文件
+            timeout: 超时秒数，到时记录已加载的模块并结束（GUI/服务程序不会自行退出）
+            ignore_files: 不计入源码指纹的文件（如生成的构建脚本）
+        """
+        self.project_dir = str(Path(project_dir).resolve())
+        self.entry_file = str(Path(entry_file).resolve())
+        self.command = command.strip()
+        self.timeout = timeout
+        self.trace_path = Path(self.project_dir) / TRACE_FILE_NAME
+        self.ignore_files = {os.path.normcase(str(Path(self.project_dir, f).resolve())) for f in ignore_files}
+
+    @classmethod
+    def from_config(cls, collector) -> "ImportTracer":
+        """按配置创建追踪器（生成的构建脚本不计入源码指纹）"""
+        return cls(
+            collector.project_dir, collector.entry_file, collector.trace_command, collector.trace_timeout,
+            ignore_files=[collector.script_filename, "build.py"],
+        )
+
+    def target_args(self) -> List[str]:
+        """追踪目标的命令行参数（传给引导脚本）"""
+        if self.command:
+            return shlex.split(self.command)
+        return [self.entry_file]
+
+    def fingerprint(self) -> str:
+        """项目源码（路径、大小、修改时间）、追踪命令和已安装包目录的指纹"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps([self.entry_file, self.command, environment_fingerprint()]).encode("utf-8"))
+        for path in _iter_project_sources(self.project_dir):
+            if os.path.normcase(path) in self.ignore_files:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def load(self, fingerprint: Optional[str] = None) -> Optional[Dict]:
+        """读取已保存的追踪结果；指定指纹时仅在指纹一致时返回"""
+        try:
+            with open(self.trace_path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(result, dict) or result.get("version") != TRACE_FILE_VERSION:
+            return None
+        if fingerprint is not None and result.get("fingerprint") != fingerprint:
+            return None
+        return result
+
+    def load_fresh(self) -> Optional[Dict]:
+        """读取与当前源码和环境一致的追踪结果"""
+        return self.load(self.fingerprint())
+
+    def save(self, result: Dict):
+        with open(self.trace_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    def run(self) -> Dict:
+        """在子进程中运行追踪目标，返回引导脚本记录的原始结果
+
+        Raises:
+            RuntimeError: 子进程未产生追踪结果
+        """
+        handle, output = tempfile.mkstemp(prefix="import-trace-", suffix=".json")
+        os.close(handle)
+        command = [sys.executable, BOOTSTRAP_SCRIPT, output, str(self.timeout)] + self.target_args()
+        completed = None
+        try:
+            completed = subprocess.run(
+                command, cwd=self.project_dir, stdin=subprocess.DEVNULL,
+                capture_output=True, text=True, errors="replace", timeout=self.timeout + 30,
+            )
+            with open(output, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"追踪进程在 {self.timeout + 30} 秒内未结束")
+        except (OSError, ValueError):
+            stderr = completed.stderr.strip().splitlines()[-5:] if completed and completed.stderr else []
+            raise RuntimeError("追踪进程未写出结果" + (": " + " | ".join(stderr) if stderr else ""))
+        finally:
+            try:
+                os.unlink(output)
+            except OSError:
+                pass
+
+        if raw["exit_code"]:
+            stderr = completed.stderr.strip().splitlines()[-3:]
+            detail = f": {' | '.join(stderr)}" if stderr else ""
+            log_warning(f"⚠️  追踪目标以退出码 {raw['exit_code']} 结束，结果可能不完整{detail}")
+        return raw
+
+    def trace(self, static_modules: Set[str], force: bool = False) -> Dict:
+        """返回追踪结果：源码和环境未变化时复用已保存的结果，否则重新运行并保存
+
+        Args:
+            static_modules: 静态导入图中出现的模块（ImportGraphAnalyzer.get_reached_modules）
+            force: 忽略已保存的结果
+        """
+        fingerprint = self.fingerprint()
+        if not force:
+            result = self.load(fingerprint)
+            if result is not None:
+                log_info(f"♻️  复用导入追踪结果: {self.trace_path.name} ({len(result['hidden_imports'])} 个隐藏导入)")
+                return result
+
+        target = " ".join(self.target_args())
+        log_info(f"🔬 正在追踪运行时导入: {target} (最长 {self.timeout} 秒)")
+        start = time.perf_counter()
+        raw = self.run()
+        result = {
+            "version": TRACE_FILE_VERSION,
+            "fingerprint": fingerprint,
+            "command": target,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "seconds": round(time.perf_counter() - start, 3),
+            "exit_code": raw["exit_code"],
+            "timed_out": raw["timed_out"],
+            "hidden_imports": compute_hidden_imports(raw["modules"], static_modules, raw.get("importers")),
+            **classify_data_files(raw["modules"], raw["data_files"], self.project_dir, raw.get("binaries", [])),
+            "modules": raw["modules"],
+            "importers": raw.get("importers", {}),
+        }
+        self.save(result)
+        log_info(
+            f"📝 运行时加载 {len(raw['modules'])} 个模块，其中 {len(result['hidden_imports'])} 个静态分析未发现，"
+            f"已保存到 {self.trace_path.name}"
+        )
+        return result
+
+
+def apply_import_trace(collector, result: Dict) -> List[str]:
+    """将追踪得到的隐藏导入追加到配置（PyInstaller hidden_imports / Nuitka include_modules）
+
+    Returns:
+        List[str]: 新增的模块（已排除的包不会加入）
+    """
+    excluded = set(collector.exclude_packages)
+    target = collector.hidden_imports if collector.build_tool == "pyinstaller" else collector.include_modules
+    added = [
+        name for name in result["hidden_imports"]
+        if name not in target and not any(name == e or name.startswith(e + ".") for e in excluded)
+    ]
+    target.extend(added)
+    return added
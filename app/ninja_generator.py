@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Ninja构建图生成模块 - 将编译、资源复制、各类型Linux包和校验和生成建模为带真实文件依赖的规则
+
+生成的 build.ninja 与 build.py 并列，可直接使用 ninja 的增量构建和 -j 并行：
+    ninja -C <项目目录>
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from .collect_narrower import resolve_package_file_args
+from .import_analyzer import ImportGraphAnalyzer
+from .logger_utils import log_warning
+
+# 扫描项目源码时跳过的目录
+SOURCE_EXCLUDE_DIRS = {"__pycache__", "node_modules", "venv", "env", "site-packages"}
+
+# 资源目录复制命令：先删除旧目录再完整复制，最后写入标记文件
+COPY_DIR_CODE = (
+    "import pathlib,shutil,sys; "
+    "shutil.rmtree(sys.argv[2], ignore_errors=True); "
+    "shutil.copytree(sys.argv[1], sys.argv[2]); "
+    "stamp=pathlib.Path(sys.argv[3]); stamp.parent.mkdir(parents=True, exist_ok=True); stamp.touch()"
+)
+
+# 校验和命令：输出与 sha256sum -c 兼容的 SHA256SUMS 文件
+CHECKSUM_CODE = (
+    "import hashlib,os,sys; out=sys.argv[1]; "
+    "open(out,'w').writelines("
+    "hashlib.sha256(open(p,'rb').read()).hexdigest()+'  '"
+    "+os.path.relpath(p,os.path.dirname(out) or '.').replace(os.sep,'/')+chr(10) "
+    "for p in sys.argv[2:])"
+)
+
+
+def escape_path(path: str) -> str:
+    """转义ninja构建行中的路径（$、空格和冒号）"""
+    return path.replace("$", "$$").replace(" ", "$ ").replace(":", "$:")
+
+
+class NinjaGenerator:
+    """Ninja构建图生成器"""
+
+    def generate_files(self, config, args: List[str]) -> Dict[str, str]:
+        """生成构建图相关文件
+
+        Args:
+            config: 构建配置
+            args: 编译参数列表
+
+        Returns:
+            Dict[str, str]: {相对项目目录的文件名: 文件内容}
+        """
+        files = {"build.ninja": self.generate_ninja_file(config, args)}
+        if getattr(config, "generate_linux_packages", False):
+            files[self._nfpm_config_filename(config)] = self.generate_nfpm_config(config)
+        return files
+
+    def generate_ninja_file(self, config, args: List[str]) -> str:
+        """生成 build.ninja 内容"""
+        executable = self.get_executable_path(config)
+        command = " ".join(resolve_package_file_args(args)).replace("$", "$$")
+        python = "python" if sys.platform.startswith("win") else "python3"
+
+        lines = [
+            "# 由 Python 构建脚本生成器自动生成，与 build.py 使用相同的编译参数",
+            "# 用法: ninja -C <项目目录> [-j N]",
+            "ninja_required_version = 1.3",
+            "",
+            f"python = {python}",
+            "",
+            "rule compile",
+            f"  command = {command}",
+            f"  description = {config.build_tool} 编译 $out",
+            "  pool = console",
+            "",
+            "rule copy_dir",
+            f'  command = $python -c "{COPY_DIR_CODE}" $src $dst $out',
+            "  description = 复制目录 $src",
+            "",
+            "rule nfpm_package",
+            "  command = nfpm package --packager $packager --config $config --target $out",
+            "  description = 生成 $packager 包 $out",
+            "",
+            "rule checksums",
+            f'  command = $python -c "{CHECKSUM_CODE}" $out $in',
+            "  description = 计算校验和 $out",
+            "",
+        ]
+
+        # 编译：依赖入口文件可达的项目源码和参数中引用的文件
+        compile_inputs = self._get_compile_inputs(config)
+        lines.append(
+            f"build {escape_path(executable)}: compile"
+            + (" | " + " ".join(escape_path(p) for p in compile_inputs) if compile_inputs else "")
+        )
+        lines.append("")
+        defaults = [executable]
+
+        # 资源复制：每个目录一个标记文件，依赖目录中的全部文件；
+        # 编译器会写入并清理同一输出目录，复制排在编译之后（order-only 依赖，编译不会触发重新复制）
+        for dir_name in config.copy_dirs:
+            stamp = self._join(config.output_dir, ".stamps", f"{dir_name}.stamp")
+            sources = self._list_files(Path(config.project_dir), dir_name)
+            lines.append(
+                f"build {escape_path(stamp)}: copy_dir "
+                + " ".join(escape_path(p) for p in sources)
+                + f" || {escape_path(executable)}"
+            )
+            lines.append(f"  src = {dir_name}")
+            lines.append(f"  dst = {self._join(config.output_dir, dir_name)}")
+            lines.append("")
+            defaults.append(stamp)
+
+        # Linux包：每种包类型一条规则，依赖可执行文件和nfpm配置
+        checksum_inputs = [executable]
+        checksum_dir = config.output_dir
+        if getattr(config, "generate_linux_packages", False):
+            nfpm_config = self._nfpm_config_filename(config)
+            checksum_inputs = []
+            checksum_dir = config.package_output_dir
+            for pkg_type in config.linux_package_types:
+                target = self.get_package_path(config, pkg_type)
+                lines.append(
+                    f"build {escape_path(target)}: nfpm_package {escape_path(executable)}"
+                    f" | {escape_path(nfpm_config)}"
+                )
+                lines.append(f"  packager = {pkg_type}")
+                lines.append(f"  config = {nfpm_config}")
+                lines.append("")
+                checksum_inputs.append(target)
+
+        # 校验和：依赖最终产物（Linux包，未启用打包时为可执行文件）
+        checksum_file = self._join(checksum_dir, "SHA256SUMS")
+        lines.append(
+            f"build {escape_path(checksum_file)}: checksums "
+            + " ".join(escape_path(p) for p in checksum_inputs)
+        )
+        lines.append("")
+        defaults.append(checksum_file)
+
+        lines.append("default " + " ".join(escape_path(p) for p in defaults))
+        return "\n".join(lines) + "\n"
+
+    def generate_nfpm_config(self, config) -> str:
+        """生成与 build.py 一致的 nfpm 配置（JSON 是合法的 YAML）"""
+        nfpm_config = {
+            "name": config.app_name,
+            "arch": config.package_architecture,
+            "platform": "linux",
+            "version": "1.0.0",
+            "section": "default",
+            "priority": "extra",
+            "maintainer": "ASLant <unknown@example.com>",
+            "description": f"{config.app_name} application",
+            "homepage": "",
+            "license": "MIT",
+            "contents": [
+                {
+                    "src": self.get_executable_path(config),
+                    "dst": f"{config.package_install_path}/{config.app_name}",
+                    "file_info": {"mode": 0o755},
+                }
+            ],
+        }
+        if config.package_depends:
+            nfpm_config["depends"] = list(config.package_depends)
+        return json.dumps(nfpm_config, ensure_ascii=False, indent=2) + "\n"
+
+    def get_executable_path(self, config) -> str:
+        """推算编译产物路径（相对项目目录）"""
+        entry_stem = Path(config.entry_file).stem
+        suffix = ".exe" if sys.platform.startswith("win") else ""
+
+        if config.build_tool == "pyinstaller":
+            name = config.app_name or entry_stem
+            if config.onefile:
+                return self._join(config.output_dir, name + suffix)
+            return self._join(config.output_dir, name, name + suffix)
+
+        # Nuitka 未指定 --output-filename 时在非Windows平台使用 .bin 后缀
+        name = config.app_name + suffix if config.app_name else entry_stem + (suffix or ".bin")
+        if config.standalone and not config.onefile:
+            return self._join(config.output_dir, f"{entry_stem}.dist", name)
+        return self._join(config.output_dir, name)
+
+    def get_package_path(self, config, pkg_type: str) -> str:
+        """Linux包输出路径，与 build.py 的命名一致"""
+        return self._join(
+            config.package_output_dir,
+            f"{config.app_name}_1.0.0_{config.package_architecture}.{pkg_type}",
+        )
+
+    def _get_compile_inputs(self, config) -> List[str]:
+        """编译输入：入口文件导入图中的项目源码（不含生成的脚本）、图标、数据文件和动态库"""
+        project_dir = Path(config.project_dir)
+        generated = {config.script_filename, "build.py", "create_packages.py"}
+        inputs = [path for path in self._get_source_inputs(config) if path not in generated]
+
+        referenced = [config.icon_file] if config.icon_file else []
+        if config.build_tool == "pyinstaller":
+            referenced.extend(
+                data.replace(";", os.pathsep).split(os.pathsep)[0]
+                for data in config.add_data + config.add_binary
+            )
+        for path in referenced:
+            relative = Path(os.path.relpath(project_dir / path, project_dir)).as_posix()
+            if (project_dir / relative).is_file():
+                inputs.append(relative)
+            elif (project_dir / relative).is_dir():
+                inputs.extend(self._list_files(project_dir, relative))
+        return list(dict.fromkeys(inputs))
+
+    def _get_source_inputs(self, config) -> List[str]:
+        """入口文件可达的项目源码（相对项目目录），导入图分析失败时回退为项目全部源码"""
+        project_dir = Path(config.project_dir).resolve()
+        entry_file = Path(config.entry_file).resolve()
+        try:
+            # 只在项目内解析导入：第三方包和标准库的变化不属于项目源码输入
+            analyzer = ImportGraphAnalyzer(
+                str(project_dir), str(entry_file), search_paths=[str(entry_file.parent), str(project_dir)]
+            )
+            files = analyzer.get_project_files()
+        except Exception as e:
+            log_warning(f"⚠️  导入图分析失败，编译输入改为项目全部源码: {e}")
+            excluded = {
+                os.path.normpath(p)
+                for p in (config.output_dir, f"{config.output_dir}_temp",
+                          getattr(config, "package_output_dir", "output_pkg"))
+            }
+            return self._list_files(project_dir, ".", (".py", ".pyw"), excluded)
+        return [Path(os.path.relpath(path, project_dir)).as_posix() for path in files]
+
+    @staticmethod
+    def _list_files(project_dir: Path, root_dir: str, suffixes=None, excluded=frozenset()) -> List[str]:
+        """列出目录下的文件（相对项目目录，使用/分隔），跳过隐藏目录和缓存目录"""
+        files = []
+        for root, dirs, names in os.walk(project_dir / root_dir):
+            relative_root = os.path.relpath(root, project_dir)
+            dirs[:] = sorted(
+                d for d in dirs
+                if not d.startswith(".")
+                and d not in SOURCE_EXCLUDE_DIRS
+                and os.path.normpath(os.path.join(relative_root, d)) not in excluded
+            )
+            for name in sorted(names):
+                if suffixes is None or name.endswith(suffixes):
+                    files.append(Path(relative_root, name).as_posix())
+        return files
+
+    @staticmethod
+    def _join(*parts: str) -> str:
+        """拼接相对路径（使用/分隔）"""
+        return Path(*parts).as_posix()
+
+    @staticmethod
+    def _nfpm_config_filename(config) -> str:
+        return f"{config.app_name}.nfpm.json"
@@ -5,6 +5,8 @@ Linux包生成器模块 - 支持生成deb和rpm安装包
 
 import os
 import subprocess
+import time
+from datetime import datetime
 from pathlib import Path
 from .logger_utils import log_info, log_success, log_error, log_warning
 from .input_handlers import InputHandlers
@@ -24,6 +26,7 @@ class LinuxPackageGenerator:
         self.install_path = "/usr/local/bin"
         self.package_types = []
         self.packaging_tool = "nfpm"  # 默认使用NFPM
+        self.build_tool = ""  # 生成可执行文件的构建工具（nuitka/pyinstaller），用作指标的 tool 标签
         self.nfpm_path = "nfpm"  # NFPM可执行文件路径
         
         # 实用的扩展配置
@@ -33,6 +36,8 @@ class LinuxPackageGenerator:
         self.create_service = False  # 是否创建系统服务
         self.service_name = ""  # 服务名称
         self.output_dir = "output_pkg"  # 输出目录
+        self.prom_file = ""  # Prometheus指标文件（node_exporter textfile），为空时不写出
+        self.package_results = {}  # 各包类型的生成结果 {类型: {status, seconds, path, bytes}}
 
     def collect_package_info(self, executable_path: str):
         """收集打包信息"""
@@ -261,7 +266,17 @@ class LinuxPackageGenerator:
             return False
 
     def generate_packages(self):
-        """生成Linux包"""
+        """生成Linux包，设置了 prom_file 时无论成败都写出Prometheus指标"""
+        started = time.perf_counter()
+        success = False
+        try:
+            success = self._generate_packages()
+            return success
+        finally:
+            if self.prom_file:
+                self.write_prom_metrics(success, time.perf_counter() - started)
+
+    def _generate_packages(self):
         if not self.check_tool_installation():
             return False
 
@@ -310,11 +325,14 @@ class LinuxPackageGenerator:
 
         success = True
         for package_type in self.package_types:
+            started = time.perf_counter()
             try:
-                self._generate_nfpm_package(package_type, config_file)
+                output_path = self._generate_nfpm_package(package_type, config_file)
                 log_success(f"✅ {package_type.upper()}包生成成功")
+                self._record_package(package_type, "done", started, output_path)
             except Exception as e:
                 log_error(f"❌ {package_type.upper()}包生成失败: {e}")
+                self._record_package(package_type, "failed", started)
                 success = False
 
         # 清理配置文件
@@ -329,15 +347,50 @@ class LinuxPackageGenerator:
 
         success = True
         for package_type in self.package_types:
+            started = time.perf_counter()
             try:
-                self._generate_fpm_package(package_type)
+                output_path = self._generate_fpm_package(package_type)
                 log_success(f"✅ {package_type.upper()}包生成成功")
+                self._record_package(package_type, "done", started, output_path)
             except Exception as e:
                 log_error(f"❌ {package_type.upper()}包生成失败: {e}")
+                self._record_package(package_type, "failed", started)
                 success = False
 
         return success
 
+    def _record_package(self, package_type: str, status: str, started: float, output_path=None):
+        """记录单个包类型的生成结果"""
+        path = Path(output_path) if output_path else None
+        self.package_results[package_type] = {
+            "status": status,
+            "seconds": round(time.perf_counter() - started, 3),
+            "path": str(path) if path else None,
+            "bytes": path.stat().st_size if path and path.exists() else None,
+        }
+
+    def write_prom_metrics(self, success: bool, duration: float) -> bool:
+        """将本次打包的耗时、包大小和退出状态写入Prometheus textfile
+
+        tool 标签为构建工具，与 build.py 的指标一致；打包工具记在 packager 标签，
+        指标名使用 python_build_packaging_ 前缀，与 build.py 写入同一文件时不会冲突。
+        """
+        from .prom_metrics import PromTextfile
+
+        metrics = PromTextfile(app=self.app_name, tool=self.build_tool, packager=self.packaging_tool)
+        metrics.add("python_build_packaging_duration_seconds", round(duration, 3), "打包总耗时（秒）")
+        for package_type, result in self.package_results.items():
+            metrics.add("python_build_packaging_type_duration_seconds", result["seconds"], "各类型安装包生成耗时（秒）",
+                        type=package_type, status=result["status"])
+        for package_type, result in self.package_results.items():
+            metrics.add("python_build_packaging_package_bytes", result["bytes"], "各类型安装包大小（字节）",
+                        type=package_type)
+        metrics.add("python_build_packaging_success", 1 if success else 0, "打包是否成功 (1/0)")
+        metrics.add("python_build_packaging_exit_code", 0 if success else 1, "打包退出码")
+        metrics.add("python_build_packaging_last_run_timestamp_seconds", round(datetime.now().timestamp(), 3),
+                    "打包结束时间（Unix时间戳）")
+        return metrics.write(self.prom_file)
+
     def _cleanup_existing_packages(self, package_type: str):
         """清理输出目录中已存在的包文件"""
         if package_type == "deb":
@@ -500,6 +553,7 @@ overrides:
                 log_success(f"📦 包文件已生成: {output_path}")
             else:
                 log_warning(f"⚠️  未找到生成的包文件: {output_path}")
+            return output_path
         else:
             error_msg = f"NFPM命令执行失败 (返回码: {result.returncode})"
             if result.stderr:
@@ -574,6 +628,7 @@ overrides:
                 log_success(f"📦 包文件已生成: {output_path}")
             else:
                 log_warning(f"⚠️  未找到生成的包文件: {output_path}")
+            return output_path
         else:
             error_msg = f"FPM命令执行失败 (返回码: {result.returncode})"
             if result.stderr:
@@ -1,10 +1,24 @@
 # -*- coding: utf-8 -*-
 """
 Nuitka插件配置模块
-基于官方 nuitka --plugin-list 输出
+插件列表读取自当前环境的 nuitka --plugin-list，按Nuitka版本缓存到磁盘；
+未安装Nuitka或读取失败时使用内置列表
 """
 
-# 官方Nuitka插件列表
+import re
+import shutil
+import subprocess
+from importlib import metadata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .cache_utils import load_json_cache, save_json_cache
+from .logger_utils import log_info, log_warning
+
+PLUGIN_CACHE_NAME = "nuitka-plugins.json"
+PLUGIN_CACHE_VERSION = 1
+PLUGIN_LIST_TIMEOUT = 60
+
+# 内置Nuitka插件列表（中文说明优先于 --plugin-list 的英文说明）
 NUITKA_PLUGINS = [
     # GUI框架插件
     ("pyqt5", "PyQt5 GUI框架"),
@@ -38,24 +52,178 @@ NUITKA_PLUGINS = [
     # 其他工具
     ("pmw-freezer", "Pmw包支持"),
     ("pylint-warnings", "PyLint/PyDev标记支持"),
-    # 自定义插件选项
-    ("__custom__", "🔧 自定义插件 (手动输入插件名)"),
 ]
 
+# 自定义插件选项
+CUSTOM_PLUGIN_ITEM = ("__custom__", "🔧 自定义插件 (手动输入插件名)")
+
+# --plugin-list 输出中的插件行，如 " pyside6     Required by the PySide6 package..."
+_PLUGIN_LINE = re.compile(r"^ {0,2}([a-z][a-z0-9_-]*)\s{2,}(\S.*)$")
+
+# 进程内缓存的插件列表
+_catalogue: Optional[List[Tuple[str, str]]] = None
+
+# 插件对应的导入：导入图中出现这些模块（或其子模块）时建议启用该插件
+# upx、delvewheel、pylint-warnings 等与导入无关的插件不在此列，不参与检测和告警
+PLUGIN_IMPORT_TRIGGERS = {
+    "pyqt5": ["PyQt5"],
+    "pyqt6": ["PyQt6"],
+    "pyside2": ["PySide2"],
+    "pyside6": ["PySide6"],
+    "tk-inter": ["tkinter", "_tkinter"],
+    "kivy": ["kivy"],
+    "matplotlib": ["matplotlib"],
+    "multiprocessing": ["multiprocessing", "concurrent.futures.process"],
+    "eventlet": ["eventlet"],
+    "gevent": ["gevent"],
+    "pywebview": ["webview"],
+    "playwright": ["playwright"],
+    "spacy": ["spacy"],
+    "transformers": ["transformers"],
+    "glfw": ["glfw", "OpenGL"],
+    "dill-compat": ["dill", "cloudpickle"],
+    "pbr-compat": ["pbr"],
+    "pkg-resources": ["pkg_resources"],
+    "pmw-freezer": ["Pmw"],
+}
+
+# Nuitka 同时只允许启用一个Qt绑定插件，检测到多个时按此顺序选用
+QT_PLUGINS = ["pyside6", "pyqt6", "pyqt5", "pyside2"]
+
+
+def _matches(module: str, trigger: str) -> bool:
+    return module == trigger or module.startswith(trigger + ".")
+
+
+def get_plugin_triggers(plugin_name: str, modules: Iterable[str]) -> List[str]:
+    """导入图中触发该插件的模块（按触发项顺序去重）"""
+    modules = list(modules)
+    return [
+        trigger for trigger in PLUGIN_IMPORT_TRIGGERS.get(plugin_name, [])
+        if any(_matches(module, trigger) for module in modules)
+    ]
+
+
+def detect_plugins(modules: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """根据导入的模块推断需要启用的插件
+
+    Args:
+        modules: 导入图中出现的模块名（可含子模块，如 PySide6.QtWidgets）
+
+    Returns:
+        (建议启用的插件, 因Qt绑定冲突未选用的插件)；当前Nuitka不提供的插件不会建议
+    """
+    modules = set(modules)
+    available = set(get_plugin_names())
+    detected = [
+        name for name in PLUGIN_IMPORT_TRIGGERS
+        if name in available and get_plugin_triggers(name, modules)
+    ]
+    qt_detected = [name for name in QT_PLUGINS if name in detected]
+    dropped = qt_detected[1:]
+    return [name for name in detected if name not in dropped], dropped
+
+
+def find_unmatched_plugins(enabled_plugins: Iterable[str], modules: Iterable[str]) -> List[str]:
+    """已启用但导入图中没有对应导入的插件（无导入映射的插件不计入）"""
+    modules = set(modules)
+    return [
+        name for name in enabled_plugins
+        if name in PLUGIN_IMPORT_TRIGGERS and not get_plugin_triggers(name, modules)
+    ]
+
+
+def get_nuitka_version() -> Optional[str]:
+    """当前环境的Nuitka版本：优先读取包元数据（不启动Nuitka），否则执行 nuitka --version"""
+    for name in ("nuitka", "Nuitka"):
+        try:
+            return metadata.version(name)
+        except metadata.PackageNotFoundError:
+            continue
+    if not shutil.which("nuitka"):
+        return None
+    try:
+        result = subprocess.run(
+            ["nuitka", "--version"], capture_output=True, text=True, timeout=PLUGIN_LIST_TIMEOUT
+        )
+    except (subprocess.SubprocessError, OSError):
+        return None
+    output = result.stdout.strip()
+    return output.splitlines()[0].strip() if result.returncode == 0 and output else None
+
+
+def parse_plugin_list(output: str) -> List[Tuple[str, str]]:
+    """解析 nuitka --plugin-list 输出为 [(插件名, 说明)]，说明跨行时合并"""
+    plugins = []
+    for line in output.splitlines():
+        match = _PLUGIN_LINE.match(line)
+        if match:
+            plugins.append([match.group(1), match.group(2).strip()])
+        elif plugins and line.startswith("   ") and line.strip() and not line.strip().startswith("-"):
+            plugins[-1][1] += " " + line.strip()
+    return [(name, desc) for name, desc in plugins]
+
+
+def _query_plugin_list() -> List[Tuple[str, str]]:
+    """执行 nuitka --plugin-list，失败时返回空列表"""
+    try:
+        result = subprocess.run(
+            ["nuitka", "--plugin-list"], capture_output=True, text=True, timeout=PLUGIN_LIST_TIMEOUT
+        )
+    except (subprocess.SubprocessError, OSError) as e:
+        log_warning(f"⚠️  读取Nuitka插件列表失败: {e}")
+        return []
+    if result.returncode != 0:
+        log_warning(f"⚠️  读取Nuitka插件列表失败 (退出码 {result.returncode})，使用内置列表")
+        return []
+    return parse_plugin_list(result.stdout)
+
+
+def _load_plugin_catalogue() -> List[Tuple[str, str]]:
+    """按Nuitka版本读取插件列表：命中磁盘缓存时不启动Nuitka"""
+    version = get_nuitka_version()
+    if not version:
+        return list(NUITKA_PLUGINS)
+
+    cache = load_json_cache(PLUGIN_CACHE_NAME)
+    if not isinstance(cache, dict) or cache.get("version") != PLUGIN_CACHE_VERSION:
+        cache = {"version": PLUGIN_CACHE_VERSION, "nuitka": {}}
+    cached = cache["nuitka"].get(version)
+    if cached:
+        plugins = [tuple(item) for item in cached]
+    else:
+        log_info(f"🔌 正在读取 Nuitka {version} 的插件列表...")
+        plugins = _query_plugin_list()
+        if not plugins:
+            return list(NUITKA_PLUGINS)
+        cache["nuitka"][version] = plugins
+        save_json_cache(PLUGIN_CACHE_NAME, cache)
+
+    builtin: Dict[str, str] = dict(NUITKA_PLUGINS)
+    return [(name, builtin.get(name, desc)) for name, desc in plugins]
+
+
+def get_plugin_catalogue() -> List[Tuple[str, str]]:
+    """当前Nuitka版本的插件列表 [(插件名, 说明)]（进程内只读取一次）"""
+    global _catalogue
+    if _catalogue is None:
+        _catalogue = _load_plugin_catalogue()
+    return list(_catalogue)
+
 
 def get_plugin_list():
-    """获取插件列表"""
-    return NUITKA_PLUGINS.copy()
+    """获取插件菜单列表（含自定义插件选项）"""
+    return get_plugin_catalogue() + [CUSTOM_PLUGIN_ITEM]
 
 
 def get_plugin_names():
     """获取所有插件名称列表"""
-    return [plugin[0] for plugin in NUITKA_PLUGINS]
+    return [plugin[0] for plugin in get_plugin_catalogue()]
 
 
 def get_plugin_description(plugin_name):
     """根据插件名称获取描述"""
-    for name, desc in NUITKA_PLUGINS:
+    for name, desc in get_plugin_catalogue():
         if name == plugin_name:
             return desc
     return None
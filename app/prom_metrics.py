@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Prometheus指标导出模块 - 以文本格式写出构建/打包结果，供 node_exporter textfile collector 采集
+
+所有指标带 app 和 tool（构建工具）标签，与生成的 build.py 中写出的指标可以按这两个标签关联；
+打包指标使用 python_build_packaging_ 前缀并额外带 packager（打包工具）标签。
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .logger_utils import log_info, log_warning
+
+
+def escape_label_value(value) -> str:
+    """转义标签值中的反斜杠、双引号和换行"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Dict) -> str:
+    """格式化标签，如 {app="demo",tool="nuitka",packager="nfpm"}"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+class PromTextfile:
+    """Prometheus 文本格式指标集合"""
+
+    def __init__(self, **base_labels):
+        self.base_labels = base_labels
+        # {指标名: (类型, 说明, [(标签, 值)])}，保持添加顺序
+        self._metrics: Dict[str, Tuple[str, str, List[Tuple[Dict, float]]]] = {}
+
+    def add(self, name: str, value, help_text: str, metric_type: str = "gauge", **labels):
+        """添加一个样本，值为None时忽略"""
+        if value is None:
+            return
+        _, _, samples = self._metrics.setdefault(name, (metric_type, help_text, []))
+        samples.append(({**self.base_labels, **labels}, value))
+
+    def render(self) -> str:
+        """渲染为 Prometheus 文本格式"""
+        lines = []
+        for name, (metric_type, help_text, samples) in self._metrics.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> bool:
+        """原子写入 .prom 文件（先写临时文件再重命名，避免采集到半个文件）"""
+        target = Path(path)
+        temp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temp.write_text(self.render(), encoding="utf-8")
+            os.replace(temp, target)
+        except OSError as e:
+            log_warning(f"⚠️  写入Prometheus指标失败: {e}")
+            temp.unlink(missing_ok=True)
+            return False
+        log_info(f"📈 Prometheus指标已写入: {path}")
+        return True
@@ -3,10 +3,17 @@
 脚本生成模块 - 处理Nuitka和PyInstaller参数和脚本生成
 """
 
+import hashlib
 import sys
 from pathlib import Path
+from types import MappingProxyType
 from typing import List
+from .build_config import BuildConfig, GenerationResult
+from .build_history import HISTORY_SCHEMA
 from .template import BUILD_SCRIPT_TEMPLATE, PYINSTALLER_BUILD_SCRIPT_TEMPLATE
+from .template_engine import compile_template
+from .ninja_generator import NinjaGenerator
+from .trace_utils import TRACER
 from .version_info_template import VERSION_INFO_TEMPLATE
 from .tool_analyzer import ToolRequirementAnalyzer
 from .common_utils import ConfigHelper, PathHelper
@@ -17,6 +24,7 @@ class ScriptGenerator:
     
     def __init__(self):
         self.tool_analyzer = ToolRequirementAnalyzer()
+        self.ninja_generator = NinjaGenerator()
 
     def generate_nuitka_args(self, config) -> List[str]:
         """生成Nuitka编译参数列表"""
@@ -94,6 +102,10 @@ class ScriptGenerator:
         for plugin in config.enable_plugins:
             args.append(f"--enable-plugin={plugin}")
 
+        # 强制包含的模块（如导入追踪发现的动态导入）
+        for module in config.include_modules:
+            args.append(f"--include-module={module}")
+
         # 排除包导入
         for package in config.exclude_packages:
             args.append(f"--nofollow-import-to={package}")
@@ -117,6 +129,9 @@ class ScriptGenerator:
         else:
             args.append("--onedir")
 
+        # 输出目录已存在时直接覆盖，不询问确认（无人值守/无终端构建时询问会导致失败或挂起）
+        args.append("--noconfirm")
+
         # 控制台窗口
         if not config.show_console:
             args.append("--windowed")
@@ -148,6 +163,14 @@ class ScriptGenerator:
         for data_path in config.add_data:
             args.append(f"--add-data={data_path}")
 
+        # 添加动态库
+        for binary_path in config.add_binary:
+            args.append(f"--add-binary={binary_path}")
+
+        # 复制发行包元数据（运行时通过 importlib.metadata 读取）
+        for distribution in config.copy_metadata:
+            args.append(f"--copy-metadata={distribution}")
+
         # 排除包
         for package in config.exclude_packages:
             args.append(f"--exclude-module={package}")
@@ -186,6 +209,63 @@ class ScriptGenerator:
         else:
             raise ValueError(f"不支持的构建工具: {config.build_tool}")
 
+    def generate(self, config: BuildConfig, mode: str = "full") -> GenerationResult:
+        """线程安全的纯生成接口：不修改配置、不写文件、不输出日志
+
+        Args:
+            config: 不可变构建配置
+            mode: full（编译+Linux包）/ compile（仅编译）/ package（仅Linux包脚本）
+
+        Returns:
+            GenerationResult: 参数列表、脚本内容、脚本文件名、元数据和附加文件（如 build.ninja）
+        """
+        extra_files = {}
+        if mode == "package":
+            config = config.replace(generate_linux_packages=True)
+            if config.script_filename == "build.py":
+                # 与交互式打包模式的默认脚本名保持一致
+                config = config.replace(script_filename="create_packages.py")
+            args = ()
+            with TRACER.span("render_package_script", app=config.app_name):
+                script = self.generate_package_script(config)
+        elif mode in ("full", "compile"):
+            if mode == "compile":
+                config = config.replace(generate_linux_packages=False)
+            with TRACER.span("generate_build_args", tool=config.build_tool):
+                args = tuple(self.generate_build_args(config))
+            with TRACER.span("render_script", app=config.app_name):
+                script = self.generate_python_script(list(args), config)
+            if config.generate_ninja:
+                with TRACER.span("generate_ninja"):
+                    extra_files = self.ninja_generator.generate_files(config, list(args))
+        else:
+            raise ValueError(f"不支持的生成模式: {mode}")
+
+        with TRACER.span("analyze_requirements"):
+            requirements = {
+                key: tuple(values)
+                for key, values in self.tool_analyzer.analyze_requirements(config).items()
+            }
+
+        metadata = {
+            "mode": mode,
+            "build_tool": config.build_tool,
+            "app_name": config.app_name,
+            "config_hash": config.config_hash(),
+            "script_sha256": hashlib.sha256(script.encode("utf-8")).hexdigest(),
+            "script_bytes": len(script.encode("utf-8")),
+            "requirements": requirements,
+            "extra_files": tuple(extra_files),
+        }
+
+        return GenerationResult(
+            args=args,
+            script=script,
+            script_filename=config.script_filename,
+            metadata=MappingProxyType(metadata),
+            extra_files=MappingProxyType(extra_files),
+        )
+
     def generate_python_script(self, args: List[str], config) -> str:
         """生成Python构建脚本"""
         # 使用通用工具格式化参数
@@ -200,66 +280,55 @@ class ScriptGenerator:
 
         entry_name = Path(config.entry_file).name
 
-        # 根据构建工具选择模板并格式化
+        values = {
+            "entry_name": entry_name,
+            "output_dir": config.output_dir,
+            "console_display": "是" if config.show_console else "否",
+            "app_name": config.app_name,
+            "args_str": args_str,
+            "copy_dirs_str": copy_dirs_str,
+            "linux_package_code": linux_package_code,
+            "required_tools_code": required_tools_code,
+            "linux_package_enabled": getattr(config, 'generate_linux_packages', False),
+            "linux_package_types": list(getattr(config, 'linux_package_types', [])),
+            "config_hash": self._config_hash(config),
+            "history_schema": HISTORY_SCHEMA,
+            "isolated_build": bool(getattr(config, "isolated_build", False)),
+        }
+
+        # 根据构建工具选择预编译模板，单次渲染
         if config.build_tool == "nuitka":
-            template = BUILD_SCRIPT_TEMPLATE
-            # 先替换工具特定的占位符
-            template = template.replace("{{tool_name}}", "Nuitka")
-            template = template.replace("{{tool_name_lower}}", "nuitka")
-            
-            # 替换Linux包相关占位符
-            template = template.replace("{linux_package_enabled}", str(getattr(config, 'generate_linux_packages', False)))
-            template = template.replace("{linux_package_types}", str(getattr(config, 'linux_package_types', [])))
-            
-            # 替换Linux包生成代码中的占位符
-            linux_package_code = linux_package_code.replace("{config.output_dir}", config.output_dir)
-            linux_package_code = linux_package_code.replace("{config.app_name}", config.app_name)
-            
-            script_content = template.format(
+            template = compile_template(BUILD_SCRIPT_TEMPLATE)
+            values.update(
                 script_type="Nuitka",
-                entry_name=entry_name,
-                output_dir=config.output_dir,
+                tool_name="Nuitka",
+                tool_name_lower="nuitka",
                 compiler=config.compiler,
-                console_display="是" if config.show_console else "否",
-                app_name=config.app_name,
-                args_str=args_str,
-                copy_dirs_str=copy_dirs_str,
-                linux_package_code=linux_package_code,
-                required_tools_code=required_tools_code,
             )
         elif config.build_tool == "pyinstaller":
-            template = PYINSTALLER_BUILD_SCRIPT_TEMPLATE
-            # 先替换工具特定的占位符
-            template = template.replace("{{tool_name}}", "PyInstaller")
-            template = template.replace("{{tool_name_lower}}", "pyinstaller")
-            
-            # 替换Linux包相关占位符
-            template = template.replace("{linux_package_enabled}", str(getattr(config, 'generate_linux_packages', False)))
-            template = template.replace("{linux_package_types}", str(getattr(config, 'linux_package_types', [])))
-            
-            # 替换Linux包生成代码中的占位符
-            linux_package_code = linux_package_code.replace("{config.output_dir}", config.output_dir)
-            linux_package_code = linux_package_code.replace("{config.app_name}", config.app_name)
-            
-            script_content = template.format(
+            template = compile_template(PYINSTALLER_BUILD_SCRIPT_TEMPLATE)
+            values.update(
                 script_type="PyInstaller",
-                entry_name=entry_name,
-                output_dir=config.output_dir,
+                tool_name="PyInstaller",
+                tool_name_lower="pyinstaller",
                 onefile="是" if config.onefile else "否",
-                console_display="是" if config.show_console else "否",
-                app_name=config.app_name,
                 company_name=config.company_name or "Unknown Company",
                 file_version=config.file_version,
-                args_str=args_str,
-                copy_dirs_str=copy_dirs_str,
-                linux_package_code=linux_package_code,
-                required_tools_code=required_tools_code,
             )
         else:
             raise ValueError(f"不支持的构建工具: {config.build_tool}")
 
+        script_content = template.render(**values)
+
         return script_content
 
+    @staticmethod
+    def _config_hash(config) -> str:
+        """计算配置哈希（兼容 ConfigCollector）"""
+        if not isinstance(config, BuildConfig):
+            config = BuildConfig.from_collector(config)
+        return config.config_hash()
+
     def _format_args_for_template(self, args: List[str]) -> str:
         """格式化参数列表为模板字符串"""
         args_list = [f'    "{arg}",' for arg in args]
@@ -273,42 +342,63 @@ class ScriptGenerator:
         return "".join(dirs_list)
 
     def _generate_linux_package_code(self, config) -> str:
-        """生成Linux包生成代码（完全独立实现）"""
+        """生成Linux包生成代码（完全独立实现，每种包类型一个构建阶段）"""
         if not getattr(config, 'generate_linux_packages', False):
-            return "    # Linux包生成已禁用"
+            return '''def get_package_stages():
+    """Linux包生成已禁用"""
+    return []'''
         
         # 格式化包类型列表
         package_types_str = ", ".join([f'"{pkg}"' for pkg in config.linux_package_types])
         depends_str = ", ".join([f'"{dep}"' for dep in getattr(config, 'package_depends', [])])
         
         # 生成完全独立的Linux包生成代码
-        code = f'''
-    # 生成Linux安装包
-    generate_linux_packages_standalone([{package_types_str}], 
-                                     "{getattr(config, 'package_architecture', 'amd64')}",
-                                     "{getattr(config, 'package_install_path', '/usr/local/bin')}",
-                                     [{depends_str}],
-                                     "{getattr(config, 'package_desktop_name', '')}",
-                                     {getattr(config, 'package_create_service', False)},
-                                     "{getattr(config, 'package_service_name', '')}",
-                                     "{getattr(config, 'package_output_dir', 'output_pkg')}")
-
-
-def generate_linux_packages_standalone(package_types, architecture, install_path, depends, desktop_name, create_service, service_name, output_dir):
-    """独立的Linux包生成函数"""
+        code = f'''# Linux包生成选项
+LINUX_PACKAGE_TYPES = [{package_types_str}]
+LINUX_PACKAGE_OPTIONS = {{
+    "architecture": "{getattr(config, 'package_architecture', 'amd64')}",
+    "install_path": "{getattr(config, 'package_install_path', '/usr/local/bin')}",
+    "depends": [{depends_str}],
+    "desktop_name": "{getattr(config, 'package_desktop_name', '')}",
+    "create_service": {getattr(config, 'package_create_service', False)},
+    "service_name": "{getattr(config, 'package_service_name', '')}",
+    "output_dir": "{getattr(config, 'package_output_dir', 'output_pkg')}",
+}}
+
+
+def get_package_stages():
+    """Linux包生成阶段：依赖编译阶段，各包类型之间互相独立可并行"""
+    stages = []
+    for pkg_type in LINUX_PACKAGE_TYPES:
+        stages.append(BuildStage(
+            f"package_{{pkg_type}}",
+            lambda pkg_type=pkg_type: generate_linux_package_standalone(pkg_type, **LINUX_PACKAGE_OPTIONS),
+            deps=["compile"],
+            inputs=lambda: [find_build_executable(), "options:" + repr(LINUX_PACKAGE_OPTIONS)],
+            outputs=lambda pkg_type=pkg_type: [str(get_package_target(pkg_type, **LINUX_PACKAGE_OPTIONS))],
+        ))
+    return stages
+
+
+def get_package_target(pkg_type, architecture, output_dir, **_):
+    """Linux包输出路径"""
+    return Path(output_dir) / f"{config.app_name}_1.0.0_{{architecture}}.{{pkg_type}}"
+
+
+def generate_linux_package_standalone(pkg_type, architecture, install_path, depends, desktop_name, create_service, service_name, output_dir):
+    """独立的Linux包生成函数（单个包类型）"""
     import subprocess
     import json
     import tempfile
     
-    log_info("📦 开始生成Linux安装包...")
+    log_info(f"📦 开始生成{{pkg_type.upper()}}安装包...")
     
     # 查找可执行文件（只在输出目录中查找）
-    build_dirs = ["{config.output_dir}"]
-    exe_file = find_executable_in_dirs(build_dirs)
+    exe_file = find_build_executable()
     
     if not exe_file:
         log_error("❌ 未找到可执行文件")
-        return False
+        raise BuildStageError("Linux包生成失败: 未找到可执行文件")
     
     log_info(f"📁 找到可执行文件: {{exe_file}}")
     
@@ -316,79 +406,215 @@ def generate_linux_packages_standalone(package_types, architecture, install_path
     if not shutil.which("nfpm"):
         log_error("❌ 未找到nfpm工具")
         log_info("💡 请安装nfpm: https://nfpm.goreleaser.com/install/")
-        return False
+        raise BuildStageError("Linux包生成失败: 未找到nfpm工具")
+    
+    # 创建输出目录
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    
+    app_name = "{config.app_name}"
+    
+    # 生成nfpm配置
+    nfpm_config = {{
+        "name": app_name,
+        "arch": architecture,
+        "platform": "linux",
+        "version": "1.0.0",
+        "section": "default",
+        "priority": "extra",
+        "maintainer": "ASLant <unknown@example.com>",
+        "description": f"{{app_name}} application",
+        "homepage": "",
+        "license": "MIT",
+        "contents": [
+            {{
+                "src": exe_file,
+                "dst": f"{{install_path}}/{{app_name}}",
+                "file_info": {{
+                    "mode": 0o755
+                }}
+            }}
+        ]
+    }}
+    
+    # 添加依赖
+    if depends:
+        nfpm_config["depends"] = depends
+    
+    # 创建临时配置文件（使用JSON格式，无需额外依赖）
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+        json.dump(nfpm_config, f, indent=2)
+        config_file = f.name
     
     try:
-        # 创建输出目录
-        output_path = Path(output_dir)
-        output_path.mkdir(exist_ok=True)
+        # 生成包
+        output_file = get_package_target(pkg_type, architecture, output_dir)
+        cmd = ["nfpm", "package", "--packager", pkg_type, "--config", config_file, "--target", str(output_file)]
         
-        app_name = "{config.app_name}"
+        result = subprocess.run(cmd, capture_output=True, text=True)
         
-        # 生成nfpm配置
-        nfpm_config = {{
-            "name": app_name,
-            "arch": architecture,
-            "platform": "linux",
-            "version": "1.0.0",
-            "section": "default",
-            "priority": "extra",
-            "maintainer": "ASLant <unknown@example.com>",
-            "description": f"{{app_name}} application",
-            "homepage": "",
-            "license": "MIT",
-            "contents": [
-                {{
-                    "src": exe_file,
-                    "dst": f"{{install_path}}/{{app_name}}",
-                    "file_info": {{
-                        "mode": 0o755
-                    }}
-                }}
-            ]
+        if result.returncode != 0:
+            log_error(f"❌ {{pkg_type.upper()}}包生成失败: {{result.stderr}}")
+            raise BuildStageError(f"Linux包生成失败: {{pkg_type}}")
+        
+        log_success(f"✅ {{pkg_type.upper()}}包生成成功: {{output_file}}")
+        BUILD_RESULT.setdefault("packages", {{}})[pkg_type] = {{
+            "path": str(output_file),
+            "bytes": output_file.stat().st_size,
         }}
+    finally:
+        # 清理临时文件
+        Path(config_file).unlink(missing_ok=True)'''
+        return code
+
+    def generate_package_script(self, config) -> str:
+        """生成使用预配置参数的独立Linux包生成脚本 (create_packages.py)"""
+        return f'''
+# -*- coding: utf-8 -*-
+"""
+Linux包生成脚本
+自动生成的独立打包脚本
+使用预配置参数，无需重新输入
+"""
+
+import sys
+import os
+import json
+import argparse
+from pathlib import Path
+
+# 添加app目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent / "app"))
+
+from app.package_generators import LinuxPackageGenerator
+from app.logger_utils import log_info, log_success, log_error
+
+
+def parse_options():
+    """解析命令行参数和环境变量"""
+    def env_flag(name):
+        return os.environ.get(name, "").strip().lower() in ("1", "true", "yes")
+
+    parser = argparse.ArgumentParser(description="Linux包生成脚本")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        default=env_flag("BUILD_HEADLESS") or env_flag("CI"),
+        help="无头模式：跳过所有交互提示 (环境变量: BUILD_HEADLESS=1 或 CI=true)",
+    )
+    parser.add_argument(
+        "--result-json",
+        default=os.environ.get("BUILD_RESULT_JSON"),
+        metavar="FILE",
+        help="将打包结果摘要写入JSON文件 (环境变量: BUILD_RESULT_JSON)",
+    )
+    parser.add_argument(
+        "--prom-file",
+        default=os.environ.get("BUILD_PROM_FILE"),
+        metavar="FILE",
+        help="将打包指标写入Prometheus textfile (.prom) (环境变量: BUILD_PROM_FILE)",
+    )
+    return parser.parse_args()
+
+
+OPTIONS = parse_options()
+RESULT = {{"app_name": "{config.app_name}", "packages": {list(config.linux_package_types)}}}
+
+
+def main():
+    """主函数"""
+    try:
+        log_info("📦 Linux包生成脚本")
+        log_info("=" * 60)
         
-        # 添加依赖
-        if depends:
-            nfpm_config["depends"] = depends
+        # 查找可执行文件
+        build_dirs = ["build", "dist"]
+        exe_file = None
         
-        # 为每种包类型生成包
-        for pkg_type in package_types:
-            log_info(f"🔨 生成{{pkg_type.upper()}}包...")
-            
-            # 创建临时配置文件（使用JSON格式，无需额外依赖）
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-                import json
-                json.dump(nfpm_config, f, indent=2)
-                config_file = f.name
-            
-            try:
-                # 生成包
-                output_file = output_path / f"{{app_name}}_1.0.0_{{architecture}}.{{pkg_type}}"
-                cmd = ["nfpm", "package", "--packager", pkg_type, "--config", config_file, "--target", str(output_file)]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                
-                if result.returncode == 0:
-                    log_success(f"✅ {{pkg_type.upper()}}包生成成功: {{output_file}}")
-                else:
-                    log_error(f"❌ {{pkg_type.upper()}}包生成失败: {{result.stderr}}")
-                    
-            finally:
-                # 清理临时文件
-                Path(config_file).unlink(missing_ok=True)
+        for build_dir in build_dirs:
+            build_path = Path(build_dir)
+            if build_path.exists():
+                for file_path in build_path.rglob("*"):
+                    if file_path.is_file() and file_path.suffix not in ['.spec', '.txt', '.log', '.exe']:
+                        if os.access(file_path, os.X_OK) or file_path.suffix == '':
+                            exe_file = str(file_path)
+                            break
+                if exe_file:
+                    break
         
-        log_success("✅ Linux包生成完成！")
-        return True
+        if not exe_file:
+            log_error("❌ 未找到可执行文件")
+            log_info("📝 请确保在 build/ 或 dist/ 目录中有可执行文件")
+            RESULT["reason"] = "未找到可执行文件"
+            return False
+        
+        log_info(f"📁 找到可执行文件: {{exe_file}}")
         
-    except ImportError:
-        log_error("❌ 缺少json模块（这不应该发生，json是Python标准库）")
+        # 使用预配置参数创建生成器
+        generator = LinuxPackageGenerator()
+        
+        # 设置预配置参数
+        generator.app_name = "{config.app_name}"
+        generator.version = "{config.file_version}"
+        generator.description = "{getattr(config, 'description', config.app_name + ' application')}"
+        generator.maintainer = "{getattr(config, 'company_name', 'Unknown')} <unknown@example.com>"
+        generator.url = "{getattr(config, 'url', '')}"
+        generator.license = "MIT"
+        generator.executable_path = exe_file
+        generator.install_path = "{getattr(config, 'package_install_path', '/usr/local/bin')}"
+        generator.packaging_tool = "{config.linux_packaging_tool}"
+        generator.build_tool = "{config.build_tool}"
+        generator.package_types = {list(config.linux_package_types)}
+        
+        # 设置扩展参数
+        generator.architecture = "{getattr(config, 'package_architecture', 'amd64')}"
+        generator.depends = {list(getattr(config, 'package_depends', []))}
+        generator.desktop_file = "{getattr(config, 'package_desktop_name', '')}"
+        generator.create_service = {getattr(config, 'package_create_service', False)}
+        generator.service_name = "{getattr(config, 'package_service_name', '')}"
+        generator.output_dir = "{getattr(config, 'package_output_dir', 'output_pkg')}"
+        generator.prom_file = OPTIONS.prom_file or ""
+        
+        log_info("🚀 使用预配置参数开始打包...")
+        log_info(f"📝 应用名称: {{generator.app_name}}")
+        log_info(f"💻 目标架构: {{generator.architecture}}")
+        log_info(f"📁 安装路径: {{generator.install_path}}")
+        log_info(f"📦 包类型: {{', '.join(generator.package_types)}}")
+        log_info(f"📂 输出目录: {{generator.output_dir}}")
+        
+        # 生成包
+        RESULT["executable"] = exe_file
+        success = generator.generate_packages()
+        
+        if success:
+            log_success("🎉 Linux包生成完成！")
+            log_info(f"📦 包文件已保存在: {{generator.output_dir}}/")
+        else:
+            log_error("❌ Linux包生成失败")
+            RESULT["reason"] = "Linux包生成失败"
+            
+        return success
+        
+    except KeyboardInterrupt:
+        log_info("👋 用户取消操作")
+        RESULT["reason"] = "用户取消"
         return False
     except Exception as e:
         log_error(f"❌ 生成Linux包时发生错误: {{e}}")
+        RESULT["reason"] = str(e)
         return False
+    finally:
+        if not OPTIONS.headless:
+            input("按下任意键退出...")
+
+if __name__ == "__main__":
+    success = main()
+    RESULT["status"] = "success" if success else "failed"
+    RESULT["exit_code"] = 0 if success else 1
+    if OPTIONS.result_json:
+        Path(OPTIONS.result_json).write_text(json.dumps(RESULT, ensure_ascii=False, indent=2), encoding="utf-8")
+    sys.exit(RESULT["exit_code"])
 '''
-        return code
 
     def generate_version_info_file(self, config) -> str:
         """生成PyInstaller版本信息文件内容"""
@@ -447,6 +673,21 @@ def generate_linux_packages_standalone(package_types, architecture, install_path
             logger.error(f"❌ 生成版本信息文件时发生未知错误: {e}")
             return False
 
+    def save_extra_files(self, extra_files, config) -> bool:
+        """保存生成结果中的附加文件（如 build.ninja）到项目目录"""
+        from loguru import logger
+
+        for filename, content in extra_files.items():
+            file_path = Path(config.project_dir) / filename
+            try:
+                with open(file_path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                logger.success(f"✅ 已保存: {file_path.absolute()}")
+            except OSError as e:
+                logger.error(f"❌ 保存 {filename} 失败: {e}")
+                return False
+        return True
+
     def save_script(self, script_content: str, config, filename: str = None) -> bool:
         """保存脚本到文件"""
         try:
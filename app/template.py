@@ -6,6 +6,15 @@
 from .template_common import (
     COMMON_IMPORTS_AND_SETUP,
     COMMON_LOG_FUNCTIONS,
+    COMMON_HEADLESS_FUNCTIONS,
+    COMMON_PREFLIGHT_FUNCTIONS,
+    COMMON_STAGE_FUNCTIONS,
+    COMMON_RESOURCE_FUNCTIONS,
+    COMMON_TRACE_FUNCTIONS,
+    COMMON_HISTORY_FUNCTIONS,
+    COMMON_PROMETHEUS_FUNCTIONS,
+    COMMON_PRECHECK_FUNCTIONS,
+    COMMON_ISOLATED_ENV_FUNCTIONS,
     COMMON_ENV_CHECK_FUNCTION,
     COMMON_COPY_FILES_FUNCTION,
     COMMON_MAIN_START,
@@ -14,6 +23,23 @@ from .template_common import (
 
 # Nuitka特定的工具检查函数
 NUITKA_TOOL_CHECK = '''
+# 参与预检缓存键计算的模块和工具
+PREFLIGHT_MODULES = ["nuitka"]
+PREFLIGHT_TOOLS = ["clang", "gcc", "nfpm", "dpkg-deb", "rpmbuild"]
+
+# 隔离构建时安装的发行包和运行的模块 (python -m nuitka)
+BUILD_TOOL_PACKAGE = "nuitka"
+BUILD_TOOL_MODULE = "nuitka"
+
+# 编译输出中标志各编译子阶段开始的文本（按出现顺序，用于 --trace）
+COMPILE_PHASE_MARKERS = [
+    ("Starting Python compilation", "python_compile"),
+    ("Generating source code for C backend", "c_codegen"),
+    ("Running C compilation", "c_compile"),
+    ("Backend linking", "link"),
+    ("Creating single file", "onefile"),
+]
+
 def check_nuitka():
     """检查Nuitka是否已安装"""
     return check_tool_installed("Nuitka", "nuitka")
@@ -89,6 +115,15 @@ def _build_nuitka_template():
     return (
         COMMON_IMPORTS_AND_SETUP +
         COMMON_LOG_FUNCTIONS +
+        COMMON_HEADLESS_FUNCTIONS +
+        COMMON_PREFLIGHT_FUNCTIONS +
+        COMMON_STAGE_FUNCTIONS +
+        COMMON_RESOURCE_FUNCTIONS +
+        COMMON_TRACE_FUNCTIONS +
+        COMMON_HISTORY_FUNCTIONS +
+        COMMON_PROMETHEUS_FUNCTIONS +
+        COMMON_PRECHECK_FUNCTIONS +
+        COMMON_ISOLATED_ENV_FUNCTIONS +
         COMMON_ENV_CHECK_FUNCTION +
         NUITKA_TOOL_CHECK +
         COMMON_COPY_FILES_FUNCTION +
@@ -102,6 +137,23 @@ BUILD_SCRIPT_TEMPLATE = _build_nuitka_template()
 
 # PyInstaller特定的工具检查函数
 PYINSTALLER_TOOL_CHECK = '''
+# 参与预检缓存键计算的模块和工具
+PREFLIGHT_MODULES = ["PyInstaller"]
+PREFLIGHT_TOOLS = ["nfpm", "dpkg-deb", "rpmbuild"]
+
+# 隔离构建时安装的发行包和运行的模块 (python -m PyInstaller)
+BUILD_TOOL_PACKAGE = "pyinstaller"
+BUILD_TOOL_MODULE = "PyInstaller"
+
+# 编译输出中标志各编译子阶段开始的文本（按出现顺序，用于 --trace）
+COMPILE_PHASE_MARKERS = [
+    ("Analyzing", "analysis"),
+    ("Building PYZ", "pyz"),
+    ("Building PKG", "pkg"),
+    ("Building EXE", "exe"),
+    ("Building COLLECT", "collect"),
+]
+
 def check_pyinstaller():
     """检查PyInstaller是否已安装"""
     return check_tool_installed("PyInstaller", "PyInstaller")
@@ -165,6 +217,15 @@ def _build_pyinstaller_template():
     return (
         COMMON_IMPORTS_AND_SETUP +
         COMMON_LOG_FUNCTIONS +
+        COMMON_HEADLESS_FUNCTIONS +
+        COMMON_PREFLIGHT_FUNCTIONS +
+        COMMON_STAGE_FUNCTIONS +
+        COMMON_RESOURCE_FUNCTIONS +
+        COMMON_TRACE_FUNCTIONS +
+        COMMON_HISTORY_FUNCTIONS +
+        COMMON_PROMETHEUS_FUNCTIONS +
+        COMMON_PRECHECK_FUNCTIONS +
+        COMMON_ISOLATED_ENV_FUNCTIONS +
         COMMON_ENV_CHECK_FUNCTION +
         PYINSTALLER_TOOL_CHECK +
         COMMON_COPY_FILES_FUNCTION +
@@ -14,17 +14,23 @@ COMMON_IMPORTS_AND_SETUP = '''# -*- coding: utf-8 -*-
 import os
 import sys
 import shutil
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime'''
 
 # 公共日志函数
 COMMON_LOG_FUNCTIONS = '''
+_LOG_LOCK = threading.Lock()
+
 def log_message(level, message, end='\\n'):
-    """输出日志信息"""
+    """输出日志信息（并行阶段共用，加锁避免输出交错）"""
     colors = {{'INFO': '\\033[94m', 'SUCCESS': '\\033[92m', 'ERROR': '\\033[91m', 'WARNING': '\\033[93m'}}
     color = colors.get(level, '\\033[0m')
     timestamp = datetime.now().strftime("%H:%M:%S")
-    print(f"{{timestamp}} | {{color}}{{level:<7}}\\033[0m | {{message}}", end=end)
+    with _LOG_LOCK:
+        print(f"{{timestamp}} | {{color}}{{level:<7}}\\033[0m | {{message}}", end=end, flush=True)
 
 def log_info(message, end='\\n'): log_message('INFO', message, end)
 def log_success(message, end='\\n'): log_message('SUCCESS', message, end)  
@@ -35,12 +41,17 @@ def log_warning(message, end='\\n'): log_message('WARNING', message, end)
 def check_tool_installed(tool_name, import_name=None, silent=False):
     """检查工具是否已安装"""
     if import_name:
+        # 仅定位模块而不执行导入，避免加载整个包
+        import importlib.util
         try:
-            __import__(import_name)
+            spec = importlib.util.find_spec(import_name)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is not None:
             if not silent:
                 log_success(f"✅ {{tool_name}}已安装")
             return True
-        except ImportError:
+        else:
             if not silent:
                 log_error(f"❌ {{tool_name}}未安装！")
                 log_info(f"📦 请运行: pip install {{tool_name.lower()}}")
@@ -86,13 +97,206 @@ def find_executable_in_dirs(dirs, exclude_extensions=None):
     
     return None'''
 
+# 公共无头模式函数
+COMMON_HEADLESS_FUNCTIONS = '''
+
+
+def _env_flag(name):
+    """读取布尔型环境变量"""
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes")
+
+
+def parse_build_options():
+    """解析构建脚本的命令行参数和环境变量"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="自动生成的构建脚本")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        default=_env_flag("BUILD_HEADLESS") or _env_flag("CI"),
+        help="无头模式：跳过所有交互提示 (环境变量: BUILD_HEADLESS=1 或 CI=true)",
+    )
+    parser.add_argument(
+        "--result-json",
+        default=os.environ.get("BUILD_RESULT_JSON"),
+        metavar="FILE",
+        help="将构建结果摘要写入JSON文件 (环境变量: BUILD_RESULT_JSON)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        default=_env_flag("BUILD_FORCE"),
+        help="忽略阶段缓存，重新执行所有构建阶段 (环境变量: BUILD_FORCE=1)",
+    )
+    parser.add_argument(
+        "--sample-interval",
+        type=float,
+        default=float(os.environ.get("BUILD_SAMPLE_INTERVAL") or 0.5),
+        metavar="SECONDS",
+        help="编译期间采样编译器进程树资源使用的间隔秒数，0为禁用 (环境变量: BUILD_SAMPLE_INTERVAL，默认: 0.5)",
+    )
+    parser.add_argument(
+        "--history-db",
+        default=os.environ.get("BUILD_HISTORY_DB", ".build_history.db"),
+        metavar="FILE",
+        help="构建历史SQLite数据库 (环境变量: BUILD_HISTORY_DB，默认: .build_history.db)",
+    )
+    parser.add_argument(
+        "--no-history",
+        dest="history_db",
+        action="store_const",
+        const="",
+        help="不记录构建历史",
+    )
+    parser.add_argument(
+        "--trace",
+        default=os.environ.get("BUILD_TRACE"),
+        metavar="FILE",
+        help="将各阶段、编译子阶段和资源采样写入 Chrome Trace 格式的 trace.json (环境变量: BUILD_TRACE)",
+    )
+    parser.add_argument(
+        "--prom-file",
+        default=os.environ.get("BUILD_PROM_FILE"),
+        metavar="FILE",
+        help="将构建指标写入Prometheus textfile (.prom)，供 node_exporter 采集 (环境变量: BUILD_PROM_FILE)",
+    )
+    parser.add_argument(
+        "--skip-precheck",
+        action="store_true",
+        default=_env_flag("BUILD_SKIP_PRECHECK"),
+        help="跳过编译前的语法预检 (环境变量: BUILD_SKIP_PRECHECK=1)",
+    )
+    parser.add_argument(
+        "--isolated",
+        action="store_true",
+        default=_env_flag("BUILD_ISOLATED") or {isolated_build},
+        help="在只包含项目依赖的隔离环境中构建，环境按锁文件哈希缓存于 .build_env/ (环境变量: BUILD_ISOLATED=1)",
+    )
+    parser.add_argument(
+        "--no-isolated",
+        dest="isolated",
+        action="store_false",
+        help="使用当前环境构建",
+    )
+    options, _ = parser.parse_known_args()
+    return options
+
+
+BUILD_OPTIONS = parse_build_options()
+BUILD_RESULT = {{
+    "tool": "{tool_name}",
+    "app_name": "{app_name}",
+    "output_dir": "{output_dir}",
+    "config_hash": "{config_hash}",
+    "started_at": datetime.now().isoformat(),
+}}
+_RESULT_LOCK = threading.Lock()
+# 构建时钟起点：阶段、追踪区间和资源采样的时间均相对于此
+BUILD_CLOCK = time.perf_counter()
+
+
+def build_clock():
+    """距构建开始的秒数"""
+    return time.perf_counter() - BUILD_CLOCK
+
+
+def exit_build(exit_code, reason=""):
+    """结束构建：写入结果摘要并以指定退出码退出"""
+    BUILD_RESULT["status"] = "success" if exit_code == 0 else "failed"
+    BUILD_RESULT["exit_code"] = exit_code
+    BUILD_RESULT["reason"] = reason
+    BUILD_RESULT["finished_at"] = datetime.now().isoformat()
+    BUILD_RESULT["duration_seconds"] = round(
+        (datetime.now() - datetime.fromisoformat(BUILD_RESULT["started_at"])).total_seconds(), 3
+    )
+    collect_build_metrics()
+
+    if BUILD_OPTIONS.result_json:
+        try:
+            import json
+            Path(BUILD_OPTIONS.result_json).write_text(
+                json.dumps(BUILD_RESULT, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+        except OSError as e:
+            log_warning(f"⚠️  写入构建结果失败: {{e}}")
+
+    if BUILD_OPTIONS.trace:
+        write_trace(BUILD_OPTIONS.trace)
+    if BUILD_OPTIONS.prom_file:
+        write_prom_metrics(BUILD_OPTIONS.prom_file)
+    record_build_history()
+    sys.exit(exit_code)'''
+
+# 公共预检缓存函数
+COMMON_PREFLIGHT_FUNCTIONS = '''
+
+PREFLIGHT_STAMP_FILE = Path(".build_preflight.json")
+
+
+def _path_mtime(path):
+    """获取路径修改时间，不存在时返回None"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+def get_preflight_key(tools, modules):
+    """计算预检缓存键（基于解释器、PATH、构建脚本和工具修改时间）"""
+    import hashlib
+    import importlib.util
+
+    parts = [sys.executable, sys.version, os.environ.get("PATH", ""), str(_path_mtime(__file__))]
+
+    for module_name in modules:
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            spec = None
+        origin = spec.origin if spec else None
+        parts.append(f"{{module_name}}={{origin}}@{{_path_mtime(origin)}}")
+
+    for tool in tools:
+        tool_path = shutil.which(tool)
+        parts.append(f"{{tool}}={{tool_path}}@{{_path_mtime(tool_path)}}")
+
+    return hashlib.sha256("\\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def is_preflight_cached(key):
+    """检查预检缓存是否有效"""
+    if os.environ.get("BUILD_FORCE_PREFLIGHT", "").lower() in ("1", "true", "yes"):
+        return False
+    try:
+        import json
+        stamp = json.loads(PREFLIGHT_STAMP_FILE.read_text(encoding="utf-8"))
+        return stamp.get("key") == key
+    except (OSError, ValueError):
+        return False
+
+
+def save_preflight_stamp(key):
+    """保存预检缓存"""
+    try:
+        import json
+        PREFLIGHT_STAMP_FILE.write_text(
+            json.dumps({{"key": key, "time": datetime.now().isoformat()}}),
+            encoding="utf-8",
+        )
+    except OSError as e:
+        log_warning(f"⚠️  保存预检缓存失败: {{e}}")'''
+
 # 公共环境检查函数
 COMMON_ENV_CHECK_FUNCTION = '''
 def check_environment():
     """检查系统环境和构建工具"""
-    log_info("🔍 是否进行环境检查？(Y/n): ", end="")
     try:
-        user_input = input().strip().lower()
+        if BUILD_OPTIONS.headless:
+            user_input = "y"
+        else:
+            log_info("🔍 是否进行环境检查？(Y/n): ", end="")
+            user_input = input().strip().lower()
         if user_input == '' or user_input == 'y' or user_input == 'yes':
             log_info("开始基础环境检查...")
             
@@ -130,24 +334,640 @@ def check_environment():
         log_error(f"环境检查过程中发生错误: {{e}}")
         return True'''
 
+# 公共构建阶段执行器
+COMMON_STAGE_FUNCTIONS = '''
+
+STAGE_STAMP_FILE = Path(".build_stages.json")
+
+# 计算源码指纹时跳过的目录
+SOURCE_EXCLUDE_DIRS = {{"__pycache__", "node_modules", "venv", "env", "site-packages"}}
+SOURCE_EXCLUDE_PATHS = {{os.path.normpath("{output_dir}"), os.path.normpath("{output_dir}_temp")}}
+
+
+class BuildStageError(Exception):
+    """构建阶段失败，消息即失败原因"""
+
+
+class BuildStage:
+    """构建阶段：声明依赖阶段、输入和输出
+
+    inputs/outputs 可以是列表，也可以是返回列表的函数（在阶段就绪时求值）。
+    声明了 inputs 的阶段在输入指纹与上次成功时一致且所有输出都存在时跳过。
+    """
+
+    def __init__(self, name, action, deps=(), inputs=None, outputs=()):
+        self.name = name
+        self.action = action
+        self.deps = tuple(deps)
+        self.inputs = inputs
+        self.outputs = outputs
+
+
+def _resolve_list(value):
+    """求值列表或返回列表的函数"""
+    return list(value() if callable(value) else value)
+
+
+def _walk_sources(root_dir, suffixes=None):
+    """遍历目录下的文件，跳过隐藏目录、缓存目录和构建输出目录"""
+    for root, dirs, files in os.walk(root_dir):
+        dirs[:] = sorted(
+            d for d in dirs
+            if not d.startswith(".")
+            and d not in SOURCE_EXCLUDE_DIRS
+            and os.path.normpath(os.path.join(root, d)) not in SOURCE_EXCLUDE_PATHS
+        )
+        for name in sorted(files):
+            if suffixes is None or name.endswith(suffixes):
+                yield os.path.join(root, name)
+
+
+def fingerprint_inputs(items):
+    """计算输入指纹：文件按路径、大小和修改时间，目录递归展开，其他值按字面量"""
+    import hashlib
+
+    digest = hashlib.sha256()
+    for item in items:
+        item = str(item)
+        paths = _walk_sources(item) if os.path.isdir(item) else [item]
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                digest.update(f"{{path}}|{{stat.st_size}}|{{stat.st_mtime_ns}}\\n".encode("utf-8"))
+            except OSError:
+                digest.update(f"{{path}}\\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_stage_stamps():
+    """读取各阶段上次成功执行时的输入指纹"""
+    try:
+        import json
+        return json.loads(STAGE_STAMP_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {{}}
+
+
+def save_stage_stamps(stamps):
+    """保存各阶段的输入指纹"""
+    try:
+        import json
+        STAGE_STAMP_FILE.write_text(json.dumps(stamps, indent=2), encoding="utf-8")
+    except OSError as e:
+        log_warning(f"⚠️  保存阶段缓存失败: {{e}}")
+
+
+def run_stages(stages):
+    """按依赖关系执行构建阶段，互不依赖的阶段并行执行
+
+    只有一个阶段就绪时直接在主线程中执行，交互输入和中断处理与顺序执行时一致。
+    某个阶段失败后不再启动新阶段，等待运行中的阶段结束后返回。
+
+    Returns:
+        失败原因，全部成功时返回None
+    """
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+    names = {{stage.name for stage in stages}}
+    for stage in stages:
+        unknown = [dep for dep in stage.deps if dep not in names]
+        if unknown:
+            raise ValueError(f"阶段 {{stage.name}} 依赖未知阶段: {{', '.join(unknown)}}")
+
+    stamps = load_stage_stamps()
+    BUILD_RESULT["stages"] = {{}}
+
+    def attempt(stage):
+        key = None
+        if stage.inputs is not None:
+            key = fingerprint_inputs(_resolve_list(stage.inputs))
+            outputs = _resolve_list(stage.outputs)
+            if (not BUILD_OPTIONS.force and stamps.get(stage.name) == key
+                    and all(path and os.path.exists(path) for path in outputs)):
+                log_success(f"⏭️  阶段 {{stage.name}} 输入未变化，跳过")
+                count_cache(True)
+                return "skipped", key, None
+            count_cache(False)
+        try:
+            stage.action()
+        except BuildStageError as e:
+            return "failed", key, str(e)
+        except Exception as e:
+            log_error(f"❌ 阶段 {{stage.name}} 发生错误: {{e}}")
+            return "failed", key, f"阶段 {{stage.name}} 发生错误: {{e}}"
+        return "done", key, None
+
+    def execute(stage):
+        started = build_clock()
+        return attempt(stage) + (started, build_clock())
+
+    pending = list(stages)
+    finished = set()
+    running = {{}}
+    failure = None
+
+    def record(stage, outcome):
+        nonlocal failure
+        status, key, reason, start, end = outcome
+        BUILD_RESULT["stages"][stage.name] = {{
+            "status": status,
+            "seconds": round(end - start, 3),
+            "start": round(start, 6),
+        }}
+        if status == "failed":
+            stamps.pop(stage.name, None)
+            failure = failure or reason
+        else:
+            finished.add(stage.name)
+            if key is not None:
+                stamps[stage.name] = key
+
+    with ThreadPoolExecutor(max_workers=max(1, len(stages))) as executor:
+        while pending or running:
+            ready = [] if failure else [s for s in pending if all(dep in finished for dep in s.deps)]
+            for stage in ready:
+                pending.remove(stage)
+
+            if len(ready) == 1 and not running:
+                record(ready[0], execute(ready[0]))
+                continue
+            for stage in ready:
+                running[executor.submit(execute, stage)] = stage
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                record(running.pop(future), future.result())
+
+    save_stage_stamps(stamps)
+
+    if failure is None and pending:
+        failure = f"阶段依赖无法满足: {{', '.join(stage.name for stage in pending)}}"
+    return failure'''
+
+# 公共资源采样函数
+COMMON_RESOURCE_FUNCTIONS = '''
+
+class ProcessTreeSampler:
+    """按固定间隔遍历 /proc，汇总构建脚本所有子孙进程（编译器进程树）的内存、CPU和I/O
+
+    仅支持提供 /proc 的系统（Linux）；其他平台自动禁用。
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.enabled = interval > 0 and os.path.isdir("/proc/self")
+        self.timeline = []
+        self._io = {{}}
+        self._stop = threading.Event()
+        self._thread = None
+        self.started = None
+        if self.enabled:
+            self._ticks = os.sysconf("SC_CLK_TCK")
+            self._page_size = os.sysconf("SC_PAGE_SIZE")
+
+    def _read_processes(self):
+        """读取所有进程的 (pid, ppid, rss字节, CPU秒)"""
+        processes = []
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{{entry}}/stat", "rb") as f:
+                    # 进程名可能包含空格和括号，从最后一个右括号之后解析
+                    fields = f.read().rsplit(b")", 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            # 字段: state ppid ... utime(11) stime(12) cutime(13) cstime(14) ... rss(21)
+            cpu_ticks = int(fields[11]) + int(fields[12]) + int(fields[13]) + int(fields[14])
+            processes.append((int(entry), int(fields[1]), int(fields[21]) * self._page_size, cpu_ticks / self._ticks))
+        return processes
+
+    def _read_io(self, pid):
+        """读取进程的存储读写字节数，无权限时返回None"""
+        try:
+            with open(f"/proc/{{pid}}/io", "r") as f:
+                values = dict(line.split(": ", 1) for line in f.read().splitlines() if ": " in line)
+            return int(values.get("read_bytes", 0)), int(values.get("write_bytes", 0))
+        except (OSError, ValueError):
+            return None
+
+    def sample(self, elapsed):
+        """采集一次进程树快照"""
+        processes = self._read_processes()
+        children = {{}}
+        for pid, ppid, rss, cpu in processes:
+            children.setdefault(ppid, []).append((pid, rss, cpu))
+
+        # 从当前进程向下遍历得到所有子孙进程
+        tree = []
+        stack = [os.getpid()]
+        while stack:
+            for child in children.get(stack.pop(), []):
+                tree.append(child)
+                stack.append(child[0])
+
+        for pid, _, _ in tree:
+            io = self._read_io(pid)
+            if io:
+                # /proc/<pid>/io 不包含已退出子进程，按进程记录最大值后累加
+                self._io[pid] = io
+
+        self.timeline.append({{
+            "t": round(elapsed, 2),
+            "processes": len(tree),
+            "rss_bytes": sum(rss for _, rss, _ in tree),
+            "cpu_seconds": round(sum(cpu for _, _, cpu in tree), 2),
+            "read_bytes": sum(r for r, _ in self._io.values()),
+            "write_bytes": sum(w for _, w in self._io.values()),
+        }})
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample(build_clock() - self.started)
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self.enabled:
+            self.started = build_clock()
+            self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self, wall_seconds, cpu_seconds=None):
+        """停止采样并返回汇总结果
+
+        Args:
+            wall_seconds: 被采样阶段的墙钟时间
+            cpu_seconds: 精确的子进程CPU时间（来自 getrusage），未提供时使用采样值
+        """
+        if not self._thread:
+            return None
+        self._stop.set()
+        self._thread.join()
+        if not self.timeline:
+            return None
+
+        sampled_cpu = max(s["cpu_seconds"] for s in self.timeline)
+        cpu_seconds = max(cpu_seconds or 0, sampled_cpu)
+        last = self.timeline[-1]
+        return {{
+            "start": round(self.started, 3),
+            "interval_seconds": self.interval,
+            "samples": len(self.timeline),
+            "peak_rss_bytes": max(s["rss_bytes"] for s in self.timeline),
+            "peak_processes": max(s["processes"] for s in self.timeline),
+            "cpu_seconds": round(cpu_seconds, 2),
+            "avg_parallelism": round(cpu_seconds / wall_seconds, 2) if wall_seconds > 0 else None,
+            "read_bytes": last["read_bytes"],
+            "write_bytes": last["write_bytes"],
+            "timeline": self.timeline,
+        }}
+
+
+def get_children_cpu_seconds():
+    """已回收子进程的累计CPU时间，不支持的平台返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def report_resource_usage(resources, max_rows=20):
+    """输出编译进程树资源使用的峰值和时间线"""
+    mb = 1024 * 1024
+    log_info("📊 编译进程树资源使用:")
+    log_info(
+        f"   峰值内存 {{resources['peak_rss_bytes'] / mb:.1f}}MB | 峰值进程数 {{resources['peak_processes']}} | "
+        f"CPU时间 {{resources['cpu_seconds']:.1f}}s | 平均并行度 {{resources['avg_parallelism']}} | "
+        f"读 {{resources['read_bytes'] / mb:.1f}}MB 写 {{resources['write_bytes'] / mb:.1f}}MB"
+    )
+
+    # 时间线按需抽样，最多显示 max_rows 行
+    timeline = resources["timeline"]
+    step = max(1, -(-len(timeline) // max_rows))
+    rows = timeline[::step]
+    if rows[-1] is not timeline[-1]:
+        rows.append(timeline[-1])
+    log_info(f"   {{'时间(s)':>8}} {{'进程':>5}} {{'内存(MB)':>9}} {{'CPU(%)':>7}} {{'读(MB)':>8}} {{'写(MB)':>8}}")
+    previous = None
+    for sample in rows:
+        cpu_percent = 0.0
+        if previous and sample["t"] > previous["t"]:
+            cpu_percent = max(0.0, sample["cpu_seconds"] - previous["cpu_seconds"]) / (sample["t"] - previous["t"]) * 100
+        log_info(
+            f"   {{sample['t']:>8.1f}} {{sample['processes']:>5}} {{sample['rss_bytes'] / mb:>9.1f}} "
+            f"{{cpu_percent:>7.0f}} {{sample['read_bytes'] / mb:>8.1f}} {{sample['write_bytes'] / mb:>8.1f}}"
+        )
+        previous = sample'''
+
+
+# 公共构建追踪函数
+COMMON_TRACE_FUNCTIONS = '''
+
+# 阶段内子步骤的追踪区间 [{{name, stage, start, end}}]，时间相对构建时钟
+TRACE_SPANS = []
+
+
+@contextmanager
+def trace_span(name, stage):
+    """记录阶段内子步骤的起止时间（写入 --trace 文件）"""
+    started = build_clock()
+    try:
+        yield
+    finally:
+        with _RESULT_LOCK:
+            TRACE_SPANS.append({{"name": name, "stage": stage, "start": started, "end": build_clock()}})
+
+
+def run_compile_command(command):
+    """执行编译命令
+
+    启用 --trace 时逐行转发编译器输出，并按 COMPILE_PHASE_MARKERS 划分编译子阶段；
+    子阶段只能前进，重复或回退的标记不会开启新阶段。未启用时直接使用 os.system，
+    保留编译器的终端进度条。
+    """
+    if not BUILD_OPTIONS.trace:
+        return os.system(command)
+
+    import subprocess
+    phases = []
+    current = -1
+    process = subprocess.Popen(
+        command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, errors="replace", bufsize=1,
+    )
+    for line in process.stdout:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+        for index, (marker, phase) in enumerate(COMPILE_PHASE_MARKERS):
+            if index > current and marker in line:
+                now = build_clock()
+                if phases:
+                    phases[-1]["end"] = now
+                phases.append({{"name": phase, "stage": "compile", "start": now}})
+                current = index
+                break
+    result = process.wait()
+    if phases:
+        phases[-1]["end"] = build_clock()
+    with _RESULT_LOCK:
+        TRACE_SPANS.extend(phases)
+    BUILD_RESULT["compile_phases"] = {{p["name"]: round(p["end"] - p["start"], 3) for p in phases}}
+    return result
+
+
+def build_trace_events():
+    """将阶段、子步骤和编译进程树采样转换为 Chrome Trace Event 列表
+
+    每个阶段一条线程轨道（并行阶段互不重叠），子步骤嵌套在所属阶段下，
+    内存、进程数和CPU使用率作为计数器。
+    """
+    pid = os.getpid()
+
+    def us(seconds):
+        return int(seconds * 1000000)
+
+    events = [{{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+               "args": {{"name": "{tool_name} build: {app_name}"}}}}]
+    tids = {{}}
+    for name, stage in BUILD_RESULT.get("stages", {{}}).items():
+        tid = tids.setdefault(name, len(tids) + 1)
+        events.append({{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {{"name": name}}}})
+        events.append({{
+            "name": name, "cat": "stage", "ph": "X", "pid": pid, "tid": tid,
+            "ts": us(stage["start"]), "dur": us(stage["seconds"]), "args": {{"status": stage["status"]}},
+        }})
+
+    for span in TRACE_SPANS:
+        events.append({{
+            "name": span["name"], "cat": span["stage"], "ph": "X", "pid": pid,
+            "tid": tids.get(span["stage"], 0),
+            "ts": us(span["start"]), "dur": us(span["end"] - span["start"]),
+        }})
+
+    resources = BUILD_RESULT.get("resources")
+    if resources:
+        previous = None
+        for sample in resources["timeline"]:
+            ts = us(resources["start"] + sample["t"])
+            cpu_percent = 0.0
+            if previous and sample["t"] > previous["t"]:
+                cpu_percent = max(0.0, sample["cpu_seconds"] - previous["cpu_seconds"]) / (sample["t"] - previous["t"]) * 100
+            events.append({{"name": "memory", "ph": "C", "pid": pid, "ts": ts,
+                           "args": {{"rss_mb": round(sample["rss_bytes"] / 1024 / 1024, 1)}}}})
+            events.append({{"name": "cpu", "ph": "C", "pid": pid, "ts": ts,
+                           "args": {{"cpu_percent": round(cpu_percent, 1)}}}})
+            events.append({{"name": "processes", "ph": "C", "pid": pid, "ts": ts,
+                           "args": {{"count": sample["processes"]}}}})
+            previous = sample
+    return events
+
+
+def write_trace(path):
+    """写入 Chrome Trace Event 格式的追踪文件（chrome://tracing 或 https://ui.perfetto.dev 打开）"""
+    try:
+        import json
+        trace = {{
+            "traceEvents": build_trace_events(),
+            "displayTimeUnit": "ms",
+            "otherData": {{
+                key: BUILD_RESULT.get(key)
+                for key in ("tool", "app_name", "config_hash", "started_at", "status", "exit_code")
+            }},
+        }}
+        Path(path).write_text(json.dumps(trace, ensure_ascii=False), encoding="utf-8")
+        log_info(f"🧭 构建追踪已写入: {{path}}")
+    except OSError as e:
+        log_warning(f"⚠️  写入构建追踪失败: {{e}}")'''
+
+
+# 公共构建历史函数
+COMMON_HISTORY_FUNCTIONS = '''
+
+HISTORY_SCHEMA = """{history_schema}"""
+
+
+def count_cache(hit):
+    """记录缓存命中/未命中次数"""
+    with _RESULT_LOCK:
+        cache = BUILD_RESULT.setdefault("cache", {{"hits": 0, "misses": 0}})
+        cache["hits" if hit else "misses"] += 1
+
+
+def get_artifact_bytes():
+    """编译产物大小：单文件模式为可执行文件大小，目录模式为整个目录大小"""
+    executable = find_build_executable()
+    if not executable:
+        return None
+    path = Path(executable)
+    if path.parent == Path("{output_dir}"):
+        return path.stat().st_size
+    return sum(f.stat().st_size for f in path.parent.rglob("*") if f.is_file())
+
+
+def get_peak_rss_kb():
+    """构建脚本及其子进程（编译器）的峰值内存 (KB)，不支持的平台返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # macOS 上 ru_maxrss 单位为字节
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def collect_build_metrics():
+    """收集产物大小和峰值内存到构建结果
+
+    产物大小只在本次实际执行了编译时记录，编译失败、跳过或未运行时为None，避免把旧产物计入本次构建。
+    """
+    BUILD_RESULT["artifact_bytes"] = None
+    if BUILD_RESULT.get("stages", {{}}).get("compile", {{}}).get("status") == "done":
+        try:
+            BUILD_RESULT["artifact_bytes"] = get_artifact_bytes()
+        except OSError:
+            pass
+    BUILD_RESULT["peak_rss_kb"] = get_peak_rss_kb()
+    # 进程树采样得到的是所有编译进程的内存之和，比单进程峰值更准确
+    resources = BUILD_RESULT.get("resources")
+    if resources:
+        BUILD_RESULT["peak_rss_kb"] = max(BUILD_RESULT["peak_rss_kb"] or 0, resources["peak_rss_bytes"] // 1024)
+
+
+def record_build_history():
+    """将本次构建记录写入本地SQLite历史数据库 (python main.py --history 查看趋势)"""
+    if not BUILD_OPTIONS.history_db:
+        return
+    import sqlite3
+
+    cache = BUILD_RESULT.get("cache", {{}})
+    try:
+        conn = sqlite3.connect(BUILD_OPTIONS.history_db)
+        try:
+            with conn:
+                conn.executescript(HISTORY_SCHEMA)
+                cursor = conn.execute(
+                    "INSERT INTO builds (started_at, finished_at, tool, app_name, config_hash, command, "
+                    "status, exit_code, reason, duration_seconds, peak_rss_kb, artifact_bytes, "
+                    "cache_hits, cache_misses) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        BUILD_RESULT["started_at"], BUILD_RESULT.get("finished_at"),
+                        BUILD_RESULT["tool"], BUILD_RESULT["app_name"], BUILD_RESULT["config_hash"],
+                        " ".join(BUILD_RESULT.get("command", [])),
+                        BUILD_RESULT.get("status"), BUILD_RESULT.get("exit_code"), BUILD_RESULT.get("reason"),
+                        BUILD_RESULT.get("duration_seconds"), BUILD_RESULT.get("peak_rss_kb"),
+                        BUILD_RESULT.get("artifact_bytes"), cache.get("hits", 0), cache.get("misses", 0),
+                    ),
+                )
+                build_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO build_phases (build_id, name, status, seconds) VALUES (?, ?, ?, ?)",
+                    [(build_id, name, stage["status"], stage["seconds"])
+                     for name, stage in BUILD_RESULT.get("stages", {{}}).items()],
+                )
+                conn.executemany(
+                    "INSERT INTO build_packages (build_id, package_type, path, bytes) VALUES (?, ?, ?, ?)",
+                    [(build_id, pkg_type, package["path"], package["bytes"])
+                     for pkg_type, package in BUILD_RESULT.get("packages", {{}}).items()],
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        log_warning(f"⚠️  写入构建历史失败: {{e}}")'''
+
+
+# 公共Prometheus指标导出函数
+COMMON_PROMETHEUS_FUNCTIONS = '''
+
+def _prom_labels(**labels):
+    """格式化Prometheus标签（转义反斜杠、双引号和换行），固定包含 app 和 tool"""
+    labels = {{"app": BUILD_RESULT["app_name"], "tool": BUILD_RESULT["tool"].lower(), **labels}}
+    escaped = (
+        f'{{key}}="{{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), chr(92) + "n")}}"'
+        for key, value in labels.items()
+    )
+    return "{{" + ",".join(escaped) + "}}"
+
+
+def render_prom_metrics():
+    """将构建结果渲染为 Prometheus 文本格式（与 app/prom_metrics.py 的指标名一致）"""
+    metrics = {{}}
+
+    def add(name, value, help_text, **labels):
+        if value is not None:
+            metrics.setdefault(name, (help_text, []))[1].append((_prom_labels(**labels), value))
+
+    add("python_build_duration_seconds", BUILD_RESULT.get("duration_seconds"), "构建总耗时（秒）")
+    for name, stage in BUILD_RESULT.get("stages", {{}}).items():
+        add("python_build_phase_duration_seconds", stage["seconds"], "各构建阶段耗时（秒）",
+            phase=name, status=stage["status"])
+    for name, seconds in BUILD_RESULT.get("compile_phases", {{}}).items():
+        add("python_build_compile_phase_duration_seconds", seconds, "编译子阶段耗时（秒，仅 --trace 时可用）", phase=name)
+    add("python_build_artifact_bytes", BUILD_RESULT.get("artifact_bytes"), "编译产物大小（字节）")
+    for pkg_type, package in BUILD_RESULT.get("packages", {{}}).items():
+        add("python_build_package_bytes", package["bytes"], "各类型安装包大小（字节）", type=pkg_type)
+    cache = BUILD_RESULT.get("cache", {{}})
+    add("python_build_cache_hits", cache.get("hits", 0), "本次构建的缓存命中次数")
+    add("python_build_cache_misses", cache.get("misses", 0), "本次构建的缓存未命中次数")
+    # 跳过编译时峰值内存只是构建脚本自身的内存，不作为编译峰值导出
+    compiled = BUILD_RESULT.get("stages", {{}}).get("compile", {{}}).get("status") == "done"
+    peak_rss_kb = BUILD_RESULT.get("peak_rss_kb")
+    add("python_build_peak_rss_bytes", peak_rss_kb * 1024 if compiled and peak_rss_kb else None, "编译峰值内存（字节）")
+    add("python_build_success", 1 if BUILD_RESULT.get("status") == "success" else 0, "构建是否成功 (1/0)")
+    add("python_build_exit_code", BUILD_RESULT.get("exit_code"), "构建退出码")
+    add("python_build_last_run_timestamp_seconds", round(datetime.now().timestamp(), 3), "构建结束时间（Unix时间戳）")
+
+    lines = []
+    for name, (help_text, samples) in metrics.items():
+        lines.append(f"# HELP {{name}} {{help_text}}")
+        lines.append(f"# TYPE {{name}} gauge")
+        lines.extend(f"{{name}}{{labels}} {{value}}" for labels, value in samples)
+    return "\\n".join(lines) + "\\n"
+
+
+def write_prom_metrics(path):
+    """原子写入 .prom 文件，供 node_exporter textfile collector 采集"""
+    target = Path(path)
+    temp = target.with_name(f".{{target.name}}.{{os.getpid()}}.tmp")
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp.write_text(render_prom_metrics(), encoding="utf-8")
+        os.replace(temp, target)
+        log_info(f"📈 Prometheus指标已写入: {{path}}")
+    except OSError as e:
+        log_warning(f"⚠️  写入Prometheus指标失败: {{e}}")
+        try:
+            temp.unlink()
+        except OSError:
+            pass'''
+
+
 # 公共文件复制函数
 COMMON_COPY_FILES_FUNCTION = '''
+
+# 需要复制到构建输出目录的目录列表
+COPY_DIRS = [
+{copy_dirs_str}
+]
+
+
 def copy_additional_files():
-    """复制额外的文件和目录到构建输出目录"""
+    """复制额外的文件和目录到构建输出目录（与编译并行执行）"""
     build_output_dir = Path("{output_dir}")
-    
-    if not build_output_dir.exists():
-        log_warning(f"⚠️  构建输出目录不存在: {{build_output_dir}}")
-        return
+    build_output_dir.mkdir(parents=True, exist_ok=True)
     
     log_info("📁 复制额外文件和目录...")
     
-    # 需要复制的目录列表
-    copy_dirs = [
-{copy_dirs_str}
-    ]
-    
-    for dir_name in copy_dirs:
+    for dir_name in COPY_DIRS:
         src_dir = Path(dir_name)
         if src_dir.exists() and src_dir.is_dir():
             dest_dir = build_output_dir / dir_name
@@ -160,65 +980,470 @@ def copy_additional_files():
                 log_success(f"✅ 已复制目录: {{src_dir}} -> {{dest_dir}}")
             except Exception as e:
                 log_error(f"❌ 复制目录 {{src_dir}} 失败: {{e}}")
+                raise BuildStageError(f"复制目录 {{src_dir}} 失败: {{e}}")
         else:
             log_warning(f"⚠️  目录不存在，跳过: {{src_dir}}")
 
+
+def get_copy_outputs():
+    """资源复制阶段的输出目录"""
+    return [str(Path("{output_dir}") / d) for d in COPY_DIRS if Path(d).is_dir()]
+
+
+def find_build_executable():
+    """按应用名称查找编译生成的可执行文件，找不到时返回None"""
+    output_dir = Path("{output_dir}")
+    suffix = ".exe" if sys.platform.startswith("win") else ""
+    candidates = [output_dir / f"{app_name}{{suffix}}", output_dir / "{app_name}" / f"{app_name}{{suffix}}"]
+    candidates.extend(output_dir.glob(f"*.dist/{app_name}{{suffix}}"))
+    for candidate in candidates:
+        if candidate.is_file():
+            return str(candidate)
+    # 不按扩展名猜测：输出目录中复制的资源文件不能当作编译产物
+    return None
+
 '''
 
+# 公共语法预检函数
+COMMON_PRECHECK_FUNCTIONS = '''
+
+
+# 一层待检查文件达到该数量时使用进程池并行编译
+PRECHECK_PARALLEL_THRESHOLD = 16
+# 最多显示的错误数
+PRECHECK_MAX_ERRORS = 20
+
+
+def precheck_source(path):
+    """字节编译一个源文件（不写入 .pyc），并提取其中的导入（含函数内的延迟导入）
+
+    Returns:
+        tuple: (路径, 错误信息或None, [(模块名, 相对导入层级, 导入的名称列表)])
+    """
+    import ast
+    import importlib.util
+
+    try:
+        with open(path, "rb") as f:
+            source = importlib.util.decode_source(f.read())
+        tree = compile(source, path, "exec", ast.PyCF_ONLY_AST, dont_inherit=True)
+        # 由语法树生成字节码，同时检查 return 在函数外等编译期错误
+        compile(tree, path, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        return path, f"{{e.filename or path}}:{{e.lineno}}: {{e.msg}}", []
+    except (ValueError, OSError) as e:
+        return path, f"{{path}}: {{e}}", []
+
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend((alias.name, 0, []) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append((node.module or "", node.level, [alias.name for alias in node.names if alias.name != "*"]))
+    return path, None, imports
+
+
+def _precheck_chunk(paths):
+    """进程池任务：批量检查文件，减少进程间通信次数"""
+    return [precheck_source(path) for path in paths]
+
+
+def _module_files(base, parts):
+    """模块名各级对应的项目源文件（包的 __init__.py 和模块文件）"""
+    files = []
+    path = Path(base)
+    for part in parts:
+        path = path / part
+        if (path / "__init__.py").is_file():
+            files.append(path / "__init__.py")
+        elif Path(f"{{path}}.py").is_file():
+            files.append(Path(f"{{path}}.py"))
+            break
+        elif not path.is_dir():
+            break
+    return files
+
+
+def resolve_project_imports(path, imports, roots):
+    """把导入解析为项目中的源文件；标准库和第三方包不在搜索根目录下，自然被忽略"""
+    files = []
+    for module, level, names in imports:
+        if level:
+            base = Path(path).parent
+            for _ in range(level - 1):
+                base = base.parent
+            bases = [base]
+        else:
+            bases = roots
+        parts = module.split(".") if module else []
+        for base in bases:
+            # from X import y 中的 y 可能是子模块
+            found = _module_files(base, parts) if parts else []
+            for name in names:
+                found += _module_files(base, parts + [name])
+            if found:
+                files.extend(found)
+                break
+    return files
+
+
+def run_precheck(entry_file):
+    """语法预检阶段：从入口文件出发逐层字节编译可达的项目源码，任何文件无法编译时在启动编译器前失败"""
+    roots = list(dict.fromkeys([os.path.dirname(entry_file) or ".", "."]))
+    layer = [os.path.normpath(entry_file)]
+    seen = set(layer)
+    errors = []
+    checked = 0
+    workers = os.cpu_count() or 1
+    executor = None
+    try:
+        while layer:
+            results = None
+            if len(layer) >= PRECHECK_PARALLEL_THRESHOLD and workers > 1:
+                try:
+                    if executor is None:
+                        import multiprocessing
+                        from concurrent.futures import ProcessPoolExecutor
+                        # 阶段可能在线程中运行，多线程进程中 fork 不安全，统一使用 spawn
+                        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                    chunk_size = max(4, len(layer) // (workers * 4))
+                    chunks = [layer[i:i + chunk_size] for i in range(0, len(layer), chunk_size)]
+                    results = [result for chunk in executor.map(_precheck_chunk, chunks) for result in chunk]
+                except Exception:
+                    # 受限环境（如无法创建子进程）下回退为顺序检查
+                    workers = 0
+            if results is None:
+                results = _precheck_chunk(layer)
+
+            checked += len(results)
+            next_layer = []
+            for path, error, imports in results:
+                if error:
+                    errors.append(error)
+                    continue
+                for found in resolve_project_imports(path, imports, roots):
+                    found = os.path.normpath(found)
+                    if found not in seen:
+                        seen.add(found)
+                        next_layer.append(found)
+            layer = next_layer
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    BUILD_RESULT["precheck"] = {{"files": checked, "errors": errors}}
+    if errors:
+        for error in errors[:PRECHECK_MAX_ERRORS]:
+            log_error(f"❌ {{error}}")
+        if len(errors) > PRECHECK_MAX_ERRORS:
+            log_error(f"❌ ... 另有 {{len(errors) - PRECHECK_MAX_ERRORS}} 个错误")
+        log_error("❌ 语法预检未通过，已跳过编译")
+        raise BuildStageError(f"语法预检失败: {{len(errors)}} 个源文件无法编译")
+    log_success(f"✅ 语法预检通过: {{checked}} 个源文件")'''
+
+# 公共隔离构建环境函数
+COMMON_ISOLATED_ENV_FUNCTIONS = '''
+
+
+# 隔离构建环境目录：每个锁文件哈希一个虚拟环境
+BUILD_ENV_ROOT = Path(".build_env")
+# 依赖声明来源（按优先级）: (文件, 导出命令)，导出命令为 None 时文件本身即 requirements 格式
+REQUIREMENT_SOURCES = [
+    ("uv.lock", ["uv", "export", "--frozen", "--no-hashes", "--no-dev", "--no-emit-project", "--format", "requirements-txt"]),
+    ("poetry.lock", ["poetry", "export", "--format", "requirements.txt", "--without-hashes"]),
+    ("pdm.lock", ["pdm", "export", "--format", "requirements", "--without-hashes", "--prod"]),
+    ("requirements.lock", None),
+    ("requirements.txt", None),
+    ("pyproject.toml", None),
+]
+
+
+def _run_env_command(command, capture=False):
+    """执行构建环境相关命令，失败时抛出 BuildStageError"""
+    import subprocess
+    try:
+        result = subprocess.run(command, capture_output=capture, text=True)
+    except OSError as e:
+        raise BuildStageError(f"无法执行 {{command[0]}}: {{e}}")
+    if result.returncode != 0:
+        detail = (result.stderr or "").strip()[-300:] if capture else ""
+        raise BuildStageError(f"命令失败 ({{result.returncode}}): {{' '.join(command[:4])}} {{detail}}".rstrip())
+    return result.stdout
+
+
+def resolve_requirements():
+    """读取项目锁定的依赖
+
+    Returns:
+        tuple: (来源文件, requirements 文本)
+    """
+    for source, command in REQUIREMENT_SOURCES:
+        if not Path(source).is_file():
+            continue
+        if command is not None:
+            if not shutil.which(command[0]):
+                log_warning(f"⚠️  找到 {{source}} 但未安装 {{command[0]}}，尝试下一个依赖来源")
+                continue
+            return source, _run_env_command(command, capture=True)
+        if source == "pyproject.toml":
+            try:
+                import tomllib
+            except ImportError:
+                raise BuildStageError("读取 pyproject.toml 依赖需要 Python 3.11+，请提供 requirements.txt")
+            with open(source, "rb") as f:
+                dependencies = tomllib.load(f).get("project", {{}}).get("dependencies", [])
+            return source, "".join(f"{{dependency}}\\n" for dependency in dependencies)
+        return source, Path(source).read_text(encoding="utf-8")
+    raise BuildStageError("未找到依赖声明 (uv.lock/poetry.lock/pdm.lock/requirements.txt/pyproject.toml)")
+
+
+def get_tool_requirement():
+    """构建工具的安装要求：固定为当前环境中的版本，保证隔离构建与本地构建一致"""
+    try:
+        from importlib import metadata
+        return f"{{BUILD_TOOL_PACKAGE}}=={{metadata.version(BUILD_TOOL_PACKAGE)}}"
+    except Exception:
+        return BUILD_TOOL_PACKAGE
+
+
+def get_env_python(env_dir):
+    """虚拟环境中的解释器路径"""
+    return env_dir / ("Scripts/python.exe" if os.name == "nt" else "bin/python")
+
+
+def prepare_isolated_env():
+    """创建（或复用）只包含项目依赖和构建工具的虚拟环境，返回其中的解释器路径
+
+    环境按依赖文本、构建工具版本和解释器版本的哈希缓存，锁文件变化时重建并清理旧环境。
+    有 uv 时用 uv 创建和安装（更快），否则使用 venv + pip。
+    """
+    import hashlib
+    import json
+
+    source, requirements = resolve_requirements()
+    tool_requirement = get_tool_requirement()
+    key = hashlib.sha256(
+        "\\0".join([requirements, tool_requirement, sys.version, sys.executable]).encode("utf-8")
+    ).hexdigest()[:16]
+    env_dir = BUILD_ENV_ROOT / key
+    marker = env_dir / ".ready"
+    python = get_env_python(env_dir)
+    info = {{"path": str(env_dir), "source": source, "tool": tool_requirement, "key": key}}
+
+    if marker.is_file() and python.exists() and not BUILD_OPTIONS.force:
+        log_success(f"✅ 复用隔离构建环境: {{env_dir}} (依赖来源: {{source}})")
+        count_cache(True)
+        return python, {{**info, "cached": True}}
+    count_cache(False)
+
+    # 未完成的环境（上次创建中断）直接重建
+    if env_dir.exists():
+        shutil.rmtree(env_dir, ignore_errors=True)
+    BUILD_ENV_ROOT.mkdir(exist_ok=True)
+    requirements_file = BUILD_ENV_ROOT / f"{{key}}.requirements.txt"
+    requirements_file.write_text(requirements, encoding="utf-8")
+    count = sum(1 for line in requirements.splitlines() if line.strip() and not line.lstrip().startswith("#"))
+    log_info(f"🧪 创建隔离构建环境: {{env_dir}} (依赖来源: {{source}}，{{count}} 项 + {{tool_requirement}})")
+
+    uv = shutil.which("uv")
+    if uv:
+        _run_env_command([uv, "venv", "--quiet", "--python", sys.executable, str(env_dir)])
+        _run_env_command([uv, "pip", "install", "--python", str(python), "-r", str(requirements_file), tool_requirement])
+    else:
+        _run_env_command([sys.executable, "-m", "venv", str(env_dir)])
+        _run_env_command([
+            str(python), "-m", "pip", "install", "--disable-pip-version-check",
+            "-r", str(requirements_file), tool_requirement,
+        ])
+    marker.write_text(json.dumps({{**info, "created": datetime.now().isoformat()}}, ensure_ascii=False), encoding="utf-8")
+
+    # 清理旧锁文件对应的环境
+    for stale in BUILD_ENV_ROOT.iterdir():
+        if stale.name != key and not stale.name.startswith(key):
+            if stale.is_dir():
+                shutil.rmtree(stale, ignore_errors=True)
+            else:
+                stale.unlink()
+    log_success(f"✅ 隔离构建环境已就绪: {{env_dir}} ({{'uv' if uv else 'venv'}})")
+    return python, {{**info, "cached": False, "installer": "uv" if uv else "pip"}}
+
+
+def use_isolated_env(args):
+    """构建环境阶段：准备隔离环境，并让编译命令改用其中的解释器运行{tool_name}"""
+    try:
+        python, info = prepare_isolated_env()
+    except BuildStageError as e:
+        log_error(f"❌ 隔离构建环境准备失败: {{e}}")
+        raise
+    args[:1] = [str(python), "-m", BUILD_TOOL_MODULE]
+    BUILD_RESULT["build_env"] = info'''
+
 # 公共主函数开始部分
 COMMON_MAIN_START = '''
-def main():
-    """主构建函数"""
+{linux_package_code}
+
+
+def run_preflight():
+    """预检阶段：环境检查和构建工具检查"""
+    # 预检缓存：解释器、PATH和工具均未变化时跳过重复检查（隔离构建不检查当前环境中的构建工具模块）
+    preflight_key = get_preflight_key(PREFLIGHT_TOOLS, [] if BUILD_OPTIONS.isolated else PREFLIGHT_MODULES)
+    if is_preflight_cached(preflight_key):
+        log_success("✅ 环境预检缓存有效，跳过重复检查 (设置 BUILD_FORCE_PREFLIGHT=1 强制检查)")
+        count_cache(True)
+        return
+    count_cache(False)
+    
     # 环境检查
-    if not check_environment():
-        sys.exit(1)
+    with trace_span("env_check", "preflight"):
+        if not check_environment():
+            raise BuildStageError("环境检查未通过")
     
-    # 检查{{tool_name}}依赖
+    # 检查{tool_name}依赖（隔离构建时由构建环境阶段安装）
     log_info("🔍 检查构建工具依赖...")
-    if not check_{{tool_name_lower}}():
-        sys.exit(1)
+    with trace_span("tool_check", "preflight"):
+        if BUILD_OPTIONS.isolated:
+            log_info("🧪 隔离构建：{tool_name}将安装到隔离环境中")
+        elif not check_{tool_name_lower}():
+            raise BuildStageError("{tool_name}未安装")
     
     # 检查构建依赖工具
-    if not check_build_dependencies():
-        sys.exit(1)
+    with trace_span("dependency_check", "preflight"):
+        if not check_build_dependencies():
+            raise BuildStageError("构建依赖检查未通过")
     
-    # 记录开始时间
-    start_time = datetime.now()
-    
-    log_info("=" * 60)
-    log_info("🚀 {{tool_name}} 构建脚本")
-    log_info("=" * 60)
-'''
+    save_preflight_stamp(preflight_key)
 
-# 公共主函数结束部分
-COMMON_MAIN_END = '''    
-    log_info("开始{{tool_name}}编译...")
+
+# 包内文件占位符：@pkg:包名/包内路径，编译前在运行编译工具的环境中解析为绝对路径
+PACKAGE_PATH_PREFIX = "@pkg:"
+# 在指定解释器中查找包目录，输出 {{包名: 目录或None}}
+PACKAGE_DIR_CODE = (
+    "import importlib.util,json,os,sys\\n"
+    "def find(name):\\n"
+    "    try:\\n"
+    "        spec = importlib.util.find_spec(name)\\n"
+    "    except (ImportError, ValueError):\\n"
+    "        return None\\n"
+    "    if spec is None:\\n"
+    "        return None\\n"
+    "    if spec.submodule_search_locations:\\n"
+    "        return list(spec.submodule_search_locations)[0]\\n"
+    "    return os.path.dirname(spec.origin) if spec.origin else None\\n"
+    "print(json.dumps({{name: find(name) for name in sys.argv[1:]}}))\\n"
+)
+
+
+def _split_package_arg(arg):
+    """--add-data=@pkg:包名/包内路径{{分隔符}}目标目录 -> (选项, 包名, 包内路径, 目标目录)，不是占位符时返回None"""
+    option, sep, value = arg.partition("=")
+    if not sep or not value.startswith(PACKAGE_PATH_PREFIX):
+        return None
+    index = max(value.rfind(";"), value.rfind(":"))
+    if index < len(PACKAGE_PATH_PREFIX):
+        return None
+    package, _, relative = value[len(PACKAGE_PATH_PREFIX):index].partition("/")
+    return option, package, relative, value[index + 1:]
+
+
+def resolve_package_paths(args):
+    """把编译参数中的包内文件占位符替换为绝对路径
+
+    在运行编译工具的解释器中查找包目录（隔离构建时为构建环境的解释器），
+    包或文件不存在（包版本与生成脚本时不同）时构建失败。
+    """
+    entries = [(index, parts) for index, parts in enumerate(map(_split_package_arg, args)) if parts]
+    if not entries:
+        return
+    import json
+    import subprocess
+
+    build_env = BUILD_RESULT.get("build_env")
+    python = str(get_env_python(Path(build_env["path"]))) if build_env else sys.executable
+    packages = sorted({{parts[1] for _, parts in entries}})
+    result = subprocess.run([python, "-c", PACKAGE_DIR_CODE] + packages, capture_output=True, text=True)
+    try:
+        package_dirs = json.loads(result.stdout)
+    except ValueError:
+        log_error(f"❌ 查找包目录失败: {{result.stderr.strip()[-300:]}}")
+        raise BuildStageError("查找包目录失败")
+
+    missing = []
+    for index, (option, package, relative, destination) in entries:
+        package_dir = package_dirs.get(package)
+        source = os.path.join(package_dir, *relative.split("/")) if package_dir else None
+        if source is None or not os.path.exists(source):
+            missing.append(f"{{package}}/{{relative}}")
+            continue
+        args[index] = f"{{option}}={{source}}{{os.pathsep}}{{destination}}"
+    if missing:
+        for item in missing:
+            log_error(f"❌ 编译环境中不存在包内文件: {{item}}")
+        log_info("💡 包版本可能与生成脚本时不同，请重新生成构建脚本")
+        raise BuildStageError(f"编译环境中缺少 {{len(missing)}} 个包内文件")
+
+
+def run_compile(args):
+    """编译阶段"""
+    resolve_package_paths(args)
+    log_info("开始{tool_name}编译...")
     log_info("执行命令: " + " ".join(args))
     
-    # 执行{{tool_name}}编译
-    result = os.system(" ".join(args))
+    # 执行{tool_name}编译，同时采样编译器进程树的资源使用
+    sampler = ProcessTreeSampler(BUILD_OPTIONS.sample_interval)
+    cpu_before = get_children_cpu_seconds()
+    started = build_clock()
+    sampler.start()
+    try:
+        result = run_compile_command(" ".join(args))
+    finally:
+        cpu_after = get_children_cpu_seconds()
+        resources = sampler.stop(
+            build_clock() - started,
+            cpu_after - cpu_before if cpu_before is not None else None,
+        )
+    
+    if resources:
+        BUILD_RESULT["resources"] = resources
+        report_resource_usage(resources)
     
     if result != 0:
         log_error(f"❌ 编译失败！错误代码: {{result}}")
-        sys.exit(1)
-    
-    log_success("✅ {{tool_name}}编译完成！")
-    
-    # 复制额外文件和目录
-    copy_additional_files()
+        raise BuildStageError(f"编译失败，错误代码: {{result}}")
     
-    # 计算总耗时
-    end_time = datetime.now()
-    duration = end_time - start_time
-    total_seconds = int(duration.total_seconds())
-    minutes = total_seconds // 60
-    seconds = total_seconds % 60
-    
-    log_success("🎉 构建完成！")
-    log_info("输出位置: {output_dir}")
-    log_info(f"⏱️  总耗时: {{minutes}}分{{seconds}}秒")
-    
-    # 清理临时构建目录和生成的.spec文件
+    log_success("✅ {tool_name}编译完成！")
+
+
+def get_toolchain_inputs():
+    """编译环境的标识：解释器、构建工具版本和已安装包目录，任一变化都需要重新编译"""
+    build_env = BUILD_RESULT.get("build_env")
+    if build_env:
+        # 隔离环境的键已包含依赖、构建工具版本和解释器
+        return ["build_env:" + build_env["key"]]
+    try:
+        from importlib import metadata
+        tool_version = metadata.version(BUILD_TOOL_PACKAGE)
+    except Exception:
+        tool_version = None
+    inputs = [f"python:{{sys.executable}}|{{sys.version}}", f"tool:{{BUILD_TOOL_PACKAGE}}=={{tool_version}}"]
+    # 安装、卸载或升级包都会改变包目录的修改时间
+    inputs.extend(f"site:{{path}}@{{_path_mtime(path)}}" for path in sys.path[1:] if path)
+    return inputs
+
+
+def get_compile_inputs(args):
+    """编译阶段输入：编译参数、编译环境、项目Python源码和参数中引用的文件"""
+    inputs = ["args:" + " ".join(args)] + get_toolchain_inputs()
+    for arg in args[1:]:
+        value = arg.split("=", 1)[-1].replace(";", os.pathsep).split(os.pathsep)[0]
+        # 输出目录和临时目录是编译产物，不作为输入
+        if value and value != "." and os.path.exists(value) and os.path.normpath(value) not in SOURCE_EXCLUDE_PATHS:
+            inputs.append(value)
+    inputs.extend(_walk_sources(".", (".py", ".pyw")))
+    return inputs
+
+
+def cleanup_build_files():
+    """清理临时构建目录和生成的.spec文件"""
     temp_dir = Path("{output_dir}_temp")
     if temp_dir.exists():
         try:
@@ -235,10 +1460,67 @@ COMMON_MAIN_END = '''
             log_success("✅ 已清理.spec文件")
         except Exception as e:
             log_warning(f"⚠️  清理.spec文件失败: {{e}}")
+
+
+def main():
+    """主构建函数"""
+    # 记录开始时间
+    start_time = datetime.now()
+    
+    log_info("=" * 60)
+    log_info("🚀 {tool_name} 构建脚本")
+    log_info("=" * 60)
+'''
+
+# 公共主函数结束部分
+COMMON_MAIN_END = '''    BUILD_RESULT["command"] = args
+    
+    # 构建阶段图：资源复制、清理和各类型Linux包在编译完成后并行执行
+    # （编译器会写入并清理输出目录，资源复制不能与编译同时进行）；
+    # 输入未变化的阶段直接跳过 (--force 或 BUILD_FORCE=1 强制全部执行)
+    compile_deps = ["preflight"]
+    stages = [BuildStage("preflight", run_preflight)]
+    if not BUILD_OPTIONS.skip_precheck:
+        # 语法预检：入口文件可达的源码有语法错误时，在启动编译器之前失败
+        stages.append(BuildStage(
+            "precheck", lambda: run_precheck(args[-1]), deps=["preflight"],
+            inputs=lambda: ["python:" + sys.version] + list(_walk_sources(".", (".py", ".pyw"))),
+        ))
+        compile_deps.append("precheck")
+    if BUILD_OPTIONS.isolated:
+        # 隔离构建：先准备构建环境，编译命令改用其中的解释器
+        stages.append(BuildStage("build_env", lambda: use_isolated_env(args), deps=["preflight"]))
+        compile_deps.append("build_env")
+    stages += [
+        BuildStage(
+            "compile", lambda: run_compile(args), deps=compile_deps,
+            inputs=lambda: get_compile_inputs(args), outputs=lambda: [find_build_executable()],
+        ),
+        BuildStage("assets", copy_additional_files, deps=["compile"], inputs=COPY_DIRS, outputs=get_copy_outputs),
+        BuildStage("cleanup", cleanup_build_files, deps=["compile"]),
+    ]
+    stages.extend(get_package_stages())
+    
+    failure = run_stages(stages)
+    if failure:
+        exit_build(1, failure)
+    
+    # 计算总耗时
+    end_time = datetime.now()
+    duration = end_time - start_time
+    total_seconds = int(duration.total_seconds())
+    minutes = total_seconds // 60
+    seconds = total_seconds % 60
     
-    # Linux包生成（如果启用）
-    {linux_package_code}
+    log_success("🎉 构建完成！")
+    log_info("输出位置: {output_dir}")
+    log_info(f"⏱️  总耗时: {{minutes}}分{{seconds}}秒")
 
 
 if __name__ == "__main__":
-    main()'''
+    try:
+        main()
+    except KeyboardInterrupt:
+        log_info("👋 用户中断构建")
+        exit_build(130, "用户中断")
+    exit_build(0)'''
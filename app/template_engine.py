@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+模板引擎模块 - 将构建脚本模板预编译为片段，单次拼接完成渲染
+
+模板只使用一种占位符语法：{name} 为字段，{{ 和 }} 为字面量花括号。
+"""
+
+from functools import lru_cache
+from string import Formatter
+from typing import List, Tuple
+
+
+class CompiledTemplate:
+    """预编译模板 - 解析一次，多次渲染"""
+
+    def __init__(self, text: str):
+        self._parts: List[str] = []
+        self._slots: List[Tuple[int, str]] = []
+
+        for literal, field_name, format_spec, conversion in Formatter().parse(text):
+            if literal:
+                self._parts.append(literal)
+            if field_name is None:
+                continue
+            if not field_name.isidentifier() or format_spec or conversion:
+                raise ValueError(f"模板仅支持简单字段占位符: {{{field_name}}}")
+            self._slots.append((len(self._parts), field_name))
+            self._parts.append("")
+
+        self.fields = frozenset(name for _, name in self._slots)
+
+    def render(self, **values) -> str:
+        """渲染模板，多余的字段会被忽略
+
+        Raises:
+            KeyError: 缺少模板需要的字段
+        """
+        missing = self.fields.difference(values)
+        if missing:
+            raise KeyError(f"模板缺少字段: {', '.join(sorted(missing))}")
+
+        parts = self._parts.copy()
+        for index, name in self._slots:
+            parts[index] = str(values[name])
+        return "".join(parts)
+
+
+@lru_cache(maxsize=None)
+def compile_template(text: str) -> CompiledTemplate:
+    """获取预编译模板（每个进程每个模板只解析一次）"""
+    return CompiledTemplate(text)
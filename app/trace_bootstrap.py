@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+导入追踪引导脚本 - 由 import_tracer 在子进程中执行，只依赖标准库
+
+在 sys.meta_path 最前面安装记录器，运行入口文件或冒烟测试，
+退出（或超时）时把运行期间加载的模块、读取的数据文件和 ctypes 加载的动态库写入JSON。
+
+用法:
+    python trace_bootstrap.py 输出文件 超时秒数 脚本.py [参数...]
+    python trace_bootstrap.py 输出文件 超时秒数 -m 模块 [参数...]
+"""
+
+import json
+import os
+import runpy
+import sys
+import threading
+import time
+import traceback
+
+# 记录器安装前已加载的模块（解释器启动和本脚本自身）
+BASELINE = set(sys.modules)
+# 不视为数据文件的后缀
+CODE_SUFFIXES = (".py", ".pyc", ".pyo", ".pyd", ".so", ".dylib", ".dll", ".pth")
+# 导入机制自身的模块，查找导入者时跳过（importlib.import_module 的调用者才是导入者）
+IMPORT_MACHINERY = {"importlib", "importlib._bootstrap", "importlib._bootstrap_external",
+                    "_frozen_importlib", "_frozen_importlib_external"}
+
+# {模块名: 导入者模块名}，按首次导入顺序
+_imported = {}
+_data_files = set()
+_binaries = set()
+_dump_lock = threading.Lock()
+_dumped = False
+
+
+class ImportRecorder:
+    """只记录导入请求的元路径查找器，实际查找交给后续查找器"""
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname not in _imported:
+            frame = sys._getframe(1)
+            while frame is not None and frame.f_globals.get("__name__") in IMPORT_MACHINERY:
+                frame = frame.f_back
+            _imported[fullname] = frame.f_globals.get("__name__") if frame is not None else None
+        return None
+
+    def invalidate_caches(self):
+        pass
+
+
+def _audit(event, args):
+    """记录以只读方式打开的非代码文件和 ctypes 加载的动态库"""
+    if event == "open" and args and isinstance(args[0], str):
+        mode = args[1] if len(args) > 1 and isinstance(args[1], str) else "r"
+        if "r" in mode and "+" not in mode and not args[0].endswith(CODE_SUFFIXES):
+            _data_files.add(args[0])
+    elif event == "ctypes.dlopen" and args and isinstance(args[0], str):
+        _binaries.add(args[0])
+
+
+def dump(output, exit_code, timed_out, started):
+    """写出追踪结果（只写一次）"""
+    global _dumped
+    with _dump_lock:
+        if _dumped:
+            return
+        _dumped = True
+        names = [name for name in _imported if name in sys.modules]
+        names += [name for name in list(sys.modules) if name not in BASELINE and name not in _imported]
+        modules = {}
+        for name in names:
+            module = sys.modules.get(name)
+            if name == "__main__" or module is None:
+                continue
+            modules[name] = getattr(module, "__file__", None)
+        data_files = sorted(path for path in _data_files if os.path.isfile(path))
+        binaries = sorted(os.path.abspath(path) for path in _binaries if os.path.isfile(path))
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({
+                "modules": modules,
+                "importers": {name: _imported.get(name) for name in modules},
+                "data_files": data_files,
+                "binaries": binaries,
+                "exit_code": exit_code,
+                "timed_out": timed_out,
+                "seconds": round(time.perf_counter() - started, 3),
+            }, f, ensure_ascii=False)
+
+
+def main():
+    output, timeout, target, args = sys.argv[1], float(sys.argv[2]), sys.argv[3], sys.argv[4:]
+    started = time.perf_counter()
+
+    # GUI或服务类程序不会自行退出：到时间后记录结果并结束进程
+    def on_timeout():
+        dump(output, 0, True, started)
+        os._exit(0)
+
+    timer = threading.Timer(timeout, on_timeout)
+    timer.daemon = True
+
+    sys.meta_path.insert(0, ImportRecorder())
+    sys.addaudithook(_audit)
+    exit_code = 0
+    timer.start()
+    try:
+        if target == "-m":
+            sys.argv = [args[0]] + args[1:]
+            sys.path[0] = os.getcwd()
+            runpy.run_module(args[0], run_name="__main__", alter_sys=True)
+        else:
+            sys.argv = [target] + args
+            sys.path[0] = os.path.dirname(os.path.abspath(target))
+            runpy.run_path(target, run_name="__main__")
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        timer.cancel()
+        dump(output, exit_code, False, started)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
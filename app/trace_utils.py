@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+生成器追踪模块 - 以 Chrome Trace Event 格式记录脚本生成各步骤的耗时
+
+生成的 trace.json 可在 chrome://tracing 或 https://ui.perfetto.dev 中打开；
+时间戳使用墙钟微秒，批量生成时各工作进程的区间可以合并到同一时间轴。
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+def now_us() -> int:
+    """当前墙钟时间（微秒）"""
+    return time.time_ns() // 1000
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """当前进程的峰值内存 (MB)，不支持的平台返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 上 ru_maxrss 单位为字节
+    return round(peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024, 1)
+
+
+class Tracer:
+    """Chrome Trace Event 追踪器，未启用时所有记录操作均为空操作"""
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """启用追踪并写入进程名元数据"""
+        self.enabled = True
+        self._append({
+            "name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0,
+            "args": {"name": "PythonBuildScriptGenerator"},
+        })
+
+    @contextmanager
+    def span(self, name: str, category: str = "generator", **args):
+        """记录代码块的耗时区间，结束时同时采样内存和CPU计数器"""
+        if not self.enabled:
+            yield
+            return
+        started = now_us()
+        try:
+            yield
+        finally:
+            self.add_span(name, started, now_us() - started, category, args=args)
+            self.sample_counters()
+
+    def add_span(self, name: str, start_us: int, duration_us: int, category: str = "generator",
+                 pid: Optional[int] = None, tid: Optional[int] = None, args: Optional[Dict] = None):
+        """添加一个完整区间（ph=X），pid/tid 默认为当前进程和线程"""
+        if not self.enabled:
+            return
+        event = {
+            "name": name, "cat": category, "ph": "X",
+            "pid": pid or os.getpid(), "tid": tid or threading.get_native_id(),
+            "ts": start_us, "dur": max(0, duration_us),
+        }
+        if args:
+            event["args"] = args
+        self._append(event)
+
+    def add_counter(self, name: str, values: Dict, ts_us: Optional[int] = None, pid: Optional[int] = None):
+        """添加计数器事件（ph=C）"""
+        if not self.enabled:
+            return
+        self._append({"name": name, "ph": "C", "pid": pid or os.getpid(), "ts": ts_us or now_us(), "args": values})
+
+    def sample_counters(self):
+        """采样当前进程的CPU时间和峰值内存"""
+        ts = now_us()
+        self.add_counter("cpu", {"cpu_seconds": round(time.process_time(), 3)}, ts)
+        rss = _peak_rss_mb()
+        if rss is not None:
+            self.add_counter("memory", {"peak_rss_mb": rss}, ts)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def save(self, path: str) -> bool:
+        """写入 trace.json，返回是否成功"""
+        from .logger_utils import log_info, log_warning
+
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False)
+        except OSError as e:
+            log_warning(f"⚠️  写入生成器追踪失败: {e}")
+            return False
+        log_info(f"🧭 生成器追踪已写入: {path}")
+        return True
+
+    def _append(self, event: Dict):
+        with self._lock:
+            self.events.append(event)
+
+
+# 全局追踪器：由 main.py --trace 启用
+TRACER = Tracer()
@@ -6,6 +6,7 @@ UI工具模块 - 处理横幅显示和摘要显示
 import sys
 import shutil
 from loguru import logger
+from .build_estimator import describe_estimate, estimate_config
 from .tool_analyzer import ToolRequirementAnalyzer
 
 
@@ -82,6 +83,8 @@ class UIUtils:
             logger.info(
                 f"启用插件: {', '.join(config.enable_plugins) if config.enable_plugins else '无'}"
             )
+            if config.include_modules:
+                logger.info(f"包含模块: {', '.join(config.include_modules)}")
         elif config.build_tool == "pyinstaller":
             logger.info(
                 f"隐藏导入: {', '.join(config.hidden_imports) if config.hidden_imports else '无'}"
@@ -92,6 +95,10 @@ class UIUtils:
             logger.info(
                 f"数据文件: {', '.join(config.add_data) if config.add_data else '无'}"
             )
+            if config.add_binary:
+                logger.info(f"动态库: {', '.join(config.add_binary)}")
+            if config.copy_metadata:
+                logger.info(f"发行包元数据: {', '.join(config.copy_metadata)}")
             if config.upx_dir:
                 logger.info(f"UPX压缩: {'自动检测' if config.upx_dir == 'auto' else config.upx_dir}")
             logger.info(f"调试模式: {'是' if config.debug else '否'}")
@@ -110,10 +117,31 @@ class UIUtils:
             f"复制目录: {', '.join(config.copy_dirs) if config.copy_dirs else '无'}"
         )
         logger.info(f"脚本文件名: {config.script_filename}")
+        if getattr(config, "generate_ninja", False):
+            logger.info("构建图: build.ninja")
+        if getattr(config, "isolated_build", False):
+            logger.info("构建环境: 隔离环境 (按锁文件缓存于 .build_env/)")
         
         # 显示工具需求
         analyzer = ToolRequirementAnalyzer()
         requirements_summary = analyzer.get_requirements_summary(config)
         logger.info(f"工具需求: {requirements_summary}")
+
+        UIUtils.display_estimate(config)
         
         logger.info("=" * 60)
+
+    @staticmethod
+    def display_estimate(config):
+        """显示构建预估（耗时、峰值内存、产物大小和主要贡献模块）"""
+        try:
+            estimate = estimate_config(config)
+        except Exception as e:
+            logger.warning(f"⚠️  构建预估失败: {e}")
+            return
+        if estimate is None:
+            return
+        logger.info("-" * 60)
+        logger.info("🔮 构建预估")
+        for line in describe_estimate(estimate):
+            logger.info(line)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+端到端构建基准测试 - 使用假工具链离线驱动生成的 build.py（生成 → 编译 → 复制 → 打包）
+
+假工具的休眠时间已知，因此 总耗时 - 休眠时间 即为构建脚本自身的编排、复制和打包开销。
+
+用法:
+    python benchmarks/bench_e2e.py --tool nuitka --runs 5 --compile-sleep 1 --asset-mb 50
+    python benchmarks/bench_e2e.py --output e2e.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FAKE_TOOLS_DIR = Path(__file__).resolve().parent / "fake_tools"
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.build_config import BuildConfig  # noqa: E402
+from app.script_generator import ScriptGenerator  # noqa: E402
+
+
+def create_project(project_dir, copy_dirs, asset_mb, files_per_dir):
+    """创建带资源目录的示例项目"""
+    project_dir = Path(project_dir)
+    (project_dir / "main.py").write_text("print('hello from bench')\n", encoding="utf-8")
+
+    bytes_per_file = int(asset_mb * 1024 * 1024 / max(1, copy_dirs * files_per_dir))
+    dir_names = []
+    for i in range(copy_dirs):
+        asset_dir = project_dir / f"assets_{i}"
+        asset_dir.mkdir()
+        for j in range(files_per_dir):
+            (asset_dir / f"file_{j}.bin").write_bytes(os.urandom(1024) * max(1, bytes_per_file // 1024))
+        dir_names.append(asset_dir.name)
+    return dir_names
+
+
+def generate_build_script(project_dir, tool, copy_dirs, package_types):
+    """使用纯生成接口生成 build.py"""
+    config = BuildConfig(
+        project_dir=str(project_dir),
+        entry_file=str(Path(project_dir) / "main.py"),
+        app_name="bench",
+        build_tool=tool,
+        compiler="clang",
+        onefile=True,
+        copy_dirs=tuple(copy_dirs),
+        generate_linux_packages=bool(package_types),
+        linux_package_types=tuple(package_types),
+    )
+    result = ScriptGenerator().generate(config, "full")
+    (Path(project_dir) / result.script_filename).write_text(result.script, encoding="utf-8")
+    return result
+
+
+def build_env(args):
+    """构造指向假工具链的环境变量"""
+    env = dict(os.environ)
+    env["PATH"] = str(FAKE_TOOLS_DIR / "bin") + os.pathsep + env.get("PATH", "")
+    env["PYTHONPATH"] = str(FAKE_TOOLS_DIR / "site") + os.pathsep + env.get("PYTHONPATH", "")
+    env["BUILD_HEADLESS"] = "1"
+    env["FAKE_ARTIFACT_SIZE"] = str(int(args.artifact_mb * 1024 * 1024))
+    env[f"FAKE_{args.tool.upper()}_SLEEP"] = str(args.compile_sleep)
+    env["FAKE_NFPM_SLEEP"] = str(args.package_sleep)
+    env["FAKE_FPM_SLEEP"] = str(args.package_sleep)
+    return env
+
+
+def run_build(project_dir, env, force_preflight, force_stages):
+    """运行一次 build.py 并返回耗时和结果"""
+    run_env = dict(env)
+    if force_preflight:
+        run_env["BUILD_FORCE_PREFLIGHT"] = "1"
+    if force_stages:
+        run_env["BUILD_FORCE"] = "1"
+    result_file = Path(project_dir) / "result.json"
+
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "build.py", "--headless", "--result-json", str(result_file)],
+        cwd=project_dir,
+        env=run_env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+
+    result = json.loads(result_file.read_text(encoding="utf-8")) if result_file.exists() else {}
+    return {"wall_s": round(wall, 4), "exit_code": proc.returncode, "result": result, "stderr": proc.stderr[-2000:]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="使用假工具链的端到端构建基准测试")
+    parser.add_argument("--tool", choices=["nuitka", "pyinstaller"], default="nuitka")
+    parser.add_argument("--runs", type=int, default=3, help="运行次数 (默认: 3)")
+    parser.add_argument("--compile-sleep", type=float, default=0.5, help="假编译器耗时秒数")
+    parser.add_argument("--package-sleep", type=float, default=0.2, help="每个包的假打包耗时秒数")
+    parser.add_argument("--artifact-mb", type=float, default=10, help="假产物大小 (MB)")
+    parser.add_argument("--copy-dirs", type=int, default=4, help="资源目录数量")
+    parser.add_argument("--files-per-dir", type=int, default=50, help="每个资源目录的文件数")
+    parser.add_argument("--asset-mb", type=float, default=20, help="资源总大小 (MB)")
+    parser.add_argument("--packages", default="deb,rpm", help="包类型，逗号分隔，留空不打包")
+    parser.add_argument("--incremental", action="store_true", help="首次运行后复用阶段缓存（测量增量构建）")
+    parser.add_argument("--output", metavar="FILE", help="将结果保存为JSON文件")
+    args = parser.parse_args()
+
+    package_types = [p.strip() for p in args.packages.split(",") if p.strip()]
+    # 各类型的包并行生成，关键路径上只有一次打包休眠
+    expected_sleep = args.compile_sleep + (args.package_sleep if package_types else 0)
+
+    runs = []
+    with tempfile.TemporaryDirectory() as project_dir:
+        copy_dirs = create_project(project_dir, args.copy_dirs, args.asset_mb, args.files_per_dir)
+
+        start = time.perf_counter()
+        generation = generate_build_script(project_dir, args.tool, copy_dirs, package_types)
+        generate_s = time.perf_counter() - start
+
+        env = build_env(args)
+        for i in range(args.runs):
+            # 第一次运行执行完整预检，之后使用预检缓存；增量模式下之后的运行跳过未变化的阶段
+            cached = args.incremental and i > 0
+            run = run_build(project_dir, env, force_preflight=(i == 0), force_stages=not cached)
+            run["overhead_s"] = round(run["wall_s"] - (0 if cached else expected_sleep), 4)
+            run["preflight"] = "full" if i == 0 else "cached"
+            runs.append(run)
+            status = "✅" if run["exit_code"] == 0 else "❌"
+            print(f"{status} 第{i + 1}次: 总耗时 {run['wall_s']:.3f}s，编排开销 {run['overhead_s']:.3f}s ({run['preflight']})")
+            if run["exit_code"] != 0:
+                print(run["stderr"])
+
+    overheads = [r["overhead_s"] for r in runs]
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "tool": args.tool,
+            "compile_sleep_s": args.compile_sleep,
+            "package_sleep_s": args.package_sleep,
+            "package_types": package_types,
+            "artifact_mb": args.artifact_mb,
+            "asset_mb": args.asset_mb,
+            "copy_dirs": args.copy_dirs,
+            "incremental": args.incremental,
+            "files_per_dir": args.files_per_dir,
+            "script_bytes": generation.metadata["script_bytes"],
+        },
+        "generate_s": round(generate_s, 4),
+        "runs": [{k: v for k, v in r.items() if k != "stderr"} for r in runs],
+        "summary": {
+            "min_overhead_s": min(overheads),
+            "median_overhead_s": round(statistics.median(overheads), 4),
+            "failed_runs": sum(1 for r in runs if r["exit_code"] != 0),
+        },
+    }
+
+    print(f"生成耗时 {report['generate_s']:.4f}s，编排开销中位数 {report['summary']['median_overhead_s']:.3f}s")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"结果已保存到: {args.output}")
+
+    sys.exit(1 if report["summary"]["failed_runs"] else 0)
+
+
+if __name__ == "__main__":
+    main()
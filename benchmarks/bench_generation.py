@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+生成流程基准测试 - 对参数生成、脚本渲染、工具需求分析、NFPM配置生成和环境检查计时
+
+用法:
+    python benchmarks/bench_generation.py                          # 运行并输出结果
+    python benchmarks/bench_generation.py --output bench.json      # 保存结果
+    python benchmarks/bench_generation.py --baseline bench.json    # 与基线对比，回归时退出码为1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.build_config import BuildConfig  # noqa: E402
+from app.env_checker import EnvironmentChecker  # noqa: E402
+from app.package_generators import LinuxPackageGenerator  # noqa: E402
+from app.script_generator import ScriptGenerator  # noqa: E402
+from app.tool_analyzer import ToolRequirementAnalyzer  # noqa: E402
+
+
+# 配置规模：插件、排除包、隐藏导入、复制目录等列表的条目数
+SIZES = {"small": 10, "medium": 500, "large": 5000}
+
+# 环境检查使用的桩工具
+STUB_TOOLS = [
+    "uv", "poetry", "pdm", "pipenv", "pip", "nuitka", "pyinstaller", "clang", "gcc",
+    "fpm", "nfpm", "dpkg-deb", "rpmbuild", "pkgbuild", "productbuild",
+]
+
+
+def make_config(project_dir, count, build_tool="nuitka"):
+    """构造指定规模的构建配置"""
+    return BuildConfig(
+        project_dir=project_dir,
+        entry_file=str(Path(project_dir) / "main.py"),
+        app_name="bench",
+        build_tool=build_tool,
+        compiler="clang",
+        icon_file="app.ico",
+        enable_plugins=tuple(f"plugin-{i}" for i in range(count)),
+        exclude_packages=tuple(f"exclude_pkg_{i}" for i in range(count)),
+        hidden_imports=tuple(f"hidden.module_{i}" for i in range(count)),
+        collect_all=tuple(f"collect_pkg_{i}" for i in range(count)),
+        add_data=tuple(f"data/file_{i}.dat;data" for i in range(count)),
+        copy_dirs=tuple(f"assets_{i}" for i in range(count)),
+        generate_linux_packages=True,
+        linux_package_types=("deb", "rpm"),
+        package_depends=tuple(f"libdep{i}" for i in range(count)),
+    )
+
+
+def make_package_generator(executable, count):
+    """构造指定规模的Linux包生成器"""
+    generator = LinuxPackageGenerator()
+    generator.app_name = "bench"
+    generator.description = "benchmark application"
+    generator.maintainer = "Bench <bench@example.com>"
+    generator.executable_path = executable
+    generator.package_types = ["deb", "rpm"]
+    generator.depends = [f"libdep{i}" for i in range(count)]
+    generator.desktop_file = "Bench"
+    generator.create_service = True
+    generator.service_name = "bench"
+    return generator
+
+
+def create_stub_tools(bin_dir):
+    """创建输出版本号的桩工具，用于离线计时环境检查"""
+    for tool in STUB_TOOLS:
+        stub = Path(bin_dir) / tool
+        stub.write_text(f'#!/bin/sh\necho "{tool} 0.0.0-stub"\n', encoding="utf-8")
+        stub.chmod(0o755)
+
+
+def measure(func, runs, warmup=1):
+    """多次运行函数并返回耗时统计（毫秒）"""
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "runs": runs,
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.mean(timings), 4),
+    }
+
+
+def run_benchmarks(runs, sizes):
+    """运行全部基准测试，返回 {名称: 统计}"""
+    results = {}
+    generator = ScriptGenerator()
+    analyzer = ToolRequirementAnalyzer()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        (Path(work_dir) / "main.py").write_text("print('bench')\n", encoding="utf-8")
+        executable = Path(work_dir) / "bench"
+        executable.write_bytes(b"\0" * 1024)
+
+        old_cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            for size_name in sizes:
+                count = SIZES[size_name]
+                nuitka_config = make_config(work_dir, count, "nuitka")
+                pyinstaller_config = make_config(work_dir, count, "pyinstaller")
+                nuitka_args = generator.generate_nuitka_args(nuitka_config)
+                package_generator = make_package_generator(str(executable), count)
+
+                cases = {
+                    "generate_nuitka_args": lambda: generator.generate_nuitka_args(nuitka_config),
+                    "generate_pyinstaller_args": lambda: generator.generate_pyinstaller_args(pyinstaller_config),
+                    "generate_python_script": lambda: generator.generate_python_script(nuitka_args, nuitka_config),
+                    "analyze_requirements": lambda: analyzer.analyze_requirements(nuitka_config),
+                    "create_nfpm_config": package_generator._create_nfpm_config,
+                }
+
+                for name, func in cases.items():
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        results[f"{name}[{size_name}]"] = measure(func, runs)
+        finally:
+            os.chdir(old_cwd)
+
+        # 环境检查：使用桩工具替换PATH，避免依赖真实工具链
+        stub_dir = Path(work_dir) / "stub_bin"
+        stub_dir.mkdir()
+        create_stub_tools(stub_dir)
+        old_path = os.environ.get("PATH", "")
+        os.environ["PATH"] = str(stub_dir) + os.pathsep + old_path
+        try:
+            checker = EnvironmentChecker()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results["env_check_all[stub]"] = measure(checker.check_all, max(1, runs // 10))
+        finally:
+            os.environ["PATH"] = old_path
+
+    return results
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """与基线对比，返回回归列表 [(名称, 基线ms, 当前ms, 比例)]"""
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or base["min_ms"] <= 0:
+            continue
+        ratio = stats["min_ms"] / base["min_ms"]
+        if ratio > 1 + threshold:
+            regressions.append((name, base["min_ms"], stats["min_ms"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="构建脚本生成流程基准测试")
+    parser.add_argument("--runs", type=int, default=50, help="每个用例的运行次数 (默认: 50)")
+    parser.add_argument(
+        "--sizes", default="small,medium,large",
+        help=f"配置规模，逗号分隔 (可选: {', '.join(SIZES)})",
+    )
+    parser.add_argument("--output", metavar="FILE", help="将结果保存为JSON文件")
+    parser.add_argument("--baseline", metavar="FILE", help="基线JSON文件，用于检测性能回归")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25,
+        help="回归阈值，当前最小耗时超过基线的比例 (默认: 0.25 即 25%%)",
+    )
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip() in SIZES]
+    results = run_benchmarks(args.runs, sizes)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+            "sizes": {name: SIZES[name] for name in sizes},
+        },
+        "results": results,
+    }
+
+    width = max(len(name) for name in results)
+    print(f"{'用例':<{width}}  {'min(ms)':>10}  {'median(ms)':>10}  {'mean(ms)':>10}")
+    for name, stats in results.items():
+        print(f"{name:<{width}}  {stats['min_ms']:>10.4f}  {stats['median_ms']:>10.4f}  {stats['mean_ms']:>10.4f}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"结果已保存到: {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ 检测到 {len(regressions)} 项性能回归 (阈值 {args.threshold:.0%}):")
+            for name, base_ms, current_ms, ratio in regressions:
+                print(f"  {name}: {base_ms:.4f}ms -> {current_ms:.4f}ms ({ratio:.2f}x)")
+            sys.exit(1)
+        print("✅ 未检测到性能回归")
+
+
+if __name__ == "__main__":
+    main()
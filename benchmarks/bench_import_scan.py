@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+导入图扫描基准测试 - 在合成的 site-packages 上测量冷启动、并行、缓存命中和小改动后重扫的耗时
+
+用法:
+    python benchmarks/bench_import_scan.py --distributions 300 --modules 40
+    python benchmarks/bench_import_scan.py --workers 8 --output scan.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.import_analyzer import ImportGraphAnalyzer, ImportScanner  # noqa: E402
+
+# 模拟真实模块体积的函数体
+FILLER = "".join(
+    f"def func_{i}(value):\n    result = [value * {i} for _ in range(3)]\n    return sum(result)\n\n"
+    for i in range(40)
+)
+
+
+def create_site_packages(root, distributions, modules):
+    """创建合成 site-packages：每个包的模块依次导入下一个，并导入下一个包"""
+    site_dir = Path(root) / "site-packages"
+    for d in range(distributions):
+        package_dir = site_dir / f"dist_{d}"
+        package_dir.mkdir(parents=True)
+        next_dist = f"import dist_{d + 1}\n" if d + 1 < distributions else ""
+        (package_dir / "__init__.py").write_text(f"from . import mod_0\n{next_dist}", encoding="utf-8")
+        for m in range(modules):
+            imports = "import os\nimport json\n"
+            if m + 1 < modules:
+                imports += f"from . import mod_{m + 1}\n"
+            (package_dir / f"mod_{m}.py").write_text(imports + FILLER, encoding="utf-8")
+    return site_dir
+
+
+def create_project(root):
+    project_dir = Path(root) / "project"
+    project_dir.mkdir()
+    (project_dir / "helpers.py").write_text("import dist_0\n" + FILLER, encoding="utf-8")
+    (project_dir / "main.py").write_text("import helpers\n", encoding="utf-8")
+    return project_dir
+
+
+def timed_scan(project_dir, site_dir, workers, use_cache=True):
+    """执行一次完整导入图分析，返回 (秒, 模块数, 扫描统计)"""
+    scanner = ImportScanner(workers=workers, use_cache=use_cache)
+    analyzer = ImportGraphAnalyzer(
+        str(project_dir), str(project_dir / "main.py"),
+        search_paths=[str(project_dir), str(site_dir)], scanner=scanner,
+    )
+    start = time.perf_counter()
+    graph = analyzer.build_graph()
+    return time.perf_counter() - start, len(graph), dict(scanner.stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导入图扫描基准测试")
+    parser.add_argument("--distributions", type=int, default=300, help="合成发行包数量 (默认: 300)")
+    parser.add_argument("--modules", type=int, default=40, help="每个包的模块数 (默认: 40)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行解析的进程数")
+    parser.add_argument("--output", metavar="FILE", help="将结果保存为JSON文件")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["BUILD_SCRIPT_CACHE_DIR"] = str(Path(tmp) / "cache")
+        site_dir = create_site_packages(tmp, args.distributions, args.modules)
+        project_dir = create_project(tmp)
+
+        cases = [
+            ("cold_sequential", dict(workers=0, use_cache=False)),
+            ("cold_parallel", dict(workers=args.workers, use_cache=True)),
+            ("warm_cache", dict(workers=args.workers, use_cache=True)),
+        ]
+        results = {}
+        for name, options in cases:
+            seconds, module_count, stats = timed_scan(project_dir, site_dir, **options)
+            results[name] = {"seconds": round(seconds, 4), "modules": module_count, **stats}
+
+        # 小改动：修改一个项目文件后重新扫描
+        helpers = project_dir / "helpers.py"
+        helpers.write_text(helpers.read_text(encoding="utf-8") + "\nVALUE = 1\n", encoding="utf-8")
+        seconds, module_count, stats = timed_scan(project_dir, site_dir, args.workers)
+        results["after_small_change"] = {"seconds": round(seconds, 4), "modules": module_count, **stats}
+
+    print(f"{'用例':<20} {'耗时(s)':>9} {'模块':>7} {'文件':>7} {'缓存命中':>8} {'解析':>7}")
+    for name, r in results.items():
+        print(f"{name:<20} {r['seconds']:>9.3f} {r['modules']:>7} {r['files']:>7} {r['hits']:>8} {r['parsed']:>7}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"distributions": args.distributions, "modules": args.modules,
+                       "workers": args.workers, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
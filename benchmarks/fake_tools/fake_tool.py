@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+离线基准测试用的假工具链 - 模拟 nuitka、pyinstaller、nfpm 和 fpm
+
+根据调用名称（argv[0]）选择行为：输出与真实工具相似的日志，按配置休眠，
+并写出指定大小的假产物。通过环境变量配置：
+
+    FAKE_TOOL_SLEEP          所有工具的默认休眠秒数 (默认: 0)
+    FAKE_<TOOL>_SLEEP        指定工具的休眠秒数，如 FAKE_NUITKA_SLEEP=2.5
+    FAKE_ARTIFACT_SIZE       产物大小（字节，默认: 1048576）
+    FAKE_<TOOL>_SIZE         指定工具的产物大小
+    FAKE_TOOL_FAIL           逗号分隔的工具名，这些工具将以退出码1失败
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+
+VERSIONS = {
+    "nuitka": "2.8\nCommercial: None\nPython: 3.12",
+    "pyinstaller": "6.16.0",
+    "nfpm": "nfpm version 2.43.0 (fake)",
+    "fpm": "1.16.0",
+}
+
+NUITKA_PLUGIN_LIST = """\
+        The following plugins are available in Nuitka
+--------------------------------------------------------------------------------
+ anti-bloat        Patch stupid imports out of widely used library modules source
+                   codes.
+ data-files        Include data files specified by package configuration files.
+ matplotlib        Required for 'matplotlib' module.
+ multiprocessing   Required by Python's 'multiprocessing' module.
+ pyside6           Required by the PySide6 package for standalone mode.
+ tk-inter          Required by Python's Tk modules.
+"""
+
+# 各配置项对应的全局环境变量
+GLOBAL_SETTINGS = {"SLEEP": "FAKE_TOOL_SLEEP", "SIZE": "FAKE_ARTIFACT_SIZE"}
+
+
+def _tool_setting(tool, name, default):
+    """读取工具专属或全局的环境变量配置"""
+    value = os.environ.get(f"FAKE_{tool.upper()}_{name}") or os.environ.get(GLOBAL_SETTINGS[name])
+    return value if value is not None else default
+
+
+def _option(args, name, default=None):
+    """解析 --name=value 或 --name value 形式的参数"""
+    for i, arg in enumerate(args):
+        if arg.startswith(f"{name}="):
+            return arg.split("=", 1)[1]
+        if arg == name and i + 1 < len(args):
+            return args[i + 1]
+    return default
+
+
+def _write_artifact(path, size, executable=True):
+    """写出指定大小的假产物"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chunk = b"\0" * min(size, 1024 * 1024)
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining > 0:
+            f.write(chunk[:remaining])
+            remaining -= len(chunk)
+    if executable:
+        path.chmod(0o755)
+    return path
+
+
+def _simulate(tool, phases):
+    """按阶段输出日志并平均分配休眠时间"""
+    total = float(_tool_setting(tool, "SLEEP", "0"))
+    for phase in phases:
+        print(f"{tool.capitalize()}: {phase}", flush=True)
+        if total > 0:
+            time.sleep(total / len(phases))
+
+
+def run_nuitka(args):
+    entry = next((a for a in reversed(args) if a.endswith(".py")), "main.py")
+    output_dir = _option(args, "--output-dir", ".")
+    name = _option(args, "--output-filename", Path(entry).stem)
+    size = int(_tool_setting("nuitka", "SIZE", "1048576"))
+
+    print(f"Nuitka-Options: Used command line options: {' '.join(args)}")
+    _simulate("nuitka", [
+        f"Starting Python compilation with '{entry}'.",
+        "Completed Python level compilation and optimization.",
+        "Generating source code for C backend compiler.",
+        "Running C compilation via Scons.",
+        "Backend linking program with 123 files.",
+    ])
+
+    if "--onefile" in args:
+        target = Path(output_dir) / name
+    elif "--standalone" in args:
+        target = Path(output_dir) / f"{Path(entry).stem}.dist" / name
+    else:
+        target = Path(output_dir) / f"{name}.bin"
+    _write_artifact(target, size)
+    print(f"Nuitka: Successfully created '{target}'.")
+
+
+def run_pyinstaller(args):
+    entry = next((a for a in reversed(args) if a.endswith(".py")), "main.py")
+    distpath = _option(args, "--distpath", "dist")
+    workpath = _option(args, "--workpath", "build")
+    name = _option(args, "--name", Path(entry).stem)
+    size = int(_tool_setting("pyinstaller", "SIZE", "1048576"))
+
+    print("INFO: PyInstaller: 6.16.0, contrib hooks: 2025.9")
+    _simulate("pyinstaller", [
+        "INFO: Analyzing modules for base_library.zip ...",
+        f"INFO: Analyzing {entry}",
+        "INFO: Building PYZ (ZlibArchive)",
+        "INFO: Building EXE from EXE-00.toc",
+    ])
+
+    Path(workpath).mkdir(parents=True, exist_ok=True)
+    Path(f"{name}.spec").write_text(f"# fake spec for {name}\n", encoding="utf-8")
+    if "--onefile" in args:
+        target = Path(distpath) / name
+    else:
+        target = Path(distpath) / name / name
+        # 与真实 PyInstaller 一致：onedir 输出目录已存在且未指定 --noconfirm 时询问是否删除
+        if target.parent.exists() and "--noconfirm" not in args:
+            answer = input(f"WARNING: The output directory \"{target.parent}\" and ALL ITS CONTENTS will be REMOVED! "
+                           "Continue? (y/N)")
+            if answer.strip().lower() != "y":
+                print("SystemExit: User aborted")
+                sys.exit(1)
+    _write_artifact(target, size)
+    print("INFO: Building EXE from EXE-00.toc completed successfully.")
+
+
+def run_nfpm(args):
+    if args[:1] == ["version"]:
+        print(VERSIONS["nfpm"])
+        return
+    packager = _option(args, "--packager", "deb")
+    target = _option(args, "--target", f"package.{packager}")
+    size = int(_tool_setting("nfpm", "SIZE", "1048576"))
+
+    _simulate("nfpm", [f"using {packager} packager..."])
+    _write_artifact(target, size, executable=False)
+    print(f"created package: {target}")
+
+
+def run_fpm(args):
+    if args[:1] == ["--version"]:
+        print(VERSIONS["fpm"])
+        return
+    package_type = _option(args, "-t", "deb")
+    target = _option(args, "-p", f"package.{package_type}")
+    size = int(_tool_setting("fpm", "SIZE", "1048576"))
+
+    _simulate("fpm", [f"Creating {package_type} package"])
+    _write_artifact(target, size, executable=False)
+    print(f'{{:timestamp=>"{time.time()}", :message=>"Created package", :path=>"{target}"}}')
+
+
+RUNNERS = {
+    "nuitka": run_nuitka,
+    "pyinstaller": run_pyinstaller,
+    "nfpm": run_nfpm,
+    "fpm": run_fpm,
+}
+
+
+def main(tool=None, args=None):
+    tool = tool or Path(sys.argv[0]).name
+    args = sys.argv[1:] if args is None else args
+
+    if tool not in RUNNERS:
+        print(f"fake_tool: 未知工具 {tool}", file=sys.stderr)
+        return 2
+
+    if tool == "nuitka" and args[:1] == ["--plugin-list"]:
+        print(NUITKA_PLUGIN_LIST, end="")
+        return 0
+
+    if args[:1] == ["--version"] and tool != "fpm":
+        print(VERSIONS[tool])
+        return 0
+
+    failing = [t.strip() for t in os.environ.get("FAKE_TOOL_FAIL", "").split(",")]
+    if tool in failing:
+        _simulate(tool, ["simulated failure"])
+        print(f"{tool}: FATAL: simulated failure (FAKE_TOOL_FAIL)", file=sys.stderr)
+        return 1
+
+    RUNNERS[tool](args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""假 nuitka 包，仅用于让构建脚本的 find_spec 检查通过"""
@@ -6,10 +6,22 @@ Python打包脚本生成器CLI程序入口
 """
 
 import argparse
+import json
 import sys
 from app.builder import NuitkaScriptBuilder
 
 
+def positive_int(value):
+    """argparse 类型：正整数"""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"必须是正整数: {value}")
+    return number
+
+
 def create_parser():
     """创建命令行参数解析器"""
     parser = argparse.ArgumentParser(
@@ -30,18 +42,113 @@ def create_parser():
         help="检查系统环境和所需的打包工具"
     )
     
+    parser.add_argument(
+        "--format",
+        choices=["text", "json", "jsonl"],
+        default="text",
+        help="输出格式 (配合 --check-env/--history 使用，默认: text)"
+    )
+    
+    parser.add_argument(
+        "--output",
+        metavar="FILE",
+        help="将环境检查报告或构建历史写入文件而不是标准输出"
+    )
+    
+    parser.add_argument(
+        "--require",
+        metavar="TOOLS",
+        help="必须已安装的工具，多个用逗号分隔 (如: nuitka,nfpm)，缺失时以退出码1结束"
+    )
+    
+    parser.add_argument(
+        "-c", "--config",
+        metavar="FILE",
+        help="从配置文件非交互式生成脚本 (.json/.toml，或含 [tool.build-script] 的 pyproject.toml)"
+    )
+    
+    parser.add_argument(
+        "--mode",
+        choices=["full", "compile", "package"],
+        help="生成模式 (配合 --config/--bulk 使用，默认读取配置文件中的 mode，缺省为 full)"
+    )
+    
+    parser.add_argument(
+        "--bulk",
+        nargs="+",
+        metavar="PATH",
+        help="批量并行生成：配置文件、配置目录或项目仓库的路径/通配符 (如 'repos/*')"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        metavar="N",
+        help="批量生成的工作进程数 (默认: CPU核心数)"
+    )
+    
+    parser.add_argument(
+        "--history",
+        nargs="?",
+        const=".",
+        metavar="DB",
+        help="显示构建历史趋势并检测回归：构建历史数据库或项目目录 (默认: 当前目录的 .build_history.db)，检测到回归时退出码为1"
+    )
+    
+    parser.add_argument(
+        "--app",
+        metavar="NAME",
+        help="只显示指定应用的构建历史 (配合 --history 使用)"
+    )
+    
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        metavar="N",
+        help="显示最近N次构建 (配合 --history 使用，默认: 20)"
+    )
+    
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="回归阈值，最近一次构建超过历史中位数的比例 (配合 --history 使用，默认: 0.2 即 20%%)"
+    )
+    
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="将脚本生成各步骤的耗时写入 Chrome Trace 格式的 trace.json (chrome://tracing / Perfetto)"
+    )
+    
     return parser
 
 
-def main():
-    """主函数"""
-    parser = create_parser()
-    args = parser.parse_args()
+def format_env_report(report, output_format):
+    """将环境报告格式化为JSON或JSONL文本"""
+    if output_format == "json":
+        return json.dumps(report, ensure_ascii=False, indent=2) + "\n"
+
+    # JSONL: 每行一条记录，便于调度器流式处理
+    records = [{"type": "system", **report["system"]}]
+    records.extend({"type": "tool", **tool} for tool in report["tools"])
+    records.extend({"type": "recommendation", "message": rec} for rec in report["recommendations"])
+    records.append({
+        "type": "summary",
+        "total_probe_ms": report["total_probe_ms"],
+        "missing_required": report.get("missing_required", []),
+    })
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+def run_env_check(args):
+    """执行环境检查，返回退出码"""
+    from app.env_checker import EnvironmentChecker
+    checker = EnvironmentChecker()
+    required = [tool.strip() for tool in (args.require or "").split(",") if tool.strip()]
     
-    # 如果是环境检查模式
-    if args.check_env:
-        from app.env_checker import EnvironmentChecker
-        checker = EnvironmentChecker()
+    if args.format == "text":
         checker.check_all()
         
         # 显示建议
@@ -51,10 +158,105 @@ def main():
             log_info("💡 改进建议:")
             for rec in recommendations:
                 log_warning(f"  • {rec}")
-        return
+        
+        if not required:
+            return 0
+    
+    report = checker.collect_report()
+    
+    installed = {tool["name"] for tool in report["tools"] if tool["installed"]}
+    report["missing_required"] = [tool for tool in required if tool not in installed]
+    
+    if args.format != "text":
+        content = format_env_report(report, args.format)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(content)
+        else:
+            sys.stdout.write(content)
+    elif report["missing_required"]:
+        from app.logger_utils import log_error
+        log_error(f"❌ 缺少必需工具: {', '.join(report['missing_required'])}")
+    
+    return 1 if report["missing_required"] else 0
+
+
+def run_history(args):
+    """显示构建历史趋势，返回退出码"""
+    from app.build_history import BuildHistory
+    from app.logger_utils import log_error
+    
+    history = BuildHistory(args.history)
+    try:
+        builds = history.load(args.app, args.limit)
+    except ValueError as e:
+        log_error(f"❌ {e}")
+        return 1
+    
+    regressions = history.detect_regressions(builds, args.threshold)
+    
+    if args.format == "text":
+        if not builds:
+            log_error("❌ 没有构建记录")
+            return 1
+        history.display_trends(builds, regressions)
+    else:
+        if args.format == "json":
+            report = {"database": history.db_path, "builds": builds, "regressions": regressions}
+            content = json.dumps(report, ensure_ascii=False, indent=2) + "\n"
+        else:
+            records = [{"type": "build", **build} for build in builds]
+            records.extend({"type": "regression", **r} for r in regressions)
+            content = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(content)
+        else:
+            sys.stdout.write(content)
+    
+    return 1 if regressions else 0
+
+
+def main():
+    """主函数"""
+    parser = create_parser()
+    args = parser.parse_args()
+    
+    # 如果是环境检查模式
+    if args.check_env:
+        sys.exit(run_env_check(args))
+    
+    # 构建历史趋势
+    if args.history:
+        sys.exit(run_history(args))
+    
+    # 生成器追踪：退出（包括 sys.exit）时写入
+    if args.trace:
+        from app.trace_utils import TRACER
+        TRACER.enable()
+    try:
+        run_generator(args)
+    finally:
+        if args.trace:
+            TRACER.save(args.trace)
+
+
+def run_generator(args):
+    """执行批量、配置文件或交互式脚本生成"""
+    # 批量生成模式
+    if args.bulk:
+        from app.bulk_generator import BulkGenerator
+        results = BulkGenerator(args.workers).run(args.bulk, args.mode)
+        ok = results and all(r["status"] == "success" for r in results)
+        sys.exit(0 if ok else 1)
     
     # 启动构建器
     builder = NuitkaScriptBuilder()
+    
+    # 配置文件模式：无需交互
+    if args.config:
+        sys.exit(0 if builder.run_from_config(args.config, args.mode) else 1)
+    
     builder.run()
 
 
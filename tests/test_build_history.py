@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+构建历史回归检测测试
+"""
+
+import unittest
+
+from app.build_history import BuildHistory
+
+
+def _build(build_id, compile_status, peak_rss_kb, duration_seconds, compile_seconds):
+    return {
+        "id": build_id,
+        "status": "success",
+        "duration_seconds": duration_seconds,
+        "peak_rss_kb": peak_rss_kb,
+        "artifact_bytes": None,
+        "phases": {
+            "preflight": {"status": "done", "seconds": 0.1},
+            "compile": {"status": compile_status, "seconds": compile_seconds},
+        },
+        "packages": {},
+    }
+
+
+class DetectRegressionsTest(unittest.TestCase):
+    def test_skipped_builds_are_not_a_baseline(self):
+        """跳过编译的构建峰值内存很小，不能作为基线导致误报回归"""
+        builds = [
+            _build(1, "skipped", 30 * 1024, 1.0, 0.0),
+            _build(2, "skipped", 30 * 1024, 1.0, 0.0),
+            _build(3, "done", 800 * 1024, 300.0, 290.0),
+        ]
+        self.assertEqual(BuildHistory.detect_regressions(builds), [])
+
+    def test_skipped_build_metrics_exclude_timings_and_memory(self):
+        metrics = BuildHistory.get_metrics(_build(1, "skipped", 30 * 1024, 1.0, 0.0))
+        self.assertNotIn("peak_rss_kb", metrics)
+        self.assertNotIn("duration_seconds", metrics)
+        self.assertNotIn("phase:preflight", metrics)
+
+    def test_compiled_builds_still_detect_memory_regression(self):
+        builds = [
+            _build(1, "done", 400 * 1024, 300.0, 290.0),
+            _build(2, "skipped", 30 * 1024, 1.0, 0.0),
+            _build(3, "done", 400 * 1024, 300.0, 290.0),
+            _build(4, "done", 800 * 1024, 300.0, 290.0),
+        ]
+        regressions = BuildHistory.detect_regressions(builds)
+        self.assertEqual([r["metric"] for r in regressions], ["peak_rss_kb"])
+        self.assertEqual(regressions[0]["baseline"], 400 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
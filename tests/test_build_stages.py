@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+生成的构建脚本中阶段图（run_stages）的跳过与强制执行测试
+"""
+
+import os
+import tempfile
+import time
+import types
+import unittest
+from pathlib import Path
+
+from app.template_common import COMMON_STAGE_FUNCTIONS
+from app.template_engine import compile_template
+
+
+def _load_stage_functions(force=False):
+    """渲染阶段图模板片段，在独立命名空间中执行（提供构建脚本中的其他全局对象）"""
+    namespace = {
+        "os": os,
+        "Path": Path,
+        "BUILD_RESULT": {},
+        "BUILD_OPTIONS": types.SimpleNamespace(force=force),
+        "build_clock": time.perf_counter,
+        "count_cache": lambda hit: None,
+        "log_success": lambda message: None,
+        "log_warning": lambda message: None,
+        "log_error": lambda message: None,
+    }
+    exec(compile_template(COMMON_STAGE_FUNCTIONS).render(output_dir="build"), namespace)
+    return namespace
+
+
+class RunStagesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        Path("main.py").write_text("print(1)\n", encoding="utf-8")
+        self.runs = []
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def _run(self, force=False):
+        ns = _load_stage_functions(force)
+
+        def compile_action():
+            self.runs.append("compile")
+            Path("app.bin").write_text("binary", encoding="utf-8")
+
+        stages = [
+            ns["BuildStage"]("preflight", lambda: self.runs.append("preflight")),
+            ns["BuildStage"]("compile", compile_action, deps=["preflight"], inputs=["main.py"], outputs=["app.bin"]),
+        ]
+        failure = ns["run_stages"](stages)
+        self.assertIsNone(failure)
+        return {name: stage["status"] for name, stage in ns["BUILD_RESULT"]["stages"].items()}
+
+    def test_unchanged_inputs_are_skipped(self):
+        self.assertEqual(self._run(), {"preflight": "done", "compile": "done"})
+        self.assertEqual(self._run(), {"preflight": "done", "compile": "skipped"})
+        self.assertEqual(self.runs, ["preflight", "compile", "preflight"])
+
+    def test_changed_input_or_missing_output_reruns(self):
+        self._run()
+        Path("main.py").write_text("print(1, 2)\n", encoding="utf-8")
+        self.assertEqual(self._run()["compile"], "done")
+        os.remove("app.bin")
+        self.assertEqual(self._run()["compile"], "done")
+
+    def test_force_runs_every_stage(self):
+        self._run()
+        self.assertEqual(self._run(force=True), {"preflight": "done", "compile": "done"})
+
+    def test_failed_stage_stops_dependents(self):
+        ns = _load_stage_functions()
+
+        def fail():
+            raise ns["BuildStageError"]("编译失败")
+
+        stages = [
+            ns["BuildStage"]("compile", fail, inputs=["main.py"]),
+            ns["BuildStage"]("cleanup", lambda: self.runs.append("cleanup"), deps=["compile"]),
+        ]
+        self.assertEqual(ns["run_stages"](stages), "编译失败")
+        self.assertEqual(self.runs, [])
+        # 失败的阶段不记录指纹，下次仍会执行
+        self.assertNotIn("compile", ns["load_stage_stamps"]())
+
+
+if __name__ == "__main__":
+    unittest.main()
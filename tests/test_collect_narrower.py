@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+--collect-all 收窄测试
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from app.collect_narrower import (
+    PACKAGE_PATH_PREFIX, _package_file_args, plan_collect_all, resolve_package_file_args, split_package_file_arg,
+)
+from app.import_tracer import classify_data_files
+
+
+class PackageFileArgTest(unittest.TestCase):
+    def test_split_round_trip(self):
+        arg = "--add-data=" + _package_file_args("demo", ["data/vocab.json"])[0]
+        self.assertEqual(split_package_file_arg(arg), ("--add-data", "demo", "data/vocab.json", "demo/data"))
+
+    def test_split_accepts_windows_separator(self):
+        arg = f"--add-binary={PACKAGE_PATH_PREFIX}demo/lib/demo.dll;demo/lib"
+        self.assertEqual(split_package_file_arg(arg), ("--add-binary", "demo", "lib/demo.dll", "demo/lib"))
+
+    def test_split_ignores_plain_args(self):
+        self.assertIsNone(split_package_file_arg(f"--add-data=assets{os.pathsep}assets"))
+        self.assertIsNone(split_package_file_arg("--onefile"))
+
+    def test_resolve_uses_current_environment(self):
+        package_dir = os.path.dirname(json.__file__)
+        args = ["pyinstaller", "--add-data=" + _package_file_args("json", ["tool.py"])[0], "main.py"]
+        resolved = resolve_package_file_args(args)
+        self.assertEqual(resolved[0], "pyinstaller")
+        self.assertEqual(resolved[1], f"--add-data={os.path.join(package_dir, 'tool.py')}{os.pathsep}json")
+        self.assertTrue(os.path.isfile(os.path.join(package_dir, "tool.py")))
+        self.assertEqual(resolved[2], "main.py")
+
+    def test_resolve_keeps_unknown_packages(self):
+        arg = "--add-data=" + _package_file_args("no_such_package_xyz", ["a.txt"])[0]
+        self.assertEqual(resolve_package_file_args([arg]), [arg])
+
+
+class PlanCollectAllTest(unittest.TestCase):
+    def test_drop_when_never_loaded(self):
+        plan = plan_collect_all("unused", set(), {"modules": {"other": "/site/other.py"}}, package_distributions={})
+        self.assertEqual(plan["action"], "drop")
+        self.assertEqual(plan["hidden_imports"], [])
+
+    def test_keep_without_trace(self):
+        self.assertEqual(plan_collect_all("demo", {"demo"}, None)["action"], "keep")
+
+    def test_keep_when_static_but_not_traced(self):
+        """冒烟测试未覆盖到静态可达的包时，不能确定其动态导入"""
+        plan = plan_collect_all("demo", {"demo.core"}, {"modules": {}}, package_distributions={})
+        self.assertEqual(plan["action"], "keep")
+
+    def test_narrow_to_traced_submodules_and_files(self):
+        trace = {
+            "modules": {"demo": "/site/demo/__init__.py", "demo.core": "/site/demo/core.py",
+                        "demo.plugins.a": "/site/demo/plugins/a.py"},
+            "importers": {},
+            "package_data": {"demo": ["data/vocab.json"]},
+            "package_binaries": {"demo": ["libdemo.so"]},
+        }
+        plan = plan_collect_all("demo", {"demo", "demo.core"}, trace, package_distributions={"demo": ["demo-dist"]})
+        self.assertEqual(plan["action"], "narrow")
+        self.assertEqual(plan["hidden_imports"], ["demo.plugins.a"])
+        self.assertEqual(plan["add_data"], [f"{PACKAGE_PATH_PREFIX}demo/data/vocab.json{os.pathsep}demo/data"])
+        self.assertEqual(plan["add_binary"], [f"{PACKAGE_PATH_PREFIX}demo/libdemo.so{os.pathsep}demo"])
+        self.assertEqual(plan["copy_metadata"], ["demo-dist"])
+
+
+class PackageMetadataTest(unittest.TestCase):
+    """运行时读取的 *.dist-info 元数据在收窄后仍需复制"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.site = os.path.join(self.tmp.name, "site-packages")
+        self.project = os.path.join(self.tmp.name, "project")
+        os.makedirs(os.path.join(self.site, "demo"))
+        os.makedirs(self.project)
+        self.init_file = os.path.join(self.site, "demo", "__init__.py")
+        open(self.init_file, "w").close()
+        dist_info = os.path.join(self.site, "demo_dist-1.2.dist-info")
+        os.makedirs(dist_info)
+        self.metadata_file = os.path.join(dist_info, "METADATA")
+        with open(self.metadata_file, "w", encoding="utf-8") as f:
+            f.write("Metadata-Version: 2.1\nName: demo-dist\nVersion: 1.2\n")
+        with open(os.path.join(dist_info, "top_level.txt"), "w", encoding="utf-8") as f:
+            f.write("demo\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_dist_info_reads_map_to_distribution(self):
+        classified = classify_data_files({"demo": self.init_file}, [self.metadata_file], self.project)
+        self.assertEqual(classified["package_metadata"], {"demo": ["demo-dist"]})
+        self.assertEqual(classified["package_data"], {})
+        self.assertEqual(classified["project_files"], [])
+
+    def test_narrowed_plan_copies_traced_metadata(self):
+        """复现：import pip; importlib.metadata.version("pip") 收窄后不能丢失元数据"""
+        modules = {"demo": self.init_file}
+        trace = {"modules": modules, "importers": {},
+                 **classify_data_files(modules, [self.metadata_file], self.project)}
+        plan = plan_collect_all("demo", set(), trace, package_distributions={})
+        self.assertEqual(plan["action"], "narrow")
+        self.assertEqual(plan["copy_metadata"], ["demo-dist"])
+
+    def test_narrowed_plan_copies_own_distribution_metadata(self):
+        """与 --collect-all 一致：即使追踪中没有读取元数据，也复制包所属发行包的元数据"""
+        trace = {"modules": {"demo": self.init_file}, "importers": {}}
+        plan = plan_collect_all("demo", set(), trace, package_distributions={"demo": ["demo-dist"]})
+        self.assertEqual(plan["copy_metadata"], ["demo-dist"])
+
+
+if __name__ == "__main__":
+    unittest.main()
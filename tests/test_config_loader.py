@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+声明式配置文件校验测试
+"""
+
+import os
+import tempfile
+import unittest
+
+from app.config_collector import ConfigCollector
+from app.config_loader import ConfigLoader
+
+
+class ConfigLoaderApplyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.entry = os.path.join(self.tmp.name, "main.py")
+        with open(self.entry, "w", encoding="utf-8") as f:
+            f.write("print('hello')\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _apply(self, mode="compile", **data):
+        collector = ConfigCollector()
+        config = {"project_dir": self.tmp.name, "entry_file": self.entry, **data}
+        return collector, ConfigLoader.apply(config, collector, mode)
+
+    def test_valid_config(self):
+        collector, errors = self._apply(build_tool="pyinstaller", onefile=True, hidden_imports=["yaml"])
+        self.assertEqual(errors, [])
+        self.assertEqual(collector.app_name, "main")
+        self.assertTrue(collector.onefile)
+        self.assertEqual(collector.hidden_imports, ["yaml"])
+
+    def test_type_errors(self):
+        _, errors = self._apply(onefile="yes", exclude_packages="numpy", jobs="4", app_name=3, colour="red")
+        self.assertEqual(sorted(errors), sorted([
+            "onefile 必须是布尔值",
+            "exclude_packages 必须是字符串列表",
+            "jobs 必须是整数",
+            "app_name 必须是字符串",
+            "未知配置项: colour",
+        ]))
+
+    def test_bool_is_not_an_integer(self):
+        _, errors = self._apply(jobs=True)
+        self.assertEqual(errors, ["jobs 必须是整数"])
+
+    def test_invalid_mode(self):
+        _, errors = self._apply(mode="deploy")
+        self.assertEqual(len(errors), 1)
+        self.assertIn("mode", errors[0])
+
+    def test_validator_errors(self):
+        _, errors = self._apply(
+            build_tool="cx_freeze", jobs=0, file_version="1.0", add_data=["assets"],
+            entry_file=os.path.join(self.tmp.name, "missing.py"),
+        )
+        self.assertTrue(any(e.startswith("entry_file:") for e in errors), errors)
+        self.assertIn("build_tool 必须是 nuitka 或 pyinstaller: cx_freeze", errors)
+        self.assertIn("jobs 必须是正整数: 0", errors)
+        self.assertIn("file_version 格式应为 x.y.z: 1.0", errors)
+        self.assertIn("add_data 格式应为 源路径;目标路径: assets", errors)
+
+    def test_package_settings_are_validated(self):
+        _, errors = self._apply(
+            mode="package", linux_packaging_tool="dpkg", linux_package_types=["deb", "apk"], package_architecture="x86",
+        )
+        self.assertEqual(len(errors), 3, errors)
+        self.assertTrue(errors[0].startswith("linux_packaging_tool"))
+        self.assertTrue(errors[1].startswith("linux_package_types"))
+        self.assertTrue(errors[2].startswith("package_architecture"))
+
+
+if __name__ == "__main__":
+    unittest.main()
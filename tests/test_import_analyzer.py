@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+导入图排除建议测试
+"""
+
+import os
+import tempfile
+import unittest
+
+from app.import_analyzer import ImportGraphAnalyzer
+
+
+def _dist(name, *modules):
+    return {"name": name, "version": "1.0", "modules": list(modules)}
+
+
+class SuggestExcludesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.entry = os.path.join(self.tmp.name, "main.py")
+        with open(self.entry, "w", encoding="utf-8") as f:
+            f.write("import json\n")
+        self.analyzer = ImportGraphAnalyzer(self.tmp.name, self.entry, search_paths=[self.tmp.name])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_toolchain_distributions_are_not_suggested(self):
+        """打包工具和生成器自身的依赖不作为排除建议"""
+        distributions = {
+            "pip": _dist("pip", "pip"),
+            "pyinstaller": _dist("PyInstaller", "PyInstaller"),
+            "pyinstaller_hooks_contrib": _dist("pyinstaller_hooks_contrib", "_pyinstaller_hooks_contrib"),
+            "loguru": _dist("loguru", "loguru"),
+            "some-unused-lib": _dist("some-unused-lib", "some_unused_lib"),
+        }
+        self.assertEqual(self.analyzer.suggest_excludes(distributions), ["some_unused_lib"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+运行时导入追踪结果处理测试
+"""
+
+import os
+import tempfile
+import unittest
+
+from app.import_tracer import classify_data_files, compute_hidden_imports
+
+
+class ComputeHiddenImportsTest(unittest.TestCase):
+    def test_only_leaf_modules_are_kept(self):
+        """导入子模块会同时收集父包，父包不重复列出"""
+        modules = {"pkg": "/site/pkg/__init__.py", "pkg.sub": "/site/pkg/sub/__init__.py",
+                   "pkg.sub.leaf": "/site/pkg/sub/leaf.py", "other": "/site/other.py"}
+        self.assertEqual(compute_hidden_imports(modules, set()), ["other", "pkg.sub.leaf"])
+
+    def test_static_builtin_and_fileless_modules_are_skipped(self):
+        modules = {"static_mod": "/site/static_mod.py", "sys": None, "namespace_pkg": None,
+                   "dynamic": "/site/dynamic.py"}
+        self.assertEqual(compute_hidden_imports(modules, {"static_mod"}), ["dynamic"])
+
+    def test_stdlib_imported_by_stdlib_is_left_to_the_compiler(self):
+        modules = {"json.decoder": "/lib/json/decoder.py", "xml.dom.minidom": "/lib/xml/dom/minidom.py"}
+        importers = {"json.decoder": "json", "xml.dom.minidom": "plugin_loader"}
+        self.assertEqual(compute_hidden_imports(modules, set(), importers), ["xml.dom.minidom"])
+
+
+class ClassifyDataFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.site = os.path.join(self.tmp.name, "site-packages")
+        self.project = os.path.join(self.tmp.name, "project")
+        for directory in (os.path.join(self.site, "demo", "data"), os.path.join(self.project, "local", "res")):
+            os.makedirs(directory)
+        self.modules = {
+            "demo": os.path.join(self.site, "demo", "__init__.py"),
+            "demo.core": os.path.join(self.site, "demo", "core.py"),
+            "local": os.path.join(self.project, "local", "__init__.py"),
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_files_are_split_by_owner(self):
+        data_files = [
+            os.path.join(self.site, "demo", "data", "vocab.json"),
+            os.path.join(self.project, "local", "res", "config.ini"),
+            os.path.join(self.tmp.name, "elsewhere.txt"),
+        ]
+        binaries = [os.path.join(self.site, "demo", "libdemo.so"), os.path.join(self.tmp.name, "libc.so")]
+        classified = classify_data_files(self.modules, data_files, self.project, binaries)
+        self.assertEqual(classified["package_data"], {"demo": ["data/vocab.json"]})
+        # 项目内的包不作为第三方包数据
+        self.assertEqual(classified["project_files"], ["local/res/config.ini"])
+        self.assertEqual(classified["package_binaries"], {"demo": ["libdemo.so"]})
+        self.assertEqual(classified["package_metadata"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()